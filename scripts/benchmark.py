@@ -0,0 +1,59 @@
+"""
+Lance la suite de benchmarks et compare éventuellement le résultat à une référence.
+
+Exemples :
+    python scripts/benchmark.py --output bench.json
+    python scripts/benchmark.py --baseline bench.json --tolerance 0.2
+    python scripts/benchmark.py --startup --sizes 10000 --ks 5
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.benchmarks import (
+    compare_to_baseline, load_report, run_benchmarks, run_startup_benchmarks, save_report
+)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 60000],
+                        help="tailles du jeu d'entraînement")
+    parser.add_argument("--ks", type=int, nargs="+", default=[1, 5], help="valeurs de k")
+    parser.add_argument("--queries", type=int, default=1000, help="nombre de requêtes par lot")
+    parser.add_argument("--startup", action="store_true",
+                        help="mesure aussi l'import du paquet et le chargement d'un modèle")
+    parser.add_argument("--output", type=Path, help="fichier JSON où écrire les résultats")
+    parser.add_argument("--baseline", type=Path, help="rapport JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="dégradation relative tolérée avant d'échouer (0.25 = 25 %%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.ks, n_queries=args.queries)
+    if args.startup:
+        startup = run_startup_benchmarks(n=args.sizes[0], k=args.ks[0])
+        report["results"] += startup["results"]
+        report["import_profile"] = startup["import_profile"]
+    for result in report["results"]:
+        metrics = "  ".join(f"{name}={value:.4g}" for name, value in result["metrics"].items())
+        print(f"{result['name']:<14} n={result['n']:<7} k={result['k']:<3} {metrics}")
+    for row in report.get("import_profile", []):
+        print(f"import {row['module']:<40} {row['cumulative_ms']:8.1f} ms (propre : {row['self_ms']:.1f} ms)")
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"Résultats écrits dans {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, load_report(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression['key']} : {regression['baseline']:.4g} -> "
+                  f"{regression['current']:.4g} ({regression['change']:+.1%})")
+        if regressions:
+            return 1
+        print("Aucune régression par rapport à la référence")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
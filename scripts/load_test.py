@@ -0,0 +1,77 @@
+"""
+Test de charge du serveur d'inférence : latences p50/p99 et débit (QPS).
+
+Sans --connect, un classificateur (--model, ou synthétique de --train-size
+images) est servi dans ce processus le temps du test.
+
+Exemples :
+    python scripts/load_test.py --requests 2000 --concurrency 64
+    python scripts/load_test.py --max-batch-size 1        # sans micro-lots, pour comparer
+    python scripts/load_test.py --connect 127.0.0.1:8000 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.benchmarks import synthetic_mnist
+from src.knn import ImageClassifier
+from src.serving import InferenceServer
+from src.serving.loadtest import encode_npy, run_load_test
+
+async def _run(args):
+    images, labels = synthetic_mnist(args.train_size + 256)
+    bodies = [encode_npy(image) for image in images[-256:]]
+
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        return await run_load_test(bodies, args.requests, args.concurrency, host, int(port)), None
+
+    if args.model:
+        classifier = ImageClassifier.load(args.model)
+    else:
+        classifier = ImageClassifier(k=args.k)
+        classifier.fit(images[:args.train_size], labels[:args.train_size])
+
+    server = InferenceServer(classifier, args.max_batch_size, args.max_wait_ms, args.workers)
+    await server.start(port=0)
+    try:
+        host, port = server.address[:2]
+        result = await run_load_test(bodies, args.requests, args.concurrency, host, port)
+        return result, server.batcher.stats()
+    finally:
+        await server.stop()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--connect", help="hôte:port d'un serveur déjà lancé")
+    parser.add_argument("--model", help="répertoire d'un modèle enregistré à servir")
+    parser.add_argument("--train-size", type=int, default=10000,
+                        help="taille du jeu synthétique si aucun modèle n'est fourni")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=2000, help="nombre total de requêtes")
+    parser.add_argument("--concurrency", type=int, default=32, help="clients simultanés")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="fichier JSON où écrire les résultats")
+    args = parser.parse_args(argv)
+
+    result, batching = asyncio.run(_run(args))
+    print(f"{result['requests']} requêtes en {result['duration_s']:.2f} s : "
+          f"{result['qps']:.1f} QPS, p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+          f"{result['errors']} erreurs")
+    if batching:
+        print(f"{batching['batches']} lots, {batching['mean_batch_size']:.1f} images par lot en moyenne")
+        result["batching"] = batching
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"Résultats écrits dans {args.output}")
+    return 1 if result["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
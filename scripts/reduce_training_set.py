@@ -0,0 +1,72 @@
+"""
+Réduit l'ensemble d'entraînement et compare le classificateur réduit à
+l'original : taux de compression, écart de précision et accélération.
+
+Exemples :
+    python scripts/reduce_training_set.py --method wilson cnn
+    python scripts/reduce_training_set.py --method kmeans --per-class 200 --mnist data/digits
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.benchmarks import synthetic_mnist
+from src.knn import ImageClassifier
+from src.reduction import reduction_report
+
+def _load(args):
+    if args.mnist:
+        from src.data.mnist_loader import MNISTDataset
+        dataset = MNISTDataset(args.mnist)
+        # Les données chargées sont normalisées entre 0 et 1 : revenir aux pixels 0-255
+        train, train_labels = dataset.get_train_data()
+        test, test_labels = dataset.get_test_data()
+        to_pixels = lambda images: np.rint(np.asarray(images) * 255).astype(np.uint8)
+        return (to_pixels(train[:args.train_size]), np.asarray(train_labels[:args.train_size]),
+                to_pixels(test[:args.test_size]), np.asarray(test_labels[:args.test_size]))
+    images, labels = synthetic_mnist(args.train_size + args.test_size)
+    return (images[:args.train_size], labels[:args.train_size],
+            images[args.train_size:], labels[args.train_size:])
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--method", nargs="+", default=["wilson", "cnn"],
+                        help="méthodes appliquées dans l'ordre : cnn, wilson, kmeans")
+    parser.add_argument("--per-class", type=int, default=100,
+                        help="prototypes par classe pour kmeans")
+    parser.add_argument("--k", type=int, default=3, help="k du classificateur original")
+    parser.add_argument("--mnist", help="répertoire du dataset MNIST (synthétique sinon)")
+    parser.add_argument("--train-size", type=int, default=60000)
+    parser.add_argument("--test-size", type=int, default=10000)
+    parser.add_argument("--output", type=Path, help="fichier JSON où écrire le rapport")
+    args = parser.parse_args(argv)
+
+    train, train_labels, test, test_labels = _load(args)
+    classifier = ImageClassifier(k=args.k)
+    classifier.fit(train, train_labels)
+
+    start = time.perf_counter()
+    reduced = classifier.reduce(args.method, n_per_class=args.per_class)
+    report = reduction_report(classifier, reduced, test, test_labels)
+    report["reduction_s"] = time.perf_counter() - start
+
+    print(f"{report['n_original']} -> {report['n_reduced']} exemples "
+          f"(compression x{report['compression_ratio']:.1f}, en {report['reduction_s']:.1f} s)")
+    print(f"précision {report['accuracy']:.4f} -> {report['reduced_accuracy']:.4f} "
+          f"({report['accuracy_delta']:+.4f})")
+    print(f"prédiction {report['predict_s']:.2f} s -> {report['reduced_predict_s']:.2f} s "
+          f"(accélération x{report['speedup']:.1f})")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Rapport écrit dans {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,33 @@
-# Import des modules principaux pour un accès simplifié
-from .knn import ImageClassifier
-from .data.dataset import Dataset
-from .strategies.distance import EuclideanDistance
-from .strategies.preprocessing import MNISTPreprocessing
+# Accès simplifié aux classes principales, chargées à la première utilisation :
+# `import src` ne coûte presque rien, et un worker qui n'utilise que
+# src.distributed ou src.data.idx n'importe ni le classificateur ni Pillow
+import importlib
+from typing import TYPE_CHECKING
+
+# Nom public -> module qui le définit
+_LAZY_ATTRIBUTES = {
+    "ImageClassifier": ".knn",
+    "Dataset": ".data.dataset",
+    "EuclideanDistance": ".strategies.distance",
+    "MNISTPreprocessing": ".strategies.preprocessing",
+}
 
 # Définir un __all__ pour limiter les imports publics
-__all__ = [
-    "ImageClassifier",
-    "Dataset",
-    "EuclideanDistance",
-    "MNISTPreprocessing",
-]
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .knn import ImageClassifier
+    from .data.dataset import Dataset
+    from .strategies.distance import EuclideanDistance
+    from .strategies.preprocessing import MNISTPreprocessing
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        # Mémorisé : les accès suivants ne repassent plus par __getattr__
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
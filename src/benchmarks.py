@@ -0,0 +1,296 @@
+"""
+Suite de benchmarks du classificateur : temps de fit, latence de predict,
+débit par lot, evaluate, pic de mémoire et allocations, et temps de
+démarrage d'un nouveau processus (import du paquet, chargement d'un modèle).
+
+Les résultats sont sérialisables en JSON pour être comparés à une référence
+enregistrée, avec une tolérance au-delà de laquelle un écart est une régression.
+"""
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Union
+import numpy as np
+from .knn import ImageClassifier
+
+# Sens d'amélioration de chaque métrique : +1 plus grand est meilleur, -1 plus petit est meilleur
+METRIC_DIRECTIONS = {
+    "seconds": -1,
+    "p50_ms": -1,
+    "p95_ms": -1,
+    "p99_ms": -1,
+    "queries_per_second": 1,
+    "peak_alloc_mb": -1,
+    "import_ms": -1,
+    "load_ms": -1,
+    "first_predict_ms": -1,
+}
+
+# Racine du dépôt, d'où les processus mesurés importent `src`
+_ROOT = Path(__file__).resolve().parent.parent
+
+# Exécuté dans un nouvel interpréteur : import, chargement du modèle, première prédiction
+_STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from src import ImageClassifier
+imported = time.perf_counter()
+classifier = ImageClassifier.load(sys.argv[1])
+loaded = time.perf_counter()
+import numpy as np
+classifier.predict(np.zeros((28, 28), dtype=np.uint8))
+predicted = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "load_ms": (loaded - imported) * 1000,
+    "first_predict_ms": (predicted - loaded) * 1000,
+    "optional_modules": [m for m in ("PIL", "requests", "multiprocessing") if m in sys.modules],
+}))
+"""
+
+def synthetic_mnist(n: int, n_classes: int = 10, random_state: int = 0):
+    """
+    Images uint8 28x28 au format MNIST : un motif par classe plus du bruit,
+    pour que la précision mesurée ait un sens.
+    """
+    rng = np.random.default_rng(random_state)
+    prototypes = rng.integers(0, 256, (n_classes, 28, 28), dtype=np.int16)
+    labels = rng.integers(0, n_classes, n)
+    noise = rng.integers(-100, 101, (n, 28, 28), dtype=np.int16)
+    images = np.clip(prototypes[labels] + noise, 0, 255).astype(np.uint8)
+    return images, labels
+
+def _max_rss_mb() -> float:
+    """Pic de mémoire résidente du processus (ru_maxrss est en Ko sous Linux, en octets sous macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _measure(function: Callable, repeat: int) -> Dict:
+    """
+    Exécute `function` `repeat` fois et retourne le meilleur temps, moins
+    sensible au bruit de la machine que la moyenne, puis l'exécute une fois
+    de plus, hors chronométrage, pour le pic d'allocations : tracemalloc
+    (qui voit aussi les tableaux NumPy) ralentit chaque allocation et
+    fausserait le temps mesuré.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "value": value,
+        "seconds": min(timings),
+        "peak_alloc_mb": peak / (1024 * 1024),
+    }
+
+def run_benchmarks(sizes: Iterable[int] = (10000, 60000), ks: Iterable[int] = (1, 5),
+                   n_queries: int = 1000, n_latency: int = 200, repeat: int = 3,
+                   classifier_factory: Callable = ImageClassifier) -> Dict:
+    """
+    Exécute la suite complète.
+
+    Args:
+        sizes: tailles du jeu d'entraînement synthétique
+        ks: valeurs de k mesurées
+        n_queries: nombre de requêtes pour le débit par lot et evaluate
+        n_latency: nombre de requêtes unitaires pour les percentiles de latence
+        repeat: nombre de répétitions des mesures de temps (le meilleur est gardé)
+        classifier_factory: fonction k -> classificateur à mesurer
+
+    Returns:
+        Dictionnaire {"meta": ..., "results": [...]} sérialisable en JSON
+    """
+    results = []
+
+    def record(name, n, k, measured, **extra):
+        metrics = {key: value for key, value in measured.items() if key != "value"}
+        metrics.update(extra)
+        results.append({"name": name, "n": n, "k": k, "metrics": metrics})
+
+    for n in sizes:
+        images, labels = synthetic_mnist(n + n_queries)
+        train_images, train_labels = images[:n], labels[:n]
+        test_images, test_labels = images[n:], labels[n:]
+
+        for k in ks:
+            classifier = classifier_factory(k=k)
+            record("fit", n, k, _measure(lambda: classifier.fit(train_images, train_labels), repeat))
+
+            latencies = []
+            for image in test_images[:n_latency]:
+                start = time.perf_counter()
+                classifier.predict(image)
+                latencies.append((time.perf_counter() - start) * 1000)
+            record("predict", n, k, {
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+                "p99_ms": float(np.percentile(latencies, 99)),
+            })
+
+            measured = _measure(lambda: classifier.predict_batch(test_images), repeat)
+            record("predict_batch", n, k, measured,
+                   queries_per_second=len(test_images) / measured["seconds"])
+
+            measured = _measure(lambda: classifier.evaluate(test_images, test_labels), repeat)
+            record("evaluate", n, k, measured, accuracy=measured["value"])
+            classifier.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "n_queries": n_queries,
+            "repeat": repeat,
+            # Pic du processus sur toute la suite : ru_maxrss ne fait que croître,
+            # il n'est donc pas attribuable à une mesure en particulier
+            "max_rss_mb": _max_rss_mb(),
+        },
+        "results": results,
+    }
+
+def _run_python(args: List[str]) -> subprocess.CompletedProcess:
+    """Exécute un nouvel interpréteur Python depuis la racine du dépôt"""
+    return subprocess.run(
+        [sys.executable, *args], cwd=_ROOT, capture_output=True, text=True, check=True
+    )
+
+def import_profile(module: str = "src", top: int = 15) -> List[Dict]:
+    """
+    Modules les plus coûteux à importer avec `module`, mesurés par
+    `python -X importtime` dans un nouvel interpréteur.
+
+    Returns:
+        Les `top` modules au temps cumulé le plus élevé, chacun
+        {"module", "self_ms", "cumulative_ms"}
+    """
+    stderr = _run_python(["-X", "importtime", "-c", f"import {module}"]).stderr
+    rows = []
+    for line in stderr.splitlines():
+        # « import time: self [us] | cumulative | imported package »
+        fields = line.partition("import time:")[2].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        rows.append({
+            "module": fields[2].strip(),
+            "self_ms": int(fields[0]) / 1000,
+            "cumulative_ms": int(fields[1]) / 1000,
+        })
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+def run_startup_benchmarks(model_path: Union[str, Path, None] = None, n: int = 2000, k: int = 3,
+                           repeat: int = 5) -> Dict:
+    """
+    Mesure le démarrage à froid d'un processus de prédiction, comme un job
+    par lots de courte durée ou un worker lancé par mise à l'échelle
+    automatique : import de `src`, chargement d'un modèle enregistré et
+    première prédiction, chacun dans un nouvel interpréteur.
+
+    Args:
+        model_path: modèle enregistré avec save() ; si None, un modèle
+            entraîné sur `n` images synthétiques avec ce `k`
+        repeat: nombre de processus lancés (le meilleur temps est gardé)
+
+    Returns:
+        Rapport {"meta", "results", "import_profile"} au format de
+        `run_benchmarks`, comparable avec `compare_to_baseline` ; la mesure
+        « startup » liste aussi les dépendances optionnelles chargées
+        (optional_modules), qui devraient l'être le moins possible
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if model_path is None:
+            images, labels = synthetic_mnist(n)
+            classifier = ImageClassifier(k=k)
+            classifier.fit(images, labels)
+            model_path = classifier.save(Path(directory) / "model")
+        else:
+            classifier = ImageClassifier.load(model_path)
+            n, k = len(classifier._index), classifier.k
+
+        runs = [
+            json.loads(_run_python(["-c", _STARTUP_SCRIPT, str(model_path)]).stdout)
+            for _ in range(repeat)
+        ]
+
+    metrics = {
+        name: min(run[name] for run in runs) for name in ("import_ms", "load_ms", "first_predict_ms")
+    }
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": [{
+            "name": "startup", "n": n, "k": k, "metrics": metrics,
+            "optional_modules": runs[0]["optional_modules"],
+        }],
+        "import_profile": import_profile("src.knn"),
+    }
+
+def _flatten(report: Dict) -> Dict[str, float]:
+    """Associe à chaque mesure une clé unique, par exemple « fit[n=10000,k=5].seconds »"""
+    return {
+        f"{result['name']}[n={result['n']},k={result['k']}].{metric}": value
+        for result in report["results"]
+        for metric, value in result["metrics"].items()
+    }
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float = 0.25) -> List[Dict]:
+    """
+    Compare un rapport à une référence.
+
+    Seules les mesures présentes dans les deux rapports et dont le sens
+    d'amélioration est connu sont comparées ; la précision est comparée en
+    absolu (toute baisse au-delà de la tolérance divisée par 100 compte).
+
+    Args:
+        report: résultat de `run_benchmarks`
+        baseline: rapport de référence
+        tolerance: dégradation relative tolérée (0.25 = 25 %)
+
+    Returns:
+        Liste des régressions, chacune {"key", "baseline", "current", "change"}
+    """
+    current, reference = _flatten(report), _flatten(baseline)
+    regressions = []
+    for key in sorted(current.keys() & reference.keys()):
+        metric = key.rsplit(".", 1)[1]
+        old, new = reference[key], current[key]
+        if metric == "accuracy":
+            change = new - old
+            regressed = change < -tolerance / 100
+        elif metric in METRIC_DIRECTIONS and old > 0:
+            change = (new - old) / old
+            regressed = change * METRIC_DIRECTIONS[metric] < -tolerance
+        else:
+            continue
+        if regressed:
+            regressions.append({"key": key, "baseline": old, "current": new, "change": change})
+    return regressions
+
+def save_report(report: Dict, path: Union[str, Path]) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+def load_report(path: Union[str, Path]) -> Dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,60 @@
+from typing import Dict, Optional
+import numpy as np
+
+# Facteur de croissance des réserves : le coût d'un ajout reste O(1) amorti par ligne
+GROWTH_FACTOR = 1.5
+
+class RowBuffers:
+    """
+    Réserves à croissance amortie pour des tableaux alignés sur les lignes.
+
+    Le tableau publié (par exemple `index.vectors`) reste un ndarray ordinaire :
+    c'est une vue des n premières lignes d'une réserve plus grande. Ajouter
+    des lignes les écrit dans la place libre de la réserve, qui n'est
+    réallouée (et recopiée) que lorsqu'elle est pleine. Un tableau qui ne
+    provient pas d'une réserve (fourni par fit, projeté en mémoire par load)
+    est recopié une seule fois, au premier ajout.
+
+    Les réserves ne se sérialisent pas : un objet rechargé repart sans réserve.
+    """
+    def __init__(self):
+        self._reserves: Dict[str, np.ndarray] = {}
+
+    def _owns(self, name: str, array: Optional[np.ndarray]) -> bool:
+        reserve = self._reserves.get(name)
+        return reserve is not None and array is not None and array.base is reserve
+
+    def append(self, name: str, array: Optional[np.ndarray], rows: np.ndarray) -> np.ndarray:
+        """
+        Retourne `array` suivi de `rows`, sous la forme d'une vue de la réserve `name`.
+
+        Le type du résultat est celui qui contient les deux (par exemple une
+        chaîne plus longue pour des labels textuels).
+        """
+        n = 0 if array is None else len(array)
+        dtype = rows.dtype if array is None else np.result_type(array.dtype, rows.dtype)
+        reserve = self._reserves.get(name)
+
+        if not self._owns(name, array) or reserve.dtype != dtype or len(reserve) < n + len(rows):
+            capacity = max(n + len(rows), int(n * GROWTH_FACTOR))
+            shape = rows.shape[1:] if array is None else array.shape[1:]
+            grown = np.empty((capacity,) + shape, dtype=dtype)
+            if n:
+                grown[:n] = array
+            reserve = self._reserves[name] = grown
+
+        reserve[n:n + len(rows)] = rows
+        return reserve[:n + len(rows)]
+
+    def writable(self, name: str, array: np.ndarray) -> np.ndarray:
+        """Retourne `array` s'il est modifiable en place, sinon une copie placée en réserve"""
+        if self._owns(name, array) or (array.flags.writeable and array.flags.owndata):
+            return array
+        return self.append(name, None, array)
+
+    def clear(self) -> None:
+        """Oublie les réserves (après une reconstruction ou un compactage)"""
+        self._reserves.clear()
+
+    def __reduce__(self):
+        return (RowBuffers, ())
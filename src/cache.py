@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+class LRUCache:
+    """
+    Cache borné avec éviction de l'entrée la moins récemment utilisée.
+
+    Sûr entre threads. Sérialiser un cache (pickle) ne conserve que sa
+    taille maximale : un modèle enregistré ou envoyé à un processus de
+    travail repart avec un cache vide.
+    """
+    def __init__(self, maxsize: int):
+        if maxsize < 0:
+            raise ValueError("maxsize doit être positif ou nul")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retourne la valeur associée à `key` et la marque comme récemment utilisée"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Ajoute ou remplace une entrée, en évinçant la plus ancienne si le cache est plein"""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vide le cache ; les compteurs sont conservés"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Instantané des compteurs : hits, misses, taille courante et maximale"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __getstate__(self):
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(state["maxsize"])
@@ -55,4 +55,31 @@ class Dataset(ABC):
         """Retourne les données de test et leurs labels"""
         if self.test_data is None:
             raise RuntimeError("Les données de test n'ont pas été chargées")
-        return self.test_data, self.test_labels
\ No newline at end of file
+        return self.test_data, self.test_labels
+
+    def iter_batches(self, split: str, batch_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Parcourt un split par lots successifs, sans le charger en entier.
+
+        Lorsque les données sont projetées en mémoire, chaque lot n'amène en
+        mémoire que ses propres pages : la consommation reste bornée même
+        pour un dataset plus grand que la RAM.
+
+        Args:
+            split: "train" ou "test"
+            batch_size: nombre d'images par lot
+
+        Yields:
+            Tuples (images, labels) d'au plus batch_size éléments
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size doit être supérieur ou égal à 1")
+        if split == "train":
+            data, labels = self.get_train_data()
+        elif split == "test":
+            data, labels = self.get_test_data()
+        else:
+            raise ValueError(f"Split inconnu : {split!r} (attendu : 'train' ou 'test')")
+
+        for start in range(0, len(data), batch_size):
+            yield data[start:start + batch_size], labels[start:start + batch_size]
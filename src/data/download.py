@@ -0,0 +1,263 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+# requests n'est importé qu'au premier téléchargement réel : un cache complet
+# (ou un processus qui ne télécharge jamais) ne le charge pas
+if TYPE_CHECKING:
+    import requests
+
+# Nom du manifeste des empreintes, au format de `sha256sum` (« empreinte  fichier »)
+MANIFEST = "SHA256SUMS"
+
+# Taille des morceaux lus sur le réseau et écrits sur le disque
+CHUNK_BYTES = 1 << 16
+
+Urls = Union[str, Sequence[str]]
+
+class ChecksumError(ValueError):
+    """L'empreinte SHA-256 d'un fichier téléchargé ne correspond pas à celle attendue"""
+
+def sha256_file(path: Union[str, Path], chunk_bytes: int = 1 << 20) -> str:
+    """Empreinte SHA-256 d'un fichier, lue par morceaux"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _range_total(content_range: str) -> Optional[int]:
+    """Taille totale annoncée par un en-tête Content-Range (« bytes */N »), None si inconnue"""
+    total = content_range.rpartition("/")[2].strip()
+    return int(total) if total.isdigit() else None
+
+class DownloadManager:
+    """
+    Télécharge des fichiers dans un répertoire de cache, en parallèle.
+
+    - Les requêtes partagent une session HTTP dont les connexions sont
+      réutilisées (une par thread au plus).
+    - Le corps de chaque réponse est écrit sur le disque par morceaux, dans
+      un fichier `<nom>.part` renommé une fois le téléchargement vérifié :
+      le cache ne contient jamais de fichier tronqué.
+    - Un fichier `.part` laissé par une interruption est repris là où il
+      s'était arrêté avec une requête HTTP Range ; un serveur qui ignore
+      Range renvoie le fichier entier, qui remplace alors le morceau.
+    - Chaque fichier est identifié dans le cache par son nom. Son empreinte
+      SHA-256 est comparée à celle attendue si elle est fournie, puis
+      enregistrée dans le manifeste `SHA256SUMS` : un fichier présent et
+      conforme n'est plus jamais retéléchargé, un fichier corrompu l'est.
+    """
+    def __init__(self, cache_dir: Union[str, Path], max_workers: int = 4,
+                 chunk_bytes: int = CHUNK_BYTES, timeout: float = 30.0, retries: int = 3,
+                 session: Optional["requests.Session"] = None):
+        """
+        Args:
+            cache_dir: répertoire où sont rangés les fichiers
+            max_workers: nombre de téléchargements simultanés
+            chunk_bytes: taille des morceaux écrits sur le disque
+            timeout: délai maximal (s) de connexion et entre deux morceaux reçus
+            retries: nouvelles tentatives après une erreur réseau, chacune
+                reprenant le fichier partiel
+            session: session HTTP à utiliser (créée au premier téléchargement si None)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers doit être supérieur ou égal à 1")
+        if retries < 0:
+            raise ValueError("retries doit être positif ou nul")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.chunk_bytes = chunk_bytes
+        self.timeout = timeout
+        self.retries = retries
+        self._owns_session = session is None
+        self._session = session
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+        self._stats = {"downloads": 0, "cache_hits": 0, "resumed": 0, "retries": 0, "bytes": 0}
+
+    @property
+    def session(self) -> "requests.Session":
+        """Session HTTP partagée, créée (et requests importé) à la première utilisation"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _read_manifest(self) -> Dict[str, str]:
+        path = self.cache_dir / MANIFEST
+        if not path.exists():
+            return {}
+        manifest = {}
+        for line in path.read_text().splitlines():
+            digest, _, filename = line.partition("  ")
+            if filename:
+                manifest[filename] = digest
+        return manifest
+
+    def _record(self, filename: str, digest: str) -> None:
+        """Enregistre une empreinte et réécrit le manifeste de façon atomique"""
+        with self._lock:
+            self._manifest[filename] = digest
+            path = self.cache_dir / MANIFEST
+            temporary = path.with_name(f"{MANIFEST}.{threading.get_ident()}.tmp")
+            temporary.write_text("".join(
+                f"{value}  {name}\n" for name, value in sorted(self._manifest.items())
+            ))
+            os.replace(temporary, path)
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def path(self, filename: str) -> Path:
+        """Emplacement d'un fichier dans le cache"""
+        return self.cache_dir / filename
+
+    def cached(self, filename: str, sha256: Optional[str] = None) -> bool:
+        """
+        Indique si un fichier est présent dans le cache et intègre.
+
+        Le fichier est comparé à `sha256` si elle est fournie, sinon à
+        l'empreinte du manifeste ; sans empreinte connue, sa présence suffit.
+        """
+        path = self.path(filename)
+        if not path.is_file():
+            return False
+        expected = sha256 or self._manifest.get(filename)
+        return expected is None or sha256_file(path) == expected.lower()
+
+    def fetch(self, urls: Urls, filename: Optional[str] = None,
+              sha256: Optional[str] = None) -> Path:
+        """
+        Retourne le chemin d'un fichier du cache, en le téléchargeant au besoin.
+
+        Args:
+            urls: adresse du fichier, ou liste de miroirs essayés dans l'ordre
+            filename: nom du fichier dans le cache (par défaut, la fin de la
+                première adresse)
+            sha256: empreinte attendue ; si elle diffère, ChecksumError
+
+        Raises:
+            ChecksumError: le fichier téléchargé n'a pas l'empreinte attendue
+            requests.RequestException: aucun miroir n'a pu servir le fichier
+        """
+        urls = [urls] if isinstance(urls, str) else list(urls)
+        if not urls:
+            raise ValueError("Au moins une adresse est nécessaire")
+        filename = filename or urls[0].rstrip("/").split("/")[-1]
+
+        if self.cached(filename, sha256):
+            self._count("cache_hits")
+            return self.path(filename)
+
+        from requests import RequestException
+
+        part = self.path(filename + ".part")
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count("retries")
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+            for url in urls:
+                try:
+                    digest = self._stream(url, part)
+                    break
+                except RequestException as exc:
+                    error = exc
+            else:
+                continue
+
+            if sha256 is not None and digest != sha256.lower():
+                part.unlink()
+                raise ChecksumError(
+                    f"{filename} : empreinte SHA-256 {digest}, attendue {sha256.lower()}"
+                )
+            os.replace(part, self.path(filename))
+            self._record(filename, digest)
+            self._count("downloads")
+            return self.path(filename)
+        raise error
+
+    def _stream(self, url: str, part: Path) -> str:
+        """
+        Télécharge `url` dans `part`, en reprenant son contenu éventuel.
+
+        Returns:
+            Empreinte SHA-256 du fichier complet
+        """
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416 and offset:
+                # Le morceau n'est complet que si sa taille est celle annoncée
+                # (« Content-Range: bytes */N ») ; plus long ou de taille
+                # inconnue, il est recommencé depuis le début
+                if _range_total(response.headers.get("Content-Range", "")) == offset:
+                    return sha256_file(part)
+                response.close()
+                part.unlink()
+                return self._stream(url, part)
+            response.raise_for_status()
+
+            resumed = response.status_code == 206 and response.headers.get(
+                "Content-Range", ""
+            ).startswith(f"bytes {offset}-")
+            digest = hashlib.sha256()
+            if resumed:
+                self._count("resumed")
+                with open(part, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+
+            # Sans reprise (serveur ignorant Range), le morceau est réécrit depuis le début
+            with open(part, "ab" if resumed else "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_bytes):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    self._count("bytes", len(chunk))
+        return digest.hexdigest()
+
+    def fetch_all(self, files: Iterable[Tuple[Urls, Optional[str], Optional[str]]]) -> Dict[str, Path]:
+        """
+        Télécharge plusieurs fichiers simultanément.
+
+        Args:
+            files: triplets (adresse ou miroirs, nom dans le cache, empreinte
+                attendue), les deux derniers pouvant valoir None
+
+        Returns:
+            Dictionnaire nom du fichier -> chemin dans le cache
+        """
+        files = list(files)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(files)))) as executor:
+            paths = list(executor.map(lambda item: self.fetch(*item), files))
+        return {path.name: path for path in paths}
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs : fichiers téléchargés, trouvés en cache, repris, nouvelles tentatives, octets reçus"""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """Ferme les connexions de la session, si elle a été créée par le gestionnaire"""
+        if self._owns_session and self._session is not None:
+            self._session.close()
+
+    def __enter__(self) -> "DownloadManager":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
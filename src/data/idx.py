@@ -0,0 +1,97 @@
+import gzip
+import os
+from pathlib import Path
+from typing import Iterator, Tuple, Union
+import numpy as np
+
+# Code de type des fichiers IDX (troisième octet du nombre magique) -> dtype big-endian
+IDX_DTYPES = {
+    0x08: np.dtype(np.uint8),
+    0x09: np.dtype(np.int8),
+    0x0B: np.dtype('>i2'),
+    0x0C: np.dtype('>i4'),
+    0x0D: np.dtype('>f4'),
+    0x0E: np.dtype('>f8'),
+}
+
+# Taille visée pour chaque morceau décompressé
+CHUNK_BYTES = 1 << 20
+
+def read_idx_header(f) -> Tuple[np.dtype, Tuple[int, ...]]:
+    """
+    Lit l'en-tête d'un flux IDX.
+
+    Le nombre magique est composé de deux octets nuls, du code de type puis
+    du nombre de dimensions ; suivent les tailles, en entiers 32 bits big-endian.
+
+    Returns:
+        Tuple (dtype, forme)
+    """
+    magic = f.read(4)
+    if len(magic) != 4 or magic[:2] != b'\x00\x00' or magic[2] not in IDX_DTYPES:
+        raise ValueError("En-tête IDX invalide")
+    n_dims = magic[3]
+    shape = tuple(int.from_bytes(f.read(4), 'big') for _ in range(n_dims))
+    return IDX_DTYPES[magic[2]], shape
+
+def iter_idx_chunks(path: Union[str, Path], chunk_bytes: int = CHUNK_BYTES) -> Iterator[np.ndarray]:
+    """
+    Décompresse un fichier IDX gzip morceau par morceau.
+
+    Chaque morceau contient un nombre entier d'éléments selon le premier axe
+    (images ou labels) ; la mémoire utilisée reste bornée par `chunk_bytes`.
+    """
+    with gzip.open(path, 'rb') as f:
+        dtype, shape = read_idx_header(f)
+        item_shape = shape[1:]
+        item_bytes = dtype.itemsize * int(np.prod(item_shape, dtype=np.int64))
+        items_per_chunk = max(1, chunk_bytes // max(1, item_bytes))
+
+        remaining = shape[0]
+        while remaining:
+            count = min(items_per_chunk, remaining)
+            buf = f.read(count * item_bytes)
+            if len(buf) != count * item_bytes:
+                raise ValueError(f"Fichier IDX tronqué : {path}")
+            yield np.frombuffer(buf, dtype=dtype).reshape((count,) + item_shape)
+            remaining -= count
+
+def idx_to_npy(path: Union[str, Path], destination: Union[str, Path],
+               dtype=np.float32, divisor: float = 1.0,
+               chunk_bytes: int = CHUNK_BYTES) -> np.memmap:
+    """
+    Convertit un fichier IDX gzip en fichier .npy sans jamais le charger en entier.
+
+    Les morceaux décompressés sont écrits directement dans un tableau
+    `np.memmap` préalloué ; le fichier est écrit sous un nom temporaire puis
+    renommé, de sorte qu'un cache interrompu n'est jamais pris pour un cache valide.
+
+    Args:
+        path: fichier IDX compressé
+        destination: fichier .npy à créer
+        dtype: type des données écrites
+        divisor: diviseur appliqué à chaque valeur (255 pour normaliser des pixels)
+
+    Returns:
+        Le tableau écrit, projeté en mémoire en lecture seule
+    """
+    destination = Path(destination)
+    temporary = destination.with_name(destination.name + '.tmp')
+
+    with gzip.open(path, 'rb') as f:
+        _, shape = read_idx_header(f)
+    output = np.lib.format.open_memmap(temporary, mode='w+', dtype=dtype, shape=shape)
+
+    start = 0
+    for chunk in iter_idx_chunks(path, chunk_bytes):
+        target = output[start:start + len(chunk)]
+        if divisor == 1.0:
+            target[...] = chunk
+        else:
+            np.divide(chunk, divisor, out=target, dtype=dtype)
+        start += len(chunk)
+
+    output.flush()
+    del output
+    os.replace(temporary, destination)
+    return np.load(destination, mmap_mode='r')
@@ -1,9 +1,9 @@
-import gzip
 import numpy as np
-import requests
 from pathlib import Path
 from typing import Dict, Tuple
 from .dataset import Dataset
+from .download import DownloadManager
+from .idx import idx_to_npy
 
 class MNISTDataset(Dataset):
     """
@@ -15,97 +15,101 @@ class MNISTDataset(Dataset):
     - Images en 28x28 pixels, niveaux de gris (0-255)
     """
     
-    # URLs officielles des fichiers MNIST
+    # Adresses des fichiers MNIST ; le site d'origine sert de miroir de secours
     URLS: Dict[str, str] = {
-        'train_images': 'http://yann.lecun.com/exdb/mnist/train-images-idx3-ubyte.gz',
-        'train_labels': 'http://yann.lecun.com/exdb/mnist/train-labels-idx1-ubyte.gz',
-        'test_images': 'http://yann.lecun.com/exdb/mnist/t10k-images-idx3-ubyte.gz',
-        'test_labels': 'http://yann.lecun.com/exdb/mnist/t10k-labels-idx1-ubyte.gz'
+        'train_images': 'https://ossci-datasets.s3.amazonaws.com/mnist/train-images-idx3-ubyte.gz',
+        'train_labels': 'https://ossci-datasets.s3.amazonaws.com/mnist/train-labels-idx1-ubyte.gz',
+        'test_images': 'https://ossci-datasets.s3.amazonaws.com/mnist/t10k-images-idx3-ubyte.gz',
+        'test_labels': 'https://ossci-datasets.s3.amazonaws.com/mnist/t10k-labels-idx1-ubyte.gz'
     }
+    MIRRORS: Tuple[str, ...] = ('http://yann.lecun.com/exdb/mnist/',)
+
+    # Empreintes SHA-256 attendues, par nom de fichier : un fichier qui en
+    # diffère est rejeté. Sans entrée, l'empreinte du premier téléchargement
+    # est enregistrée dans SHA256SUMS et vérifiée ensuite
+    SHA256: Dict[str, str] = {
+        'train-images-idx3-ubyte.gz': '440fcabf73cc546fa21475e81ea370265605f56be210a4024d2ca8f203523609',
+        'train-labels-idx1-ubyte.gz': '3552534a0a558bbed6aed32b30c495cca23d567ec52cac8be1a0730e8010255c',
+        't10k-images-idx3-ubyte.gz': '8d422c7b0a1c1c79245a5bcf07fe86e33eeafee792b84584aec276f5a2dbc4e6',
+        't10k-labels-idx1-ubyte.gz': 'f7ae60f92e00ec6debd23a6088c31dbd2371eca3ffa0defaefb259924204aec6',
+    }
+
+    @classmethod
+    def _filename(cls, name: str) -> str:
+        """Nom du fichier brut dans le cache (celui de l'adresse, après le dernier /)"""
+        return cls.URLS[name].split('/')[-1]
 
     def _check_exists(self) -> bool:
-        """Vérifie si tous les fichiers MNIST sont déjà téléchargés"""
-        # Extrait les noms de fichiers des URLs (après le dernier /)
-        expected_files = [url.split('/')[-1] for url in self.URLS.values()]
-        
-        files_exist = all(
-            (self.data_dir / filename).exists()
-            for filename in expected_files
-        )
-        return files_exist and (
-            self.train_data is not None or 
-            (self.data_dir / "processed").exists()
-        )
+        """Vérifie si le cache converti ou tous les fichiers MNIST bruts sont présents"""
+        processed_dir = self.data_dir / "processed"
+        if all((processed_dir / f"{name}.npy").exists() for name in self.URLS):
+            return True
+        return all((self.data_dir / self._filename(name)).exists() for name in self.URLS)
 
     def _download(self) -> None:
-        """Télécharge les fichiers MNIST compressés"""
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        
+        """
+        Télécharge les fichiers MNIST compressés, simultanément.
+
+        Les fichiers déjà présents et intègres ne sont pas retéléchargés ;
+        un téléchargement interrompu reprend là où il s'était arrêté.
+        """
+        files = []
         for name, url in self.URLS.items():
-            print(f"Téléchargement de {name}...")
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            file_path = self.data_dir / f"{name}.gz"
-            with open(file_path, "wb") as f:
-                f.write(response.content)
-            print(f"Sauvegardé dans {file_path}")
+            filename = self._filename(name)
+            mirrors = [url] + [base + filename for base in self.MIRRORS]
+            files.append((mirrors, filename, self.SHA256.get(filename)))
+
+        print(f"Téléchargement de MNIST dans {self.data_dir}...")
+        with DownloadManager(self.data_dir) as manager:
+            manager.fetch_all(files)
+            stats = manager.stats()
+        print(f"{stats['downloads']} fichier(s) téléchargé(s), {stats['cache_hits']} déjà en cache")
 
     def _load_data(self) -> None:
-        """Charge et prétraite les données MNIST"""
-        processed_dir = self.data_dir / "processed"
-        if processed_dir.exists():
-            # Charger les données prétraitées si elles existent
-            self.train_data = np.load(processed_dir / "train_images.npy")
-            self.train_labels = np.load(processed_dir / "train_labels.npy")
-            self.test_data = np.load(processed_dir / "test_images.npy")
-            self.test_labels = np.load(processed_dir / "test_labels.npy")
-            return
+        """
+        Charge les données MNIST depuis le cache `processed/`, en le créant au besoin.
 
-        # Charger et prétraiter les données brutes
-        self.train_data, self.train_labels = self._read_mnist_files("train")
-        self.test_data, self.test_labels = self._read_mnist_files("test")
+        Les tableaux sont projetés en mémoire (mmap) : seules les pages
+        réellement lues sont chargées.
+        """
+        processed_dir = self.data_dir / "processed"
+        names = ["train_images", "train_labels", "test_images", "test_labels"]
+        if not all((processed_dir / f"{name}.npy").exists() for name in names):
+            # Convertir les fichiers bruts directement dans le cache, sans copie intermédiaire
+            processed_dir.mkdir(exist_ok=True)
+            self._read_mnist_files("train")
+            self._read_mnist_files("test")
 
-        # Sauvegarder les données prétraitées
-        processed_dir.mkdir(exist_ok=True)
-        np.save(processed_dir / "train_images.npy", self.train_data)
-        np.save(processed_dir / "train_labels.npy", self.train_labels)
-        np.save(processed_dir / "test_images.npy", self.test_data)
-        np.save(processed_dir / "test_labels.npy", self.test_labels)
+        self.train_data = np.load(processed_dir / "train_images.npy", mmap_mode='r')
+        self.train_labels = np.load(processed_dir / "train_labels.npy", mmap_mode='r')
+        self.test_data = np.load(processed_dir / "test_images.npy", mmap_mode='r')
+        self.test_labels = np.load(processed_dir / "test_labels.npy", mmap_mode='r')
 
     def _read_mnist_files(self, dataset: str) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Lit les fichiers MNIST compressés et retourne les images et labels.
+        Décompresse les fichiers MNIST par morceaux et les écrit dans le cache `processed/`.
+
+        Les images sont normalisées morceau par morceau directement dans un
+        fichier .npy préalloué : la mémoire utilisée reste bornée quelle que
+        soit la taille du dataset.
         
         Args:
             dataset: "train" ou "test"
             
         Returns:
-            Tuple contenant (images, labels)
+            Tuple contenant (images, labels), projetés en mémoire
             - images: numpy array de forme (N, 28, 28) normalisé entre 0 et 1
             - labels: numpy array de forme (N,) contenant les chiffres (0-9)
         """
-        # Charger les images
-        with gzip.open(self.data_dir / f"{dataset}_images.gz", 'rb') as f:
-            # Les premiers octets sont l'en-tête
-            _ = int.from_bytes(f.read(4), 'big')  # Magic number
-            n_images = int.from_bytes(f.read(4), 'big')
-            n_rows = int.from_bytes(f.read(4), 'big')
-            n_cols = int.from_bytes(f.read(4), 'big')
-            
-            # Lire toutes les images
-            buf = f.read()
-            images = np.frombuffer(buf, dtype=np.uint8)
-            images = images.reshape(n_images, n_rows, n_cols)
-            images = images.astype(np.float32) / 255.0  # Normalisation
-
-        # Charger les labels
-        with gzip.open(self.data_dir / f"{dataset}_labels.gz", 'rb') as f:
-            _ = int.from_bytes(f.read(4), 'big')  # Magic number
-            n_labels = int.from_bytes(f.read(4), 'big')
-            
-            # Lire tous les labels
-            buf = f.read()
-            labels = np.frombuffer(buf, dtype=np.uint8)
-
-        return images, labels
\ No newline at end of file
+        processed_dir = self.data_dir / "processed"
+        images = idx_to_npy(
+            self.data_dir / self._filename(f"{dataset}_images"),
+            processed_dir / f"{dataset}_images.npy",
+            dtype=np.float32, divisor=255.0,  # Normalisation
+        )
+        labels = idx_to_npy(
+            self.data_dir / self._filename(f"{dataset}_labels"),
+            processed_dir / f"{dataset}_labels.npy",
+            dtype=np.uint8,
+        )
+        return images, labels
@@ -0,0 +1,538 @@
+"""
+Recherche répartie sur plusieurs machines : un coordinateur et des workers.
+
+Chaque worker charge un modèle enregistré avec save() et ne garde qu'une
+tranche contiguë de ses lignes d'entraînement (son shard), sur laquelle il
+construit son propre index. Le coordinateur prétraite les requêtes une
+seule fois, diffuse chaque bloc à tous les workers, fusionne leurs k
+meilleurs voisins partiels (distance, ligne) puis vote localement.
+
+Protocole (TCP, sans pickle) : chaque message est un en-tête JSON précédé
+de sa longueur sur 4 octets, suivi des octets bruts des tableaux numériques
+qu'il décrit (dtype, forme).
+
+Exemples :
+    python -m src.distributed worker --model models/mnist --shard 0 --shards 4 --port 9000
+    python -m src.distributed scaling --model models/mnist --images test.npy --workers 1 2 4
+"""
+import argparse
+import json
+import select
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .index import QuantizedIndex
+from .knn import ImageClassifier
+
+# Taille maximale de l'en-tête JSON et d'un tableau d'un message
+MAX_HEADER_BYTES = 64 * 1024
+MAX_ARRAY_BYTES = 1 << 30
+# Seuls des tableaux numériques transitent : booléens, entiers, flottants
+_ARRAY_KINDS = "biuf"
+
+STRAGGLER_POLICIES = ("fail", "partial")
+
+Address = Tuple[str, int]
+
+class ProtocolError(ValueError):
+    """Message mal formé ou refusé"""
+
+class WorkerError(RuntimeError):
+    """Un worker a échoué, n'a pas répondu à temps ou est injoignable"""
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Connexion fermée par le pair")
+        received += n
+    return buffer
+
+def send_message(sock: socket.socket, header: Dict, arrays: Sequence[np.ndarray] = ()) -> None:
+    """Envoie un en-tête JSON et des tableaux numériques, sans sérialisation Python"""
+    arrays = [np.ascontiguousarray(array) for array in arrays]
+    for array in arrays:
+        if array.dtype.kind not in _ARRAY_KINDS:
+            raise ProtocolError(f"Type de tableau non transmissible : {array.dtype}")
+    header = dict(header, arrays=[[array.dtype.str, list(array.shape)] for array in arrays])
+    encoded = json.dumps(header).encode()
+    sock.sendall(len(encoded).to_bytes(4, "big") + encoded)
+    for array in arrays:
+        sock.sendall(memoryview(array).cast("B"))
+
+def recv_message(sock: socket.socket) -> Tuple[Dict, List[np.ndarray]]:
+    """
+    Reçoit un message envoyé par `send_message`.
+
+    Raises:
+        ProtocolError: Si l'en-tête ou la description d'un tableau est invalide
+        ConnectionError: Si la connexion est fermée au milieu du message
+    """
+    size = int.from_bytes(_recv_exactly(sock, 4), "big")
+    if size > MAX_HEADER_BYTES:
+        raise ProtocolError(f"En-tête trop long : {size} octets")
+    try:
+        header = json.loads(_recv_exactly(sock, size))
+        descriptions = header.pop("arrays", [])
+        arrays = []
+        for dtype, shape in descriptions:
+            dtype = np.dtype(dtype)
+            if dtype.kind not in _ARRAY_KINDS or any(int(n) < 0 for n in shape):
+                raise ProtocolError(f"Tableau refusé : {dtype}, {shape}")
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            if nbytes > MAX_ARRAY_BYTES:
+                raise ProtocolError(f"Tableau trop grand : {nbytes} octets")
+            arrays.append((dtype, tuple(int(n) for n in shape), nbytes))
+    except (TypeError, ValueError) as error:
+        if isinstance(error, ProtocolError):
+            raise
+        raise ProtocolError(f"En-tête invalide : {error}") from error
+    return header, [
+        np.frombuffer(_recv_exactly(sock, nbytes), dtype=dtype).reshape(shape)
+        for dtype, shape, nbytes in arrays
+    ]
+
+def shard_bounds(n_rows: int, shard: int, n_shards: int) -> Tuple[int, int]:
+    """Lignes [start, stop) du shard `shard` parmi `n_shards` tranches contiguës de tailles égales à une ligne près"""
+    if not 0 <= shard < n_shards:
+        raise ValueError("shard doit être compris entre 0 et n_shards - 1")
+    return n_rows * shard // n_shards, n_rows * (shard + 1) // n_shards
+
+class ShardWorker:
+    """
+    Worker propriétaire d'un shard d'un modèle entraîné.
+
+    Le modèle est rechargé par projection en mémoire et l'index local est
+    construit à partir des seules lignes du shard, découpées avant toute
+    conversion : seules leurs pages sont lues. Les lignes supprimées (remove)
+    sont écartées ; l'index local est du même type que celui du modèle et les
+    indices retournés sont ceux des lignes du modèle complet.
+
+    Pour un modèle quantifié (storage "uint8" ou "int8"), le shard reprend
+    les codes et la quantification du modèle complet au lieu d'ajuster la
+    sienne : les distances de tous les shards sont à la même échelle et leur
+    fusion donne exactement les voisins du modèle complet.
+    """
+    def __init__(self, model_path: Union[str, Path], shard: int = 0, n_shards: int = 1):
+        classifier = ImageClassifier.load(model_path)
+        index = classifier._index
+        self.shard, self.n_shards = shard, n_shards
+        self.start, self.stop = shard_bounds(index.n_rows, shard, n_shards)
+        rows = np.arange(self.start, self.stop)
+        if index.n_deleted:
+            rows = rows[~index.tombstones[self.start:self.stop]]
+        # Lignes du modèle complet, dans l'ordre des lignes de l'index local
+        self.rows = rows
+
+        self.classifier = classifier._clone()
+        self.classifier.n_jobs = 1
+        if isinstance(index, QuantizedIndex):
+            self.classifier._attach_index(index.take(rows), classifier.labels[rows])
+        else:
+            vectors = np.ascontiguousarray(index.stored_vectors()[rows], dtype=np.float32)
+            self.classifier._fit_vectors(vectors, classifier.labels[rows])
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """k plus proches voisins du shard (moins s'il est plus petit), indices du modèle complet"""
+        k = min(k, len(self.rows))
+        if k == 0:
+            return np.empty((len(queries), 0), np.float32), np.empty((len(queries), 0), np.int64)
+        distances, indices = self.classifier._index.search(queries, k)
+        return distances.astype(np.float32, copy=False), self.rows[indices].astype(np.int64)
+
+    def handle(self, header: Dict, arrays: List[np.ndarray]) -> Tuple[Dict, List[np.ndarray]]:
+        """Traite une requête du coordinateur ; retourne la réponse (en-tête, tableaux)"""
+        op = header.get("op")
+        if op == "info":
+            return {
+                "shard": self.shard, "n_shards": self.n_shards,
+                "start": self.start, "stop": self.stop, "rows": len(self.rows),
+            }, []
+        if op == "search":
+            if len(arrays) != 1 or arrays[0].ndim != 2:
+                raise ProtocolError("search attend une matrice (Q, D) de requêtes")
+            queries = np.ascontiguousarray(arrays[0], dtype=np.float32)
+            return {}, list(self.search(queries, int(header["k"])))
+        raise ProtocolError(f"Opération inconnue : {op!r}")
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "WorkerServer":
+        """Démarre l'écoute TCP (port 0 pour un port libre) ; voir WorkerServer.address"""
+        return WorkerServer(self, (host, port))
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                header, arrays = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            except ProtocolError as error:
+                # Le flux n'est plus synchronisé : répondre puis fermer
+                send_message(self.request, {"error": str(error)})
+                return
+            try:
+                response, results = self.server.worker.handle(header, arrays)
+            except Exception as error:
+                response, results = {"error": f"{type(error).__name__}: {error}"}, []
+            try:
+                send_message(self.request, response, results)
+            except OSError:
+                return
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """Serveur TCP d'un ShardWorker : une connexion par coordinateur, traitée dans son thread"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, worker: ShardWorker, address: Address):
+        self.worker = worker
+        super().__init__(address, _WorkerHandler)
+
+    @property
+    def address(self) -> Address:
+        return self.server_address[:2]
+
+class _Connection:
+    """
+    Connexion du coordinateur à un worker, rouverte après une erreur ou un
+    dépassement de délai.
+
+    Une requête en retard peut encore s'exécuter quand le bloc suivant
+    commence : les requêtes passent une à une, et une requête qui échoue ne
+    ferme que la socket qu'elle a utilisée, jamais celle d'une requête plus récente.
+    """
+    def __init__(self, address: Address, connect_timeout: float):
+        self.address = (address[0], int(address[1]))
+        self.connect_timeout = connect_timeout
+        self._sock = None
+        self._lock = threading.Lock()
+        self.requests = self.failures = self.timeouts = 0
+        self.total_s = self.max_s = 0.0
+
+    def request(self, header, arrays, timeout):
+        with self._lock:
+            start = time.perf_counter()
+            sock = self._sock
+            try:
+                if sock is None:
+                    sock = socket.create_connection(self.address, self.connect_timeout)
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    self._sock = sock
+                sock.settimeout(timeout)
+                send_message(sock, header, arrays)
+                response, results = recv_message(sock)
+            except BaseException:
+                self._close(sock)
+                raise
+        if "error" in response:
+            raise WorkerError(f"Worker {self.address[0]}:{self.address[1]} : {response['error']}")
+        elapsed = time.perf_counter() - start
+        self.requests += 1
+        self.total_s += elapsed
+        self.max_s = max(self.max_s, elapsed)
+        return response, results
+
+    def reset(self):
+        """Ferme la socket courante ; débloque aussi un thread en attente de la réponse"""
+        self._close(self._sock)
+
+    def _close(self, sock):
+        """Ferme `sock`, et ne l'oublie que si c'est encore la socket courante"""
+        if sock is None:
+            return
+        if self._sock is sock:
+            self._sock = None
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def stats(self):
+        return {
+            "address": f"{self.address[0]}:{self.address[1]}",
+            "requests": self.requests, "failures": self.failures, "timeouts": self.timeouts,
+            "mean_ms": 1000 * self.total_s / self.requests if self.requests else 0.0,
+            "max_ms": 1000 * self.max_s,
+        }
+
+class DistributedClassifier:
+    """
+    Coordinateur : classe des images à l'aide de workers qui se partagent
+    les lignes d'entraînement d'un même modèle.
+
+    Chaque bloc de `block_size` requêtes est prétraité ici, envoyé à tous
+    les workers en parallèle, puis leurs k meilleurs voisins partiels sont
+    fusionnés (distance croissante, puis numéro de ligne) : le résultat est
+    celui d'une recherche exacte sur le modèle complet. Le vote reprend la
+    pondération et le départage du classificateur.
+
+    Un worker qui ne répond pas dans `timeout` secondes est un retardataire :
+    avec straggler_policy="fail", le bloc échoue (WorkerError) ; avec
+    "partial", le bloc est classé avec les voisins des workers qui ont
+    répondu, et stats() compte ces blocs partiels. Sa connexion est rouverte
+    au bloc suivant.
+    """
+    def __init__(self, classifier: ImageClassifier, workers: Sequence[Address],
+                 timeout: float = 10.0, straggler_policy: str = "fail",
+                 connect_timeout: float = 5.0):
+        """
+        Args:
+            classifier: le modèle chargé par les workers (ImageClassifier.load
+                suffit : ses vecteurs ne sont pas lus ici), pour le
+                prétraitement, les labels et le vote
+            workers: adresses (hôte, port) des workers, un par shard
+            timeout: délai maximal de réponse de chaque worker, par bloc
+            straggler_policy: "fail" ou "partial"
+            connect_timeout: délai maximal d'établissement d'une connexion
+        """
+        if classifier._index is None:
+            raise ValueError("Le classificateur doit d'abord être entraîné avec fit()")
+        if not workers:
+            raise ValueError("Au moins un worker est nécessaire")
+        if straggler_policy not in STRAGGLER_POLICIES:
+            raise ValueError(
+                f"Politique inconnue : {straggler_policy!r}. Valeurs possibles : {', '.join(STRAGGLER_POLICIES)}"
+            )
+        self.classifier = classifier
+        self.timeout = timeout
+        self.straggler_policy = straggler_policy
+        self._connections = [_Connection(address, connect_timeout) for address in workers]
+        self._executor = ThreadPoolExecutor(max_workers=len(workers), thread_name_prefix="knn-fanout")
+        # Un seul bloc à la fois sur les connexions
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.partial_batches = 0
+
+    def _fan_out(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Envoie un bloc à tous les workers et rassemble les réponses arrivées à temps"""
+        futures = {
+            self._executor.submit(connection.request, {"op": "search", "k": k}, [queries], self.timeout):
+                connection
+            for connection in self._connections
+        }
+        done, late = wait(futures, timeout=self.timeout)
+        results, errors = [], []
+        for future in late:
+            connection = futures[future]
+            connection.timeouts += 1
+            connection.reset()
+            errors.append(f"{connection.address[0]}:{connection.address[1]} : pas de réponse en {self.timeout} s")
+        for future in done:
+            connection = futures[future]
+            try:
+                results.append(future.result()[1])
+            except socket.timeout:
+                # Délai de la socket écoulé juste avant celui de wait : un retard aussi
+                connection.timeouts += 1
+                errors.append(f"{connection.address[0]}:{connection.address[1]} : pas de réponse en {self.timeout} s")
+            except Exception as error:
+                connection.failures += 1
+                errors.append(f"{connection.address[0]}:{connection.address[1]} : {error}")
+
+        self.batches += 1
+        if errors:
+            if self.straggler_policy == "fail" or not results:
+                raise WorkerError("; ".join(errors))
+            self.partial_batches += 1
+        return results
+
+    def _search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        instrumentation = self.classifier.instrumentation
+        with self._lock, instrumentation.timer("distance", len(queries)):
+            results = self._fan_out(queries, k)
+        with instrumentation.timer("selection", len(queries)):
+            distances = np.concatenate([d for d, _ in results], axis=1)
+            indices = np.concatenate([i for _, i in results], axis=1)
+            # Distance croissante, puis numéro de ligne : fusion indépendante de l'ordre des réponses
+            order = np.lexsort((indices, distances), axis=-1)[:, :k]
+            rows = np.arange(len(distances))[:, np.newaxis]
+            return distances[rows, order], indices[rows, order].astype(np.intp)
+
+    def kneighbors(self, images, k: Optional[int] = None, return_distance: bool = True):
+        """k plus proches voisins, comme ImageClassifier.kneighbors, recherchés par les workers"""
+        k = self.classifier.k if k is None else k
+        blocks = [
+            self._search(queries, k) for queries in self.classifier._query_blocks(images, k)
+        ]
+        if blocks:
+            distances = np.concatenate([d for d, _ in blocks])
+            indices = np.concatenate([i for _, i in blocks])
+        else:
+            distances = np.empty((0, k), dtype=np.float32)
+            indices = np.empty((0, k), dtype=np.intp)
+        return (distances, indices) if return_distance else indices
+
+    def predict_batch(self, images) -> np.ndarray:
+        """Catégories prédites, comme ImageClassifier.predict_batch"""
+        classifier = self.classifier
+        codes = []
+        for queries in classifier._query_blocks(images, classifier.k):
+            distances, indices = self._search(queries, classifier.k)
+            # Un bloc partiel peut avoir moins de k voisins
+            codes.append(classifier._vote(classifier._label_codes[indices], distances))
+        if not codes:
+            return classifier.classes_[:0]
+        return classifier.classes_[np.concatenate(codes)]
+
+    def workers_info(self) -> List[Dict]:
+        """Shard (lignes start:stop, nombre de lignes actives) de chaque worker"""
+        with self._lock:
+            return [connection.request({"op": "info"}, [], self.timeout)[0]
+                    for connection in self._connections]
+
+    def stats(self) -> Dict:
+        """Blocs traités, blocs partiels, et par worker : requêtes, échecs, délais dépassés, latences"""
+        return {
+            "batches": self.batches,
+            "partial_batches": self.partial_batches,
+            "workers": [connection.stats() for connection in self._connections],
+        }
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.reset()
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class LocalWorkers:
+    """
+    Lance `n_shards` workers dans des processus locaux, par exemple pour
+    les tests ou pour mesurer le passage à l'échelle sur une machine.
+    Chaque processus est lancé comme sur un autre noeud :
+    python -m src.distributed worker ...
+    """
+    def __init__(self, model_path: Union[str, Path], n_shards: int, host: str = "127.0.0.1",
+                 start_timeout: float = 60.0):
+        self.processes = []
+        self.addresses: List[Address] = []
+        root = Path(__file__).resolve().parent.parent
+        try:
+            for shard in range(n_shards):
+                process = subprocess.Popen(
+                    [sys.executable, "-m", "src.distributed", "worker", "--model", str(model_path),
+                     "--shard", str(shard), "--shards", str(n_shards), "--host", host, "--port", "0"],
+                    cwd=root, stdout=subprocess.PIPE, text=True,
+                )
+                self.processes.append(process)
+            for process in self.processes:
+                self.addresses.append(self._wait_ready(process, start_timeout))
+        except BaseException:
+            self.close()
+            raise
+
+    @staticmethod
+    def _wait_ready(process, timeout) -> Address:
+        """Lit la ligne « listening hôte port » écrite par le worker une fois prêt"""
+        ready, _, _ = select.select([process.stdout], [], [], timeout)
+        line = process.stdout.readline() if ready else ""
+        if not line.startswith("listening "):
+            raise WorkerError(f"Le worker n'a pas démarré (code {process.poll()})")
+        _, host, port = line.split()
+        return host, int(port)
+
+    def close(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.wait()
+            process.stdout.close()
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def scaling_report(model_path: Union[str, Path], images, worker_counts: Sequence[int] = (1, 2, 4),
+                   repeats: int = 3, **options) -> List[Dict]:
+    """
+    Mesure le débit de predict_batch en fonction du nombre de workers locaux.
+
+    Args:
+        model_path: modèle enregistré avec save()
+        images: images requêtes
+        worker_counts: nombres de workers à essayer
+        repeats: nombre de mesures par configuration (la meilleure est gardée)
+        **options: paramètres de DistributedClassifier (timeout...)
+
+    Returns:
+        Une ligne par configuration : workers, qps, speedup (par rapport à la
+        première), efficiency (speedup rapporté au nombre de workers relatif)
+    """
+    classifier = ImageClassifier.load(model_path)
+    rows = []
+    for n_workers in worker_counts:
+        with LocalWorkers(model_path, n_workers) as local, \
+                DistributedClassifier(classifier, local.addresses, **options) as distributed:
+            distributed.predict_batch(images[:classifier.block_size])
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                distributed.predict_batch(images)
+                best = min(best, time.perf_counter() - start)
+        rows.append({"workers": n_workers, "qps": len(images) / best})
+
+    base = rows[0]
+    for row in rows:
+        row["speedup"] = row["qps"] / base["qps"]
+        row["efficiency"] = row["speedup"] * base["workers"] / row["workers"]
+    return rows
+
+def format_scaling(rows: List[Dict]) -> str:
+    """Tableau texte d'un rapport de scaling_report"""
+    lines = [f"{'workers':>7}  {'req/s':>9}  {'accél.':>6}  {'efficacité':>10}"]
+    lines += [
+        f"{row['workers']:7d}  {row['qps']:9.0f}  {row['speedup']:6.2f}  {row['efficiency']:10.1%}"
+        for row in rows
+    ]
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("worker", help="sert un shard d'un modèle enregistré")
+    worker.add_argument("--model", required=True, help="répertoire du modèle enregistré")
+    worker.add_argument("--shard", type=int, default=0)
+    worker.add_argument("--shards", type=int, default=1, help="nombre total de shards")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=9000, help="0 pour un port libre")
+    scaling = commands.add_parser("scaling", help="mesure le passage à l'échelle en workers locaux")
+    scaling.add_argument("--model", required=True)
+    scaling.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    scaling.add_argument("--images", required=True, help="fichier .npy des images requêtes (N, H, W)")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        server = ShardWorker(args.model, args.shard, args.shards).serve(args.host, args.port)
+        host, port = server.address
+        print(f"listening {host} {port}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        images = np.load(args.images, allow_pickle=False)
+        print(format_scaling(scaling_report(args.model, images, args.workers)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Évaluation et inférence en flux, pour des jeux de test de taille quelconque.
+
+Trois étages se recouvrent : le parcours de l'entrée (lots d'un Dataset,
+répertoire d'images), le décodage et le prétraitement, répartis sur un pool
+de threads, et la recherche des voisins, faite par blocs dans le thread
+appelant. Une file bornée relie les deux premiers étages au dernier : au
+plus `max_pending` blocs prétraités attendent la recherche, si bien que la
+mémoire ne dépend que de la taille des blocs, jamais de celle de l'entrée.
+
+Usage :
+    report = stream_evaluate(classifier, iter_image_folder("test/"))
+    report["accuracy"], report["confusion_matrix"], report["errors"]
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+from .knn import _as_array_batch
+from .parallel import effective_n_jobs
+
+# Fin du flux, transmise par l'étage de lecture
+_END = object()
+
+# Intervalle auquel un étage bloqué sur la file vérifie l'ordre d'arrêt (secondes)
+_POLL_INTERVAL = 0.1
+
+def iter_image_folder(directory, batch_size: int = 256,
+                      extensions: Tuple[str, ...] = (".png",)) -> Iterator[Tuple[list, list]]:
+    """
+    Parcourt un répertoire rangé par classe (`directory/<label>/*.png`).
+
+    Les sous-répertoires et leurs fichiers sont lus dans l'ordre
+    alphabétique ; un nom de classe composé de chiffres devient un entier,
+    comme les labels MNIST.
+
+    Args:
+        directory: répertoire racine
+        batch_size: nombre de chemins par lot
+        extensions: extensions retenues (insensibles à la casse)
+
+    Yields:
+        Tuples (chemins, labels) d'au plus batch_size éléments
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size doit être supérieur ou égal à 1")
+    with os.scandir(directory) as entries:
+        class_dirs = sorted((entry for entry in entries if entry.is_dir()), key=lambda entry: entry.name)
+    paths, labels = [], []
+    for class_dir in class_dirs:
+        label = int(class_dir.name) if class_dir.name.isdigit() else class_dir.name
+        for name in sorted(os.listdir(class_dir.path)):
+            if not name.lower().endswith(extensions):
+                continue
+            paths.append(os.path.join(class_dir.path, name))
+            labels.append(label)
+            if len(paths) == batch_size:
+                yield paths, labels
+                paths, labels = [], []
+    if paths:
+        yield paths, labels
+
+def stream_predict(classifier, images: Iterable, n_workers: Optional[int] = None,
+                   max_pending: int = 4) -> Iterator[np.ndarray]:
+    """
+    Générateur : prédictions d'un flux d'images, bloc par bloc.
+
+    Args:
+        classifier: ImageClassifier entraîné
+        images: itérable d'images (chemins, tableaux), lu au fil de l'eau
+        n_workers: threads de décodage et de prétraitement (tous les coeurs par défaut)
+        max_pending: nombre maximal de blocs prétraités en attente de recherche
+
+    Yields:
+        Tableaux des catégories prédites, d'au plus `block_size` éléments,
+        dans l'ordre de l'entrée
+
+    Raises:
+        ValueError, TypeError: si une image ne peut pas être décodée
+    """
+    iterator = iter(images)
+    blocks = iter(lambda: (list(islice(iterator, classifier.block_size)), None), ([], None))
+    for _, _, _, queries, _, failures in _pipeline(classifier, blocks, n_workers, max_pending):
+        if failures:
+            raise failures[0][1]
+        yield classifier.classes_[classifier._predict_block(queries)]
+
+def stream_evaluate(classifier, batches: Iterable[Tuple], n_workers: Optional[int] = None,
+                    max_pending: int = 4, max_errors: int = 1000) -> Dict:
+    """
+    Évalue le classificateur sur un flux de lots (images, labels), sans
+    jamais le charger en entier.
+
+    Contrairement à `evaluate`, une image illisible n'interrompt pas
+    l'évaluation : elle est écartée et signalée dans le rapport.
+
+    Args:
+        classifier: ImageClassifier entraîné
+        batches: itérable de lots (images, labels), par exemple
+            `Dataset.iter_batches("test", 1024)` ou `iter_image_folder(...)`.
+            Les images sont des chemins ou des tableaux de pixels 0-255 ;
+            les labels sont du même type que ceux de l'entraînement
+        n_workers: threads de décodage et de prétraitement (tous les coeurs par défaut)
+        max_pending: nombre maximal de blocs prétraités en attente de recherche
+        max_errors: nombre maximal d'erreurs et d'échecs détaillés dans le rapport
+
+    Returns:
+        Dictionnaire :
+        - "n_images" : images évaluées ; "n_failed" : images illisibles
+        - "accuracy" : précision sur les images évaluées
+        - "classes" : catégories du modèle, ordre des lignes et colonnes suivantes
+        - "confusion_matrix" : matrice (C, C), ligne = vraie classe, colonne = prédiction
+        - "per_class_accuracy" : précision par vraie classe (NaN si absente)
+        - "n_errors", "errors" : mauvaises prédictions, détaillées par
+          {"index", "path", "label", "predicted"} ; un label inconnu du
+          modèle compte comme une erreur, hors de la matrice
+        - "failures" : images illisibles, détaillées par {"index", "path", "label", "error"}
+        - "seconds", "images_per_second" : durée et débit de bout en bout
+
+    Raises:
+        ValueError: si le flux est vide ou si le classificateur n'est pas entraîné
+    """
+    classifier._check_searchable(classifier.k)
+    classes = classifier.classes_
+    n_classes = len(classes)
+    confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+    errors, failures = [], []
+    n_images = n_failed = n_errors = 0
+
+    started = time.perf_counter()
+    blocks = _split(batches, classifier.block_size)
+    for start, images, labels, queries, kept, block_failures in _pipeline(
+            classifier, blocks, n_workers, max_pending):
+        n_failed += len(block_failures)
+        for offset, error in block_failures[:max(0, max_errors - len(failures))]:
+            failures.append({
+                "index": start + offset, "path": _path_of(images[offset]),
+                "label": _scalar(labels[offset]), "error": f"{type(error).__name__}: {error}",
+            })
+        if len(kept) == 0:
+            continue
+
+        labels = np.asarray(labels)[kept]
+        predicted = classifier._predict_block(queries)
+        actual = _encode(classes, labels)
+        known = actual >= 0
+        confusion += np.bincount(
+            actual[known] * n_classes + predicted[known], minlength=n_classes * n_classes
+        ).reshape(n_classes, n_classes)
+
+        wrong = np.flatnonzero(actual != predicted)
+        n_images += len(kept)
+        n_errors += len(wrong)
+        for row in wrong[:max(0, max_errors - len(errors))]:
+            errors.append({
+                "index": start + int(kept[row]), "path": _path_of(images[kept[row]]),
+                "label": _scalar(labels[row]), "predicted": _scalar(classes[predicted[row]]),
+            })
+    seconds = time.perf_counter() - started
+
+    if n_images + n_failed == 0:
+        raise ValueError("Les données de test ne peuvent pas être vides.")
+    class_totals = confusion.sum(axis=1)
+    per_class = np.full(n_classes, np.nan)
+    np.divide(np.diag(confusion), class_totals, out=per_class, where=class_totals > 0)
+    return {
+        "n_images": n_images,
+        "n_failed": n_failed,
+        "accuracy": (n_images - n_errors) / n_images if n_images else float("nan"),
+        "classes": classes,
+        "confusion_matrix": confusion,
+        "per_class_accuracy": per_class,
+        "n_errors": n_errors,
+        "errors": errors,
+        "failures": failures,
+        "seconds": seconds,
+        "images_per_second": (n_images + n_failed) / seconds if seconds > 0 else float("inf"),
+    }
+
+def _split(batches, block_size):
+    """Redécoupe des lots (images, labels) de taille quelconque en blocs de `block_size`"""
+    for images, labels in batches:
+        if len(images) != len(labels):
+            raise ValueError("Le nombre d'images et d'étiquettes doit être identique.")
+        for start in range(0, len(images), block_size):
+            yield images[start:start + block_size], labels[start:start + block_size]
+
+def _pipeline(classifier, blocks, n_workers, max_pending):
+    """
+    Générateur : prétraite les blocs (images, labels) sur un pool de threads
+    et produit, dans l'ordre de l'entrée, des tuples
+    (début, images, labels, requêtes, lignes valides, échecs).
+
+    Un thread lit l'entrée et soumet chaque bloc au pool ; les futures
+    attendent dans une file bornée que le thread appelant les consomme.
+    Si ce dernier s'arrête (exception, générateur abandonné), la lecture
+    s'interrompt et les blocs non commencés sont annulés.
+    """
+    if max_pending < 1:
+        raise ValueError("max_pending doit être supérieur ou égal à 1")
+    classifier._check_searchable(classifier.k)
+    n_workers = effective_n_jobs(-1 if n_workers is None else n_workers)
+
+    pending = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="stream-preprocess")
+
+    def read():
+        try:
+            start = 0
+            for images, labels in blocks:
+                if len(images) == 0:
+                    continue
+                future = executor.submit(_prepare_block, classifier, images, labels, start)
+                start += len(images)
+                if not _put(pending, future, stop):
+                    return
+            _put(pending, _END, stop)
+        except BaseException as error:
+            # Erreur de l'entrée : transmise au thread appelant, qui la relève
+            _put(pending, error, stop)
+
+    reader = threading.Thread(target=read, name="stream-reader", daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item.result()
+    finally:
+        stop.set()
+        reader.join()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _put(pending, item, stop):
+    """Dépose `item` dans la file, sauf si l'arrêt est demandé entre-temps"""
+    while not stop.is_set():
+        try:
+            pending.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _prepare_block(classifier, images, labels, start):
+    """
+    Décode et prétraite un bloc. Un lot homogène de tableaux passe par le
+    chemin vectorisé ; sinon chaque image est traitée à part, et celles qui
+    ne peuvent pas être décodées sont écartées et signalées.
+    """
+    if _as_array_batch(images) is not None:
+        queries = classifier._preprocess(images)
+        return start, images, labels, queries, np.arange(len(images)), []
+
+    rows, kept, failures = [], [], []
+    with classifier.instrumentation.timer("preprocess", len(images)):
+        classifier.instrumentation.count("preprocess_per_image", len(images))
+        for offset, image in enumerate(images):
+            try:
+                rows.append(np.asarray(classifier._preprocess_one(image)).reshape(-1))
+                kept.append(offset)
+            except (OSError, TypeError, ValueError) as error:
+                failures.append((offset, error))
+    if rows:
+        queries = np.ascontiguousarray(np.stack(rows), dtype=np.float32)
+    else:
+        queries = np.empty((0, 0), dtype=np.float32)
+    return start, images, labels, queries, np.asarray(kept, dtype=np.intp), failures
+
+def _encode(classes, labels):
+    """Code de chaque label dans `classes` (triées), -1 pour un label inconnu du modèle"""
+    codes = np.searchsorted(classes, labels).clip(max=len(classes) - 1)
+    codes[classes[codes] != labels] = -1
+    return codes
+
+def _path_of(image):
+    """Chemin de l'image s'il s'agit d'un fichier, None sinon"""
+    return os.fspath(image) if isinstance(image, (str, os.PathLike)) else None
+
+def _scalar(value):
+    """Valeur Python native d'un scalaire NumPy, pour un rapport sérialisable en JSON"""
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,27 @@
+from .base import NeighborIndex, recall_at_k
+from .brute import BruteForceIndex
+from .ivf import IVFIndex
+from .tree import BallTreeIndex, KDTreeIndex
+from .quantized import QuantizedIndex, ScalarQuantizer
+from .pruned import PrunedIndex
+from .sharded import ShardedIndex
+
+# Index disponibles par leur nom, pour ImageClassifier(index="...")
+INDEXES = {
+    "brute": BruteForceIndex,
+    "ivf": IVFIndex,
+    "kdtree": KDTreeIndex,
+    "balltree": BallTreeIndex,
+    "pruned": PrunedIndex,
+    "sharded": ShardedIndex,
+}
+
+def make_index(index) -> NeighborIndex:
+    """Retourne une instance d'index à partir d'un nom ou d'une instance existante"""
+    if isinstance(index, NeighborIndex):
+        return index
+    if index not in INDEXES:
+        raise ValueError(
+            f"Index inconnu : {index!r}. Valeurs possibles : {', '.join(INDEXES)}"
+        )
+    return INDEXES[index]()
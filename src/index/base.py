@@ -0,0 +1,247 @@
+import copy
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple
+import numpy as np
+from ..buffers import RowBuffers
+from ..instrumentation import _DISABLED
+
+class NeighborIndex(ABC):
+    """
+    Interface commune des index de recherche des plus proches voisins.
+
+    Un index est construit une fois dans `ImageClassifier.fit` à partir de la
+    matrice (N, D) des vecteurs d'entraînement, puis interrogé par blocs de
+    requêtes. Les indices retournés désignent des lignes de cette matrice.
+
+    Mises à jour incrémentales : `add` ajoute des lignes à la fin, `remove`
+    les marque comme supprimées (pierres tombales) sans les déplacer, et
+    `compact` retire physiquement les lignes supprimées. Une ligne supprimée
+    n'est plus jamais retournée par `search`.
+    """
+    # Attributs contenant de grands tableaux NumPy, publiés en mémoire partagée
+    # plutôt que sérialisés lorsque l'index est utilisé par plusieurs processus
+    _array_attributes = ("vectors", "precomputed", "tombstones")
+    # Tableaux alignés sur les lignes : prolongés par `add`, filtrés par `compact`
+    _row_attributes = ("vectors", "precomputed")
+
+    def __init__(self):
+        self.vectors = None
+        self.distance_strategy = None
+        self.precomputed = None
+        self.n_features = None
+        self.tombstones = None
+        self.n_deleted = 0
+        self._buffers = RowBuffers()
+        # Instrumentation du classificateur propriétaire (voir src.instrumentation)
+        self.instrumentation = None
+
+    def build(self, vectors: np.ndarray, distance_strategy) -> None:
+        """
+        Construit l'index.
+
+        Args:
+            vectors: matrice (N, D) contiguë des vecteurs d'entraînement
+            distance_strategy: stratégie utilisée pour comparer les vecteurs
+        """
+        self.vectors = vectors
+        self.n_features = vectors.shape[1]
+        self.distance_strategy = distance_strategy
+        self.precomputed = distance_strategy.precompute(vectors)
+        self._reset_updates()
+        self._build()
+
+    def _build(self) -> None:
+        """Construit les structures propres à l'index (rien pour la recherche exhaustive)"""
+        pass
+
+    def _reset_updates(self) -> None:
+        """Oublie les suppressions et les réserves de croissance (nouvelle construction)"""
+        self.tombstones = None
+        self.n_deleted = 0
+        self._buffers.clear()
+
+    def add(self, vectors: np.ndarray) -> None:
+        """
+        Ajoute des vecteurs à la fin de l'index, pour un coût proportionnel à
+        leur nombre (amorti) : les tableaux alignés sur les lignes grandissent
+        dans des réserves, et seules les nouvelles lignes sont prétraitées.
+
+        Args:
+            vectors: matrice (M, D) contiguë des nouveaux vecteurs
+        """
+        if vectors.shape[1] != self.n_features:
+            raise ValueError(
+                f"Les vecteurs ajoutés ont {vectors.shape[1]} dimensions au lieu de {self.n_features}"
+            )
+        start = self.n_rows
+        for name, rows in self._encode_rows(vectors).items():
+            if rows is not None:
+                setattr(self, name, self._buffers.append(name, getattr(self, name), rows))
+        if self.tombstones is not None:
+            self.tombstones = self._buffers.append(
+                "tombstones", self.tombstones, np.zeros(len(vectors), dtype=bool)
+            )
+        self._add(start)
+
+    def _encode_rows(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """Valeurs des tableaux alignés sur les lignes pour de nouveaux vecteurs"""
+        return {"vectors": vectors, "precomputed": self.distance_strategy.precompute(vectors)}
+
+    def _add(self, start: int) -> None:
+        """Met à jour les structures propres à l'index après l'ajout des lignes start:"""
+        pass
+
+    def remove(self, rows: np.ndarray) -> None:
+        """
+        Marque des lignes comme supprimées ; elles restent en place jusqu'au
+        prochain `compact`.
+
+        Raises:
+            ValueError: Si une ligne n'existe pas ou est déjà supprimée
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.intp))
+        if len(rows) and (rows[0] < 0 or rows[-1] >= self.n_rows):
+            raise ValueError("Ligne inexistante dans l'index")
+        if self.tombstones is None:
+            self.tombstones = self._buffers.append(
+                "tombstones", None, np.zeros(self.n_rows, dtype=bool)
+            )
+        else:
+            self.tombstones = self._buffers.writable("tombstones", self.tombstones)
+        if self.tombstones[rows].any():
+            raise ValueError("Ligne déjà supprimée")
+        self.tombstones[rows] = True
+        self.n_deleted += len(rows)
+        self._remove(rows)
+
+    def _remove(self, rows: np.ndarray) -> None:
+        """Met à jour les structures propres à l'index après la suppression de `rows`"""
+        pass
+
+    def compact(self) -> np.ndarray:
+        """
+        Retire physiquement les lignes supprimées et renumérote les autres
+        dans le même ordre.
+
+        Returns:
+            Masque booléen des anciennes lignes conservées
+        """
+        keep = np.ones(self.n_rows, dtype=bool) if self.tombstones is None else ~self.tombstones
+        for name in self._row_attributes:
+            array = getattr(self, name)
+            if array is not None:
+                setattr(self, name, np.ascontiguousarray(array[keep]))
+        self._reset_updates()
+        self._compact()
+        return keep
+
+    def _compact(self) -> None:
+        """Reconstruit les structures propres à l'index après un compactage"""
+        self._build()
+
+    def _timer(self, stage: str, items: int = 0):
+        """Mesure une étape de la recherche si l'index est instrumenté"""
+        if self.instrumentation is None:
+            return _DISABLED
+        return self.instrumentation.timer(stage, items)
+
+    def _live(self, rows: np.ndarray) -> np.ndarray:
+        """Retire les lignes supprimées d'un tableau de numéros de lignes"""
+        if self.tombstones is None or not self.n_deleted:
+            return rows
+        return rows[~self.tombstones[rows]]
+
+    def _mask_deleted(self, distances: np.ndarray) -> np.ndarray:
+        """Rend infinies les distances (Q, N) vers les lignes supprimées"""
+        if self.tombstones is not None and self.n_deleted:
+            distances[:, self.tombstones] = np.inf
+        return distances
+
+    @abstractmethod
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recherche les k plus proches voisins d'un bloc de requêtes.
+
+        Args:
+            queries: matrice (Q, D) des requêtes prétraitées
+            k: nombre de voisins
+
+        Returns:
+            Tuple (distances, indices) de matrices (Q, k) triées par distance croissante
+        """
+        pass
+
+    def stored_vectors(self) -> np.ndarray:
+        """Matrice (N, D) des vecteurs stockés, lignes supprimées comprises"""
+        return self.vectors
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        """Retourne les grands tableaux de l'index, par nom d'attribut"""
+        return {
+            name: getattr(self, name) for name in self._array_attributes
+            if getattr(self, name) is not None
+        }
+
+    def set_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Réattache des tableaux obtenus par `get_arrays` (copiés, partagés ou mappés)"""
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    def without_arrays(self) -> "NeighborIndex":
+        """Copie superficielle de l'index dont les grands tableaux sont retirés"""
+        stripped = copy.copy(self)
+        for name in self._array_attributes:
+            setattr(stripped, name, None)
+        stripped._buffers = RowBuffers()
+        return stripped
+
+    def __setstate__(self, state):
+        # Index enregistrés avant l'ajout des mises à jour incrémentales
+        state.setdefault("tombstones", None)
+        state.setdefault("n_deleted", 0)
+        state.setdefault("instrumentation", None)
+        state["_buffers"] = RowBuffers()
+        self.__dict__.update(state)
+
+    @property
+    def n_rows(self) -> int:
+        """Nombre de lignes stockées, y compris les lignes supprimées non compactées"""
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def __len__(self):
+        # Nombre de vecteurs que `search` peut retourner
+        return self.n_rows - self.n_deleted
+
+def select_nearest(distances: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sélectionne les k plus petites distances de chaque ligne, triées par ordre croissant"""
+    rows = np.arange(len(distances))[:, np.newaxis]
+
+    # argpartition isole les k plus proches en O(N) sans trier toute la ligne
+    if k < distances.shape[1]:
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+    candidate_distances = distances[rows, candidates]
+
+    # Seuls les k candidats retenus sont triés
+    order = np.argsort(candidate_distances, axis=1, kind='stable')
+    return candidate_distances[rows, order], candidates[rows, order]
+
+def recall_at_k(approx_indices: np.ndarray, exact_indices: np.ndarray) -> float:
+    """
+    Proportion moyenne des k vrais plus proches voisins retrouvés par une
+    recherche approchée.
+
+    Args:
+        approx_indices: matrice (Q, k) des voisins trouvés par l'index
+        exact_indices: matrice (Q, k) des voisins trouvés par la recherche exacte
+
+    Returns:
+        Le rappel@k, entre 0 et 1
+    """
+    if approx_indices.shape != exact_indices.shape:
+        raise ValueError("Les deux matrices de voisins doivent avoir la même forme")
+    hits = sum(
+        len(np.intersect1d(approx, exact)) for approx, exact in zip(approx_indices, exact_indices)
+    )
+    return hits / exact_indices.size
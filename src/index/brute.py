@@ -0,0 +1,15 @@
+from .base import NeighborIndex, select_nearest
+
+class BruteForceIndex(NeighborIndex):
+    """
+    Recherche exhaustive : chaque requête est comparée à tous les vecteurs
+    d'entraînement en un seul produit matriciel par bloc de requêtes.
+    Résultats exacts, coût linéaire en N.
+    """
+    def search(self, queries, k):
+        with self._timer("distance", len(queries)):
+            distances = self._mask_deleted(self.distance_strategy.pairwise_distances(
+                queries, self.vectors, self.precomputed
+            ))
+        with self._timer("selection", len(queries)):
+            return select_nearest(distances, k)
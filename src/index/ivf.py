@@ -0,0 +1,211 @@
+from typing import Optional
+import numpy as np
+from .base import NeighborIndex, select_nearest
+from ..strategies.distance import EuclideanDistance
+
+# Nombre minimal de lignes ajoutées en attente avant leur fusion dans les listes inversées
+_MIN_PENDING = 1024
+
+def kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 10,
+           random_state: Optional[int] = 0, max_samples: Optional[int] = None) -> np.ndarray:
+    """
+    Algorithme de Lloyd (k-means) vectorisé.
+
+    Args:
+        vectors: matrice (N, D) à partitionner
+        n_clusters: nombre de centroïdes
+        n_iter: nombre d'itérations de Lloyd
+        random_state: graine du générateur aléatoire
+        max_samples: si fourni, les centroïdes sont appris sur un
+            sous-échantillon de cette taille (suffisant pour un index IVF)
+
+    Returns:
+        Matrice (n_clusters, D) des centroïdes en float32
+    """
+    if not 1 <= n_clusters <= len(vectors):
+        raise ValueError("n_clusters doit être compris entre 1 et le nombre de vecteurs")
+
+    rng = np.random.default_rng(random_state)
+    if max_samples is not None and len(vectors) > max_samples:
+        vectors = vectors[np.sort(rng.choice(len(vectors), max_samples, replace=False))]
+
+    euclidean = EuclideanDistance()
+    norms = euclidean.precompute(vectors)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].astype(np.float32)
+
+    for _ in range(n_iter):
+        assignments = np.argmin(euclidean.pairwise_distances(vectors, centroids), axis=1)
+
+        # Moyenne de chaque cellule : sommes par cellule via np.add.at
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, np.newaxis]
+
+        # Une cellule vide est réinitialisée sur un point tiré au hasard
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+
+    return centroids
+
+class IVFIndex(NeighborIndex):
+    """
+    Index approché par fichiers inversés (IVF).
+
+    Au moment de la construction, les vecteurs sont partitionnés en `n_lists`
+    cellules par k-means. Une requête n'est comparée qu'aux vecteurs des
+    `nprobe` cellules dont les centroïdes sont les plus proches : augmenter
+    `nprobe` améliore le rappel au prix d'une latence plus élevée.
+
+    Les vecteurs ajoutés par `add` sont affectés à leur cellule sans refaire
+    k-means, et restent en attente hors des listes inversées jusqu'à ce
+    qu'ils représentent 1/8 de l'index : leur fusion, en O(N), est ainsi
+    amortie sur les ajouts.
+    """
+    _array_attributes = NeighborIndex._array_attributes + (
+        "centroids", "list_offsets", "list_rows", "assignments"
+    )
+    _row_attributes = NeighborIndex._row_attributes + ("assignments",)
+
+    def __init__(self, n_lists: Optional[int] = None, nprobe: int = 8,
+                 n_iter: int = 10, random_state: Optional[int] = 0):
+        """
+        Args:
+            n_lists: nombre de cellules (racine carrée de N par défaut)
+            nprobe: nombre de cellules visitées par requête
+            n_iter: nombre d'itérations de k-means
+            random_state: graine de k-means
+        """
+        super().__init__()
+        if nprobe < 1:
+            raise ValueError("nprobe doit être supérieur ou égal à 1")
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.random_state = random_state
+        self.centroids = None
+        self.list_offsets = None
+        self.list_rows = None
+        self.assignments = None
+        self.list_sizes = None
+        self.n_indexed = 0
+
+    def _build(self):
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(self.vectors))))
+        n_lists = min(n_lists, len(self.vectors))
+
+        self.centroids = kmeans(
+            self.vectors, n_lists, self.n_iter, self.random_state, max_samples=256 * n_lists
+        )
+        self.assignments = self._assign(self.vectors)
+        self._index_lists()
+
+    def _index_lists(self):
+        """(Re)construit les listes inversées à partir des affectations de toutes les lignes"""
+        n_lists = len(self.centroids)
+
+        # Listes inversées au format CSR : les lignes de la cellule c sont
+        # list_rows[list_offsets[c]:list_offsets[c + 1]]
+        self.list_rows = self._live(np.argsort(self.assignments, kind='stable'))
+        counts = np.bincount(self.assignments[self.list_rows], minlength=n_lists)
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.n_indexed = self.n_rows
+
+        # Nombre de lignes non supprimées par cellule, listes et lignes en attente comprises
+        self.list_sizes = counts
+
+    def _encode_rows(self, vectors):
+        rows = super()._encode_rows(vectors)
+        rows["assignments"] = self._assign(vectors)
+        return rows
+
+    def _add(self, start):
+        self.list_sizes = self.list_sizes + np.bincount(
+            self.assignments[start:], minlength=len(self.centroids)
+        )
+        if self.n_rows - self.n_indexed > max(_MIN_PENDING, self.n_indexed // 8):
+            self._index_lists()
+
+    def _remove(self, rows):
+        self.list_sizes = self.list_sizes - np.bincount(
+            self.assignments[rows], minlength=len(self.centroids)
+        )
+
+    def _compact(self):
+        # Les centroïdes restent valides : seules les listes sont renumérotées
+        self._index_lists()
+
+    def _pending_lists(self):
+        """Lignes ajoutées depuis la dernière fusion, regroupées par cellule (format CSR)"""
+        pending = self._live(np.arange(self.n_indexed, self.n_rows))
+        cells = self.assignments[pending]
+        counts = np.bincount(cells, minlength=len(self.centroids))
+        return pending[np.argsort(cells, kind='stable')], np.concatenate([[0], np.cumsum(counts)])
+
+    def _assign(self, vectors):
+        """Cellule la plus proche de chaque vecteur, calculée par blocs"""
+        return np.concatenate([
+            np.argmin(self.distance_strategy.pairwise_distances(block, self.centroids), axis=1)
+            for block in np.array_split(vectors, max(1, len(vectors) // 4096))
+        ])
+
+    def search(self, queries, k):
+        with self._timer("distance", len(queries)):
+            distances, candidates = self._candidate_distances(queries, k)
+        with self._timer("selection", len(queries)):
+            best_distances, best = select_nearest(distances, k)
+            return best_distances, np.take_along_axis(candidates, best, axis=1)
+
+    def _candidate_distances(self, queries, k):
+        """
+        Distances (Q, C) de chaque requête aux vecteurs des cellules visitées,
+        complétées par l'infini, et matrice (Q, C) des lignes correspondantes
+        """
+        n_lists = len(self.centroids)
+        list_sizes = self.list_sizes
+        pending_rows, pending_offsets = self._pending_lists()
+        probe_order = np.argsort(
+            self.distance_strategy.pairwise_distances(queries, self.centroids), axis=1
+        )
+
+        # Visiter au moins nprobe cellules par requête, et assez pour réunir k candidats
+        cumulative = np.cumsum(list_sizes[probe_order], axis=1)
+        n_probes = np.minimum(np.maximum(self.nprobe, (cumulative < k).sum(axis=1) + 1), n_lists)
+        n_candidates = cumulative[np.arange(len(queries)), n_probes - 1]
+
+        # Candidats de chaque requête, complétés par des distances infinies
+        distances = np.full((len(queries), n_candidates.max()), np.inf, dtype=np.float32)
+        candidates = np.zeros(distances.shape, dtype=np.intp)
+        filled = np.zeros(len(queries), dtype=np.intp)
+
+        # Regrouper les requêtes par cellule visitée : chaque cellule n'est
+        # rassemblée qu'une fois par bloc et comparée à toutes ses requêtes
+        # en un seul produit matriciel
+        query_ids, ranks = np.nonzero(np.arange(n_lists) < n_probes[:, np.newaxis])
+        cells = probe_order[query_ids, ranks]
+        order = np.argsort(cells, kind='stable')
+        query_ids, cells = query_ids[order], cells[order]
+        boundaries = np.flatnonzero(np.diff(cells)) + 1
+
+        for group in np.split(np.arange(len(cells)), boundaries):
+            cell = cells[group[0]]
+            rows = self._live(self.list_rows[self.list_offsets[cell]:self.list_offsets[cell + 1]])
+            if len(pending_rows):
+                rows = np.concatenate([
+                    rows, pending_rows[pending_offsets[cell]:pending_offsets[cell + 1]]
+                ])
+            if len(rows) == 0:
+                continue
+            precomputed = None if self.precomputed is None else self.precomputed[rows]
+            cell_distances = self.distance_strategy.pairwise_distances(
+                queries[query_ids[group]], self.vectors[rows], precomputed
+            )
+            for query_id, row_distances in zip(query_ids[group], cell_distances):
+                start = filled[query_id]
+                distances[query_id, start:start + len(rows)] = row_distances
+                candidates[query_id, start:start + len(rows)] = rows
+                filled[query_id] += len(rows)
+        return distances, candidates
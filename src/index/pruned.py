@@ -0,0 +1,204 @@
+from typing import Sequence
+import numpy as np
+from .base import NeighborIndex, select_nearest
+from ..strategies.distance import EuclideanDistance
+from ..strategies.projection import PCAProjection
+
+# Précision relative du float32, pour majorer les erreurs d'arrondi des bornes
+_EPS32 = float(np.finfo(np.float32).eps)
+
+class PrunedIndex(NeighborIndex):
+    """
+    Recherche exacte par élagage : la plupart des candidats sont écartés
+    avant le calcul de leur distance complète.
+
+    Les vecteurs sont aussi stockés dans la base complète des composantes
+    principales : cette rotation conserve les distances euclidiennes et
+    classe les coordonnées par variance décroissante, si bien que les
+    premières portent l'essentiel des écarts. Pour un bloc de requêtes :
+
+    1. une distance partielle sur les `stages[0]` premières coordonnées est
+       calculée pour tous les candidats en un produit matriciel (une fraction
+       du coût de la recherche exhaustive) ;
+    2. les candidats de plus petite distance partielle sont comparés en
+       entier : la k-ième meilleure distance obtenue majore celle du vrai
+       k-ième voisin et sert de seuil ;
+    3. sont éliminés les candidats dont la somme partielle des carrés, puis
+       l'écart de norme | |q| - |x| |, dépasse ce seuil ; la somme est
+       prolongée par tranches de coordonnées (`stages`) jusqu'à ce que le
+       candidat soit écarté ou la dimension épuisée ;
+    4. seuls les survivants reçoivent leur distance exacte, calculée comme
+       par la recherche exhaustive.
+
+    Les bornes tiennent compte d'une marge qui majore les erreurs d'arrondi
+    du float32 et de la rotation : l'élagage est sans perte et les voisins
+    sont ceux de BruteForceIndex (à l'ordre près de distances égales aux
+    arrondis près). La copie tournée double la mémoire des vecteurs.
+    Distance euclidienne uniquement.
+    """
+    _array_attributes = NeighborIndex._array_attributes + (
+        "rotated", "norms", "head_norms", "center", "rotation"
+    )
+    _row_attributes = NeighborIndex._row_attributes + ("rotated", "norms", "head_norms")
+
+    def __init__(self, stages: Sequence[int] = (32, 128, 320), seed_factor: int = 4):
+        """
+        Args:
+            stages: nombres croissants de coordonnées après lesquels les
+                candidats sont élagués ; le premier est calculé pour tous
+                les candidats par produit matriciel
+            seed_factor: nombre de candidats comparés en entier pour fixer
+                le seuil, en multiple de k
+        """
+        super().__init__()
+        if not stages or list(stages) != sorted(set(stages)) or stages[0] < 1:
+            raise ValueError("stages doit être une suite strictement croissante d'entiers positifs")
+        if seed_factor < 1:
+            raise ValueError("seed_factor doit être supérieur ou égal à 1")
+        self.stages = tuple(stages)
+        self.seed_factor = seed_factor
+        self.rotated = None
+        self.norms = None
+        self.head_norms = None
+        self.center = None
+        self.rotation = None
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        """Remet à zéro les compteurs d'élagage"""
+        self.candidates = 0
+        self.full_evaluations = 0
+        self.pruned_by_norm = 0
+        self.pruned_by_partial = 0
+        self.coordinates_read = 0
+
+    def pruned_fraction(self) -> float:
+        """Proportion des candidats écartés sans calcul de leur distance complète"""
+        return 1 - self.full_evaluations / max(1, self.candidates)
+
+    def work_fraction(self) -> float:
+        """Nombre de coordonnées lues, rapporté à celui de la recherche exhaustive"""
+        return self.coordinates_read / max(1, self.candidates * self.n_features)
+
+    def _build(self):
+        if not isinstance(self.distance_strategy, EuclideanDistance):
+            raise ValueError("PrunedIndex nécessite EuclideanDistance : ses bornes sont euclidiennes")
+
+        # Base complète des composantes principales, réorthonormalisée en float64
+        # pour que la rotation conserve les distances aux arrondis du float32 près
+        projection = PCAProjection(n_components=self.n_features).fit(self.vectors)
+        self.center = projection.mean_
+        self.rotation, upper = np.linalg.qr(projection.components_.T.astype(np.float64))
+        # QR peut changer le signe d'une colonne : sans effet sur les distances
+        self.rotation *= np.where(np.diag(upper) < 0, -1.0, 1.0)
+
+        for name, rows in self._encode_rows(self.vectors).items():
+            if name not in NeighborIndex._row_attributes:
+                setattr(self, name, rows)
+        self.reset_counters()
+
+    def _rotate(self, vectors):
+        return ((vectors - self.center) @ self.rotation).astype(np.float32)
+
+    def _encode_rows(self, vectors):
+        rows = super()._encode_rows(vectors)
+        rotated = self._rotate(vectors)
+        head = rotated[:, :self._head]
+        rows["rotated"] = rotated
+        rows["norms"] = np.sqrt(np.einsum('ij,ij->i', rotated, rotated))
+        rows["head_norms"] = np.einsum('ij,ij->i', head, head)
+        return rows
+
+    @property
+    def _head(self):
+        return min(self.stages[0], self.n_features)
+
+    def _compact(self):
+        # Les tableaux tournés sont filtrés avec les autres ; la rotation est conservée
+        pass
+
+    def search(self, queries, k):
+        with self._timer("distance", len(queries)):
+            candidates = self._prune(queries, k)
+            exact = [
+                self.distance_strategy.pairwise_distances(
+                    queries[i:i + 1], self.vectors[rows], self.precomputed[rows]
+                )
+                for i, rows in enumerate(candidates)
+            ]
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        with self._timer("selection", len(queries)):
+            for i, rows in enumerate(candidates):
+                best_distances, best = select_nearest(exact[i], k)
+                distances[i], indices[i] = best_distances[0], rows[best[0]]
+        return distances, indices
+
+    def _prune(self, queries, k):
+        """Lignes survivantes de chaque requête, dont les k vrais voisins font forcément partie"""
+        n_features, head, n_live = self.n_features, self._head, len(self)
+        rotated_queries = self._rotate(queries)
+        query_heads = rotated_queries[:, :head]
+        query_head_norms = np.einsum('ij,ij->i', query_heads, query_heads)
+        query_norms = np.sqrt(np.einsum('ij,ij->i', rotated_queries, rotated_queries))
+
+        # 1. Distance partielle sur les premières coordonnées, pour tous les candidats
+        lower = query_heads @ self.rotated[:, :head].T
+        lower *= -2
+        lower += query_head_norms[:, np.newaxis]
+        lower += self.head_norms[np.newaxis, :]
+        # Majoration de l'erreur d'arrondi du développement |q|² + |x|² - 2 q.x
+        lower -= (2 * head + 4) * _EPS32 * (query_head_norms[:, np.newaxis] + self.head_norms)
+        self._mask_deleted(lower)
+        self.candidates += len(queries) * n_live
+        self.coordinates_read += len(queries) * n_live * head
+
+        # Le seuil couvre deux fois l'arrondi du calcul exact final (développement
+        # en float32) : une fois pour le k-ième voisin, une fois pour le candidat
+        squared_norms = np.einsum('ij,ij->i', queries, queries, dtype=np.float64)
+        final_margins = 2 * (2 * n_features + 4) * _EPS32 * (
+            squared_norms + float(self.precomputed.max())
+        )
+        bounds = [stop for stop in self.stages if head < stop < n_features] + [n_features]
+        n_seeds = min(self.seed_factor * k, n_live)
+
+        survivors = []
+        for i, query in enumerate(queries):
+            # 2. Seuil : k-ième meilleure distance exacte parmi les plus prometteurs
+            seeds = np.argpartition(lower[i], n_seeds - 1)[:n_seeds]
+            differences = self.vectors[seeds] - query
+            seed_distances = np.einsum('ij,ij->i', differences, differences, dtype=np.float64)
+            radius = np.sqrt(np.partition(seed_distances, k - 1)[k - 1] + final_margins[i])
+            self.coordinates_read += n_seeds * n_features
+
+            # Dans la base tournée, une distance peut être sous-estimée de l'arrondi
+            # des deux vecteurs : chaque candidat a son propre seuil (distance au carré)
+            limits = (radius + 2 * _EPS32 * (query_norms[i] + self.norms)) ** 2
+
+            # 3a. Somme partielle des premières coordonnées, puis écart des normes
+            rows = np.flatnonzero(lower[i] <= limits)
+            limits = limits[rows]
+            self.pruned_by_partial += n_live - len(rows)
+            gaps = np.abs(self.norms[rows] - query_norms[i])
+            keep = gaps * gaps * (1 - 2 * _EPS32) <= limits
+            self.pruned_by_norm += len(rows) - int(keep.sum())
+            rows, limits = rows[keep], limits[keep]
+            accumulated = np.maximum(lower[i, rows], 0)
+
+            # 3b. Abandon précoce : prolonger la somme tranche par tranche de coordonnées
+            start = head
+            for stop in bounds if head < n_features else []:
+                block = self.rotated[rows, start:stop]
+                block -= rotated_queries[i, start:stop]
+                accumulated += np.einsum('ij,ij->i', block, block)
+                self.coordinates_read += len(rows) * (stop - start)
+                if stop < n_features:
+                    keep = accumulated * (1 - stop * _EPS32) <= limits
+                    self.pruned_by_partial += len(rows) - int(keep.sum())
+                    rows, limits, accumulated = rows[keep], limits[keep], accumulated[keep]
+                start = stop
+
+            # 4. Les survivants recevront leur distance exacte
+            self.full_evaluations += len(rows)
+            survivors.append(rows)
+        return survivors
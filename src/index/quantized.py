@@ -0,0 +1,189 @@
+import copy
+from typing import Optional
+import numpy as np
+from .base import NeighborIndex, select_nearest
+from ..strategies.distance import EuclideanDistance
+
+# Nombre de vecteurs d'entraînement convertis ensemble pour le produit matriciel
+_TILE_ROWS = 2048
+
+class ScalarQuantizer:
+    """
+    Quantification scalaire globale : x ≈ offset + scale * code.
+
+    - "uint8" : codes 0..255 avec scale = 1/255 et offset = 0, la grille
+      exacte des pixels MNIST normalisés (quantification sans perte). Les
+      vecteurs doivent être dans [0, 1] : hors de cet intervalle, les codes
+      satureraient sans avertissement, et `fit` lève une ValueError.
+    - "int8" : codes -128..127, échelle et décalage ajustés sur l'étendue des
+      données, pour des vecteurs quelconques.
+
+    L'échelle est la même pour toutes les dimensions : la distance entre
+    codes, multipliée par `scale`, approche donc la distance réelle.
+    """
+    LEVELS = {"uint8": (0, 255), "int8": (-128, 127)}
+
+    def __init__(self, dtype: str = "uint8"):
+        if dtype not in self.LEVELS:
+            raise ValueError(f"Type de quantification inconnu : {dtype!r} (uint8 ou int8)")
+        self.dtype = dtype
+        self.scale = None
+        self.offset = None
+
+    def fit(self, vectors: np.ndarray) -> "ScalarQuantizer":
+        low, high = self.LEVELS[self.dtype]
+        if self.dtype == "uint8":
+            if vectors.min() < 0 or vectors.max() > 1:
+                raise ValueError(
+                    "La quantification uint8 suppose des vecteurs dans [0, 1] "
+                    "(pixels normalisés) ; utiliser storage='int8' pour d'autres caractéristiques"
+                )
+            self.scale, self.offset = 1 / 255, 0.0
+        else:
+            minimum, maximum = float(vectors.min()), float(vectors.max())
+            self.scale = max(maximum - minimum, np.finfo(np.float32).eps) / (high - low)
+            self.offset = minimum - low * self.scale
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        low, high = self.LEVELS[self.dtype]
+        codes = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(codes, low, high).astype(self.dtype)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return (self.offset + self.scale * codes.astype(np.float32)).astype(np.float32)
+
+class QuantizedIndex(NeighborIndex):
+    """
+    Recherche exhaustive sur des vecteurs stockés en entiers 8 bits.
+
+    La matrice d'entraînement occupe 4 fois moins de mémoire qu'en float32 et
+    le parcours lit 4 fois moins d'octets. Les distances sont calculées sur
+    les codes recentrés dans [-128, 127] : les produits scalaires sont des
+    entiers que les produits matriciels en float32 accumulent exactement
+    (tant que D * 128² < 2^24, soit D < 1024 ; au-delà, float64). Les
+    matrices sont converties par tuiles de lignes, jamais en entier.
+
+    Avec `rerank` > 0, les vecteurs float32 sont conservés (idéalement
+    projetés en mémoire depuis un modèle enregistré) et les rerank * k
+    meilleurs candidats de chaque requête sont recomparés en distance exacte.
+
+    Les vecteurs ajoutés par `add` sont codés avec la quantification apprise
+    à la construction (les valeurs hors de l'étendue d'origine sont saturées).
+    """
+    _array_attributes = NeighborIndex._array_attributes + ("codes", "code_norms")
+    _row_attributes = NeighborIndex._row_attributes + ("codes", "code_norms")
+
+    def __init__(self, dtype: str = "uint8", rerank: int = 0):
+        """
+        Args:
+            dtype: "uint8" ou "int8"
+            rerank: facteur de sur-sélection pour la recomparaison en float32
+                (0 pour ne pas conserver les vecteurs float32)
+        """
+        super().__init__()
+        if rerank < 0:
+            raise ValueError("rerank doit être positif ou nul")
+        self.quantizer = ScalarQuantizer(dtype)
+        self.rerank = rerank
+        self.codes = None
+        self.code_norms = None
+        self._center = 128 if dtype == "uint8" else 0
+
+    def build(self, vectors, distance_strategy):
+        if not isinstance(distance_strategy, EuclideanDistance):
+            raise ValueError("Le stockage quantifié ne prend en charge que EuclideanDistance")
+        self.distance_strategy = distance_strategy
+        self.n_features = vectors.shape[1]
+        self.vectors = None
+        self.precomputed = None
+        self.codes = None
+        self.code_norms = None
+        self._reset_updates()
+
+        self.quantizer.fit(vectors)
+        for name, rows in self._encode_rows(vectors).items():
+            setattr(self, name, rows)
+
+    def _encode_rows(self, vectors):
+        codes = self.quantizer.encode(vectors)
+        centered = self._centered(codes, np.int64)
+        rows = {"codes": codes, "code_norms": np.einsum('ij,ij->i', centered, centered)}
+
+        # Les vecteurs float32 ne sont gardés que pour la recomparaison
+        if self.rerank:
+            rows.update(super()._encode_rows(vectors))
+        return rows
+
+    def _centered(self, codes, dtype):
+        centered = codes.astype(dtype)
+        if self._center:
+            centered -= self._center
+        return centered
+
+    def _squared_code_distances(self, queries):
+        """Distances au carré (Q, N), en unités de code, calculées par tuiles"""
+        # Les sommes de produits restent exactes en float32 sous 2^24
+        dtype = np.float32 if self.n_features * 128 ** 2 < 2 ** 24 else np.float64
+        query_codes = self._centered(self.quantizer.encode(queries), dtype)
+        query_norms = np.einsum('ij,ij->i', query_codes, query_codes).astype(np.float64)
+
+        squared = np.empty((len(queries), len(self.codes)), dtype=np.float64)
+        tile = np.empty((_TILE_ROWS, self.n_features), dtype=dtype)
+        for start in range(0, len(self.codes), _TILE_ROWS):
+            stop = min(start + _TILE_ROWS, len(self.codes))
+            block = tile[:stop - start]
+            np.subtract(self.codes[start:stop], self._center, out=block, dtype=dtype)
+            squared[:, start:stop] = query_codes @ block.T
+
+        squared *= -2
+        squared += query_norms[:, np.newaxis]
+        squared += self.code_norms[np.newaxis, :]
+        return squared
+
+    def search(self, queries, k):
+        with self._timer("distance", len(queries)):
+            squared = self._mask_deleted(self._squared_code_distances(queries))
+        if not self.rerank:
+            with self._timer("selection", len(queries)):
+                distances = np.sqrt(np.maximum(squared, 0), dtype=np.float32) * np.float32(self.quantizer.scale)
+                return select_nearest(distances, k)
+
+        # Recomparaison exacte des meilleurs candidats en float32
+        with self._timer("selection", len(queries)):
+            n_candidates = min(self.rerank * k, len(self))
+            _, candidates = select_nearest(squared, n_candidates)
+        with self._timer("distance"):
+            distances = np.empty((len(queries), n_candidates), dtype=np.float32)
+            for i, (query, rows) in enumerate(zip(queries, candidates)):
+                distances[i] = self.distance_strategy.pairwise_distances(
+                    query[np.newaxis], self.vectors[rows], self.precomputed[rows]
+                )[0]
+        with self._timer("selection"):
+            best_distances, best = select_nearest(distances, k)
+            return best_distances, np.take_along_axis(candidates, best, axis=1)
+
+    def take(self, rows: np.ndarray) -> "QuantizedIndex":
+        """
+        Index restreint aux lignes `rows`, dans cet ordre, sans suppressions.
+
+        Les codes sont repris tels quels avec la quantification de cet index,
+        sans réajustement : les distances sont celles de l'index complet, et
+        seules les lignes demandées sont lues d'un tableau projeté en mémoire.
+        """
+        index = self.without_arrays()
+        index.quantizer = copy.copy(self.quantizer)
+        index.set_arrays({
+            name: np.ascontiguousarray(getattr(self, name)[rows])
+            for name in self._row_attributes if getattr(self, name) is not None
+        })
+        index._reset_updates()
+        return index
+
+    def stored_vectors(self):
+        # Sans recomparaison, seuls les codes sont conservés : les décoder
+        return self.vectors if self.vectors is not None else self.quantizer.decode(self.codes)
+
+    @property
+    def n_rows(self):
+        return 0 if self.codes is None else len(self.codes)
@@ -0,0 +1,294 @@
+import os
+import shutil
+import uuid
+import weakref
+from collections import deque
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+import numpy as np
+from .base import NeighborIndex, select_nearest
+
+class ShardedIndex(NeighborIndex):
+    """
+    Recherche exhaustive sur une matrice d'entraînement stockée hors mémoire.
+
+    Les vecteurs (et leurs données précalculées, comme les normes) sont
+    découpés en shards de `shard_size` lignes, chacun enregistré dans un
+    fichier .npy de `directory` et projeté en mémoire à la demande. Une
+    recherche fait défiler les shards dans l'ordre : les distances du bloc de
+    requêtes à chaque shard sont calculées en un produit matriciel, puis
+    fusionnées avec les k meilleurs candidats courants de chaque requête.
+
+    Un thread de préchargement lit les `prefetch` shards suivants pendant le
+    calcul du shard courant : les lectures disque recouvrent les calculs. La
+    mémoire utilisée reste bornée par (prefetch + 1) shards et une matrice
+    de distances (Q, shard_size), quelle que soit la taille totale.
+
+    `add` remplit le dernier shard puis en crée de nouveaux : un ensemble de
+    référence plus grand que la RAM se construit avec fit() sur un premier
+    lot puis partial_fit() sur les suivants.
+
+    Chaque construction et chaque compactage écrit une nouvelle génération
+    de shards dans un sous-répertoire de `directory`, et un fichier écrit
+    n'est jamais modifié (le nom d'un shard porte son nombre de lignes) : un
+    modèle enregistré, qui fait référence à ces fichiers, reste valide quoi
+    que devienne l'index. Les générations obsolètes d'un répertoire fourni
+    par l'appelant ne sont donc pas effacées ; seul un répertoire temporaire
+    créé par l'index est supprimé, avec lui (`close` ou ramasse-miettes).
+    """
+    # Le nombre de lignes de chaque shard suffit à retrouver ses fichiers : une
+    # copie sans tableaux (clone non entraîné) ne touche pas aux shards de l'original
+    _array_attributes = ("tombstones", "shard_rows")
+    _row_attributes = ()
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, shard_size: int = 32768,
+                 prefetch: int = 2):
+        """
+        Args:
+            directory: répertoire des shards ; si None, un répertoire temporaire
+                propre à l'index, supprimé avec lui (à éviter pour un modèle
+                destiné à être enregistré)
+            shard_size: nombre de lignes par shard ; la matrice de distances
+                d'un bloc de requêtes occupe block_size x shard_size float32
+            prefetch: nombre de shards lus à l'avance par le thread de
+                préchargement (0 pour lire dans le thread de recherche)
+        """
+        super().__init__()
+        if shard_size < 1:
+            raise ValueError("shard_size doit être supérieur ou égal à 1")
+        if prefetch < 0:
+            raise ValueError("prefetch doit être positif ou nul")
+        self.directory = None if directory is None else Path(directory).resolve()
+        self.shard_size = shard_size
+        self.prefetch = prefetch
+        self.shard_rows = None
+        # Sous-répertoire de la génération courante, renouvelé à chaque construction et compactage
+        self.token = None
+        self.has_precomputed = False
+        self._opened = {}
+        self._executor = None
+        # Suppression du répertoire temporaire créé par l'index, None pour un répertoire fourni
+        self._cleanup = None
+
+    @property
+    def n_rows(self) -> int:
+        return 0 if self.shard_rows is None else int(self.shard_rows.sum())
+
+    @property
+    def n_shards(self) -> int:
+        return 0 if self.shard_rows is None else len(self.shard_rows)
+
+    def build(self, vectors, distance_strategy):
+        self.distance_strategy = distance_strategy
+        self.n_features = vectors.shape[1]
+        if self.directory is None:
+            import tempfile
+
+            self.directory = Path(tempfile.mkdtemp(prefix="knn-shards-"))
+            self._cleanup = weakref.finalize(self, shutil.rmtree, str(self.directory), True)
+        previous = self.token
+        self._reset_updates()
+        self._new_generation()
+        self._append_rows(vectors)
+        self._discard_generation(previous)
+
+    def _new_generation(self):
+        self.token = uuid.uuid4().hex[:12]
+        (self.directory / self.token).mkdir(parents=True)
+        self.shard_rows = np.zeros(0, dtype=np.int64)
+        self.has_precomputed = self.distance_strategy.precompute(
+            np.zeros((1, self.n_features), dtype=np.float32)
+        ) is not None
+        self._opened = {}
+
+    def _discard_generation(self, token):
+        """Supprime une génération remplacée, seulement dans un répertoire temporaire propre à l'index"""
+        if token is not None and self._cleanup is not None and self._cleanup.alive:
+            shutil.rmtree(self.directory / token, ignore_errors=True)
+
+    def close(self):
+        """Arrête le préchargement et supprime le répertoire temporaire créé par l'index, le cas échéant"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._opened = {}
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def add(self, vectors):
+        if vectors.shape[1] != self.n_features:
+            raise ValueError(
+                f"Les vecteurs ajoutés ont {vectors.shape[1]} dimensions au lieu de {self.n_features}"
+            )
+        start = self.n_rows
+        self._append_rows(vectors)
+        if self.tombstones is not None:
+            self.tombstones = self._buffers.append(
+                "tombstones", self.tombstones, np.zeros(self.n_rows - start, dtype=bool)
+            )
+
+    def _append_rows(self, vectors):
+        """Complète le dernier shard, puis écrit les lignes restantes dans de nouveaux shards"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.n_shards and self.shard_rows[-1] < self.shard_size and len(vectors):
+            # Le dernier shard incomplet est réécrit avec ses nouvelles lignes
+            fill = self.shard_size - self.shard_rows[-1]
+            last, _ = self._load(self.n_shards - 1)
+            self._write(self.n_shards - 1, np.concatenate([last, vectors[:fill]]))
+            vectors = vectors[fill:]
+        for start in range(0, len(vectors), self.shard_size):
+            self.shard_rows = np.append(self.shard_rows, 0)
+            self._write(self.n_shards - 1, vectors[start:start + self.shard_size])
+
+    def _files(self, shard, rows, token=None) -> Tuple[Path, Optional[Path]]:
+        """Fichiers (vecteurs, données précalculées ou None) d'un shard de `rows` lignes"""
+        generation = self.directory / (token or self.token)
+        name = f"shard-{shard:06d}-{rows}"
+        return (
+            generation / f"{name}.npy",
+            generation / f"{name}.pre.npy" if self.has_precomputed else None,
+        )
+
+    def _write(self, shard, vectors):
+        """
+        Enregistre un shard et ses données précalculées. Un shard complété
+        est écrit sous un nouveau nom : l'ancien fichier reste intact pour les
+        modèles enregistrés qui y font référence.
+        """
+        vectors_file, precomputed_file = self._files(shard, len(vectors))
+        _save(vectors_file, vectors)
+        if precomputed_file is not None:
+            _save(precomputed_file, self.distance_strategy.precompute(vectors))
+        self._opened.pop(shard, None)
+        shard_rows = self.shard_rows.copy()
+        shard_rows[shard] = len(vectors)
+        self.shard_rows = shard_rows
+
+    def _open(self, shard):
+        """Projections en mémoire (lecture seule) d'un shard, ouvertes une seule fois"""
+        if shard not in self._opened:
+            self._opened[shard] = _map(self._files(shard, self.shard_rows[shard]))
+        return self._opened[shard]
+
+    def _load(self, shard):
+        """Lit un shard en mémoire : c'est ici que les pages sont lues sur le disque"""
+        return _read(self._open(shard))
+
+    def _iter_shards(self, shard_rows=None, token=None
+                     ) -> Iterator[Tuple[int, np.ndarray, Optional[np.ndarray]]]:
+        """
+        Shards dans l'ordre, sous la forme (première ligne, vecteurs,
+        précalculs), lus à l'avance par le thread de préchargement.
+        """
+        if shard_rows is None:
+            shard_rows, load = self.shard_rows, self._load
+        else:
+            load = lambda shard: _read(_map(self._files(shard, shard_rows[shard], token)))
+        starts = list(accumulate(shard_rows, initial=0))[:-1]
+        if self.prefetch == 0:
+            for shard, start in enumerate(starts):
+                yield (start,) + load(shard)
+            return
+
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="knn-prefetch")
+        pending = deque()
+        next_shard = 0
+        try:
+            for start in starts:
+                while next_shard < len(starts) and len(pending) < self.prefetch:
+                    pending.append(self._executor.submit(load, next_shard))
+                    next_shard += 1
+                yield (start,) + pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def search(self, queries, k):
+        n_queries = len(queries)
+        best_distances = np.full((n_queries, k), np.inf, dtype=np.float32)
+        best_indices = np.zeros((n_queries, k), dtype=np.intp)
+        rows = np.arange(n_queries)[:, np.newaxis]
+
+        for shard, (start, vectors, precomputed) in enumerate(self._iter_shards()):
+            with self._timer("distance", n_queries if shard == 0 else 0):
+                distances = self.distance_strategy.pairwise_distances(queries, vectors, precomputed)
+                if self.tombstones is not None and self.n_deleted:
+                    distances[:, self.tombstones[start:start + len(vectors)]] = np.inf
+
+            with self._timer("selection", n_queries if shard == 0 else 0):
+                # k meilleurs du shard, fusionnés avec les k meilleurs courants
+                shard_distances, shard_indices = select_nearest(distances, min(k, len(vectors)))
+                merged_distances = np.concatenate([best_distances, shard_distances], axis=1)
+                merged_indices = np.concatenate([best_indices, shard_indices + start], axis=1)
+                order = np.argsort(merged_distances, axis=1, kind='stable')[:, :k]
+                best_distances = merged_distances[rows, order]
+                best_indices = merged_indices[rows, order]
+        return best_distances, best_indices
+
+    def compact(self):
+        """Réécrit les shards sans les lignes supprimées, un shard à la fois, dans une nouvelle génération"""
+        keep = np.ones(self.n_rows, dtype=bool) if self.tombstones is None else ~self.tombstones
+        if not keep.all():
+            old_rows, old_token = self.shard_rows, self.token
+            self._new_generation()
+            # Les lignes conservées attendent d'emplir un shard entier : chaque
+            # shard n'est écrit qu'une fois, et au plus deux shards sont en mémoire
+            pending = np.empty((0, self.n_features), dtype=np.float32)
+            for start, vectors, _ in self._iter_shards(old_rows, old_token):
+                pending = np.concatenate([pending, vectors[keep[start:start + len(vectors)]]])
+                full = len(pending) - len(pending) % self.shard_size
+                self._append_rows(pending[:full])
+                pending = pending[full:]
+            self._append_rows(pending)
+            self._discard_generation(old_token)
+        self._reset_updates()
+        return keep
+
+    def stored_vectors(self):
+        """Matrice (N, D) de tous les vecteurs, lue en mémoire : à réserver aux ensembles qui y tiennent"""
+        if not self.n_shards:
+            return np.empty((0, self.n_features or 0), dtype=np.float32)
+        return np.concatenate([self._open(shard)[0] for shard in range(self.n_shards)])
+
+    def set_arrays(self, arrays):
+        super().set_arrays(arrays)
+        self._opened = {}
+
+    def without_arrays(self):
+        stripped = super().without_arrays()
+        if self._cleanup is not None:
+            # Le répertoire temporaire disparaît avec l'original : la copie en crée un autre
+            stripped.directory = None
+        return stripped
+
+    def __getstate__(self):
+        # Les projections et le thread de préchargement sont rouverts à la demande ;
+        # une copie ne supprime jamais le répertoire temporaire de l'original
+        state = self.__dict__.copy()
+        state["_opened"] = {}
+        state["_executor"] = None
+        state["_cleanup"] = None
+        return state
+
+def _save(path: Path, array: np.ndarray) -> None:
+    # Écriture dans un fichier temporaire puis remplacement atomique : les
+    # projections déjà ouvertes (autres processus, modèle rechargé) gardent l'ancien contenu
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        np.save(file, array)
+    os.replace(temporary, path)
+
+def _map(files):
+    vectors_file, precomputed_file = files
+    return (
+        np.load(vectors_file, mmap_mode="r"),
+        None if precomputed_file is None else np.load(precomputed_file, mmap_mode="r"),
+    )
+
+def _read(mapped):
+    vectors, precomputed = mapped
+    return np.array(vectors), None if precomputed is None else np.array(precomputed)
@@ -0,0 +1,332 @@
+import heapq
+from abc import abstractmethod
+from typing import Optional
+import numpy as np
+from .base import NeighborIndex
+from ..strategies.distance import EuclideanDistance
+from ..strategies.projection import PCAProjection
+
+# Nombre minimal de lignes ajoutées parcourues exhaustivement avant de reconstruire l'arbre
+_MIN_PENDING = 1024
+
+def _push_candidates(best, k, distances, rows):
+    """
+    Insère des candidats dans le tas max `best` des k meilleurs et retourne
+    la k-ième meilleure distance (l'infini tant que k candidats manquent).
+    """
+    for distance, row in zip(distances.tolist(), rows.tolist()):
+        if len(best) < k:
+            heapq.heappush(best, (-distance, row))
+        elif distance < -best[0][0]:
+            heapq.heapreplace(best, (-distance, row))
+    return -best[0][0] if len(best) == k else np.inf
+
+class _TreeIndex(NeighborIndex):
+    """
+    Base commune des index arborescents exacts.
+
+    Les noeuds sont stockés dans des listes parallèles : les points d'un noeud
+    sont order[starts[n]:ends[n]] et ses enfants children[n] (None pour une
+    feuille). La recherche parcourt l'arbre « meilleur d'abord » et ignore
+    tout noeud dont la borne inférieure dépasse la k-ième meilleure distance
+    courante ; les sous-classes fournissent les bornes, calculées pour tous
+    les noeuds à la fois par une opération vectorisée.
+
+    Le parcours lui-même reste du Python, requête par requête : l'arbre ne
+    bat le parcours linéaire en temps que si une distance coûte cher
+    (métrique sans produit matriciel) ou si l'on ne peut pas se permettre
+    une matrice de distances par bloc. Pour des requêtes euclidiennes par
+    blocs, le parcours linéaire vectorisé reste plus rapide malgré ses
+    distances bien plus nombreuses ; tests/performance/test_tree_pruning.py
+    mesure les deux (distances calculées et temps par requête).
+
+    Les lignes ajoutées par `add` ne sont pas insérées dans l'arbre : elles
+    sont comparées exhaustivement à chaque requête, et l'arbre n'est
+    reconstruit que lorsqu'elles dépassent 1/8 des lignes indexées. Les
+    lignes supprimées restent dans l'arbre (ses bornes restent valides) et
+    sont écartées des feuilles.
+    """
+    _array_attributes = NeighborIndex._array_attributes + ("order",)
+
+    def __init__(self, leaf_size: int = 64):
+        super().__init__()
+        if leaf_size < 1:
+            raise ValueError("leaf_size doit être supérieur ou égal à 1")
+        self.leaf_size = leaf_size
+        self.order = None
+        self.n_indexed = 0
+        self.distance_evaluations = 0
+        self.queries_processed = 0
+
+    def _build_tree(self):
+        self.n_indexed = len(self.vectors)
+        self.order = np.arange(len(self.vectors))
+        self._starts, self._ends, self._children = [], [], []
+        self._split(0, len(self.vectors))
+        self.distance_evaluations = 0
+        self.queries_processed = 0
+
+    def _split(self, start, end):
+        """Construit récursivement le noeud couvrant order[start:end] et retourne son numéro"""
+        node = len(self._starts)
+        rows = self.order[start:end]
+        self._starts.append(start)
+        self._ends.append(end)
+        self._children.append(None)
+        self._describe_node(rows)
+
+        if end - start <= self.leaf_size:
+            return node
+
+        # Couper en deux moitiés égales selon l'ordre proposé par la sous-classe
+        middle = (end - start) // 2
+        self.order[start:end] = rows[self._split_order(rows, middle)]
+
+        left = self._split(start, start + middle)
+        right = self._split(start + middle, end)
+        self._children[node] = (left, right)
+        return node
+
+    def _add(self, start):
+        if self.n_rows - self.n_indexed > max(_MIN_PENDING, self.n_indexed // 8):
+            self._build()
+
+    @abstractmethod
+    def _describe_node(self, rows):
+        """Enregistre ce qu'il faut pour borner les distances au noeud contenant `rows`"""
+        pass
+
+    @abstractmethod
+    def _split_order(self, rows, middle):
+        """Permutation de `rows` dont les `middle` premiers éléments forment l'enfant gauche"""
+        pass
+
+    def _query_contexts(self, queries):
+        """Données utilisées par les bornes, calculées une fois par bloc (une ligne par requête)"""
+        return queries
+
+    @abstractmethod
+    def _node_bounds(self, context):
+        """Bornes inférieures de la distance entre la requête et les points de chaque noeud, pour tous les noeuds"""
+        pass
+
+    def _filter_leaf(self, context, node, rows, threshold):
+        """Élimine, avant le calcul exact, les points d'une feuille dont la borne dépasse le seuil"""
+        return rows
+
+    def search(self, queries, k):
+        # Le parcours entremêle distances et sélection : il est mesuré en entier comme « distance »
+        with self._timer("distance", len(queries)):
+            return self._search(queries, k)
+
+    def _search(self, queries, k):
+        # Lignes ajoutées depuis la construction : comparées à tout le bloc en un appel
+        pending = self._live(np.arange(self.n_indexed, self.n_rows))
+        pending_distances = self.distance_strategy.pairwise_distances(
+            queries, self.vectors[pending],
+            None if self.precomputed is None else self.precomputed[pending]
+        )
+        self.distance_evaluations += pending_distances.size
+
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        contexts = self._query_contexts(queries)
+        for i, query in enumerate(queries):
+            distances[i], indices[i] = self._search_one(
+                query, contexts[i], k, pending_distances[i], pending
+            )
+        self.queries_processed += len(queries)
+        return distances, indices
+
+    def _search_one(self, query, context, k, seed_distances, seed_rows):
+        # Bornes de tous les noeuds en une opération, lues ensuite comme des floats Python
+        bounds = self._node_bounds(context).tolist()
+
+        # best : tas max des k meilleurs candidats, stockés sous la forme (-distance, ligne),
+        # initialisé avec les lignes hors de l'arbre
+        best = []
+        threshold = _push_candidates(best, k, seed_distances, seed_rows)
+        pending = [(0.0, 0)]
+
+        # Parcours « meilleur d'abord » : les noeuds les plus prometteurs sont visités en premier
+        while pending:
+            bound, node = heapq.heappop(pending)
+            if bound > threshold:
+                break
+
+            children = self._children[node]
+            if children is not None:
+                for child in children:
+                    child_bound = bounds[child]
+                    if child_bound <= threshold:
+                        heapq.heappush(pending, (child_bound, child))
+                continue
+
+            # Feuille : bornes point par point, puis distance exacte pour les survivants
+            rows = self._filter_leaf(
+                context, node, self._live(self.order[self._starts[node]:self._ends[node]]), threshold
+            )
+            if len(rows) == 0:
+                continue
+
+            precomputed = None if self.precomputed is None else self.precomputed[rows]
+            full = self.distance_strategy.pairwise_distances(
+                query[np.newaxis], self.vectors[rows], precomputed
+            )[0]
+            self.distance_evaluations += len(rows)
+
+            threshold = _push_candidates(best, k, full, rows)
+
+        best.sort(reverse=True)
+        return [-d for d, _ in best], [row for _, row in best]
+
+    def evaluations_per_query(self) -> float:
+        """Nombre moyen de distances calculées en dimension complète par requête"""
+        return self.distance_evaluations / max(1, self.queries_processed)
+
+class KDTreeIndex(_TreeIndex):
+    """
+    Index exact par arbre k-d construit sur des vecteurs réduits par ACP.
+
+    En dimension 784, un arbre k-d n'élague presque rien. L'arbre est donc
+    construit dans l'espace de l'ACP, où la distance entre projections est une
+    borne inférieure de la vraie distance euclidienne. Une feuille n'est
+    visitée que si sa borne est inférieure à la k-ième meilleure distance
+    courante, et seuls les points dont la borne passe ce seuil sont
+    recomparés en dimension complète : le résultat reste exact.
+    """
+    _array_attributes = _TreeIndex._array_attributes + ("reduced", "_lower", "_upper")
+
+    def __init__(self, n_components: Optional[int] = 32, leaf_size: int = 64):
+        """
+        Args:
+            n_components: dimension de l'ACP (None pour construire l'arbre
+                sur les vecteurs complets)
+            leaf_size: nombre maximal de points par feuille
+        """
+        super().__init__(leaf_size)
+        self.n_components = n_components
+        self.projection = None
+        self.reduced = None
+
+    def _build(self):
+        if not isinstance(self.distance_strategy, EuclideanDistance):
+            raise ValueError(
+                "KDTreeIndex nécessite EuclideanDistance : la borne de l'ACP n'est valide "
+                "que pour la distance euclidienne (utiliser BallTreeIndex pour une autre métrique)"
+            )
+
+        if self.n_components is not None and self.n_components < self.vectors.shape[1]:
+            self.projection = PCAProjection(self.n_components).fit(self.vectors)
+            self.reduced = np.ascontiguousarray(self.projection.transform(self.vectors))
+        else:
+            self.projection = None
+            self.reduced = None
+
+        self._lower, self._upper = [], []
+        self._build_tree()
+        self._lower = np.array(self._lower, dtype=np.float32)
+        self._upper = np.array(self._upper, dtype=np.float32)
+
+    def _tree_vectors(self):
+        """Vecteurs dans l'espace où l'arbre est construit (réduit ou complet)"""
+        return self.vectors if self.projection is None else self.reduced
+
+    def _describe_node(self, rows):
+        # Boîte englobante des points du noeud
+        points = self._tree_vectors()[rows]
+        self._lower.append(points.min(axis=0))
+        self._upper.append(points.max(axis=0))
+
+    def _split_order(self, rows, middle):
+        # Couper selon la dimension de plus grande étendue, à la médiane
+        node = len(self._lower) - 1
+        dim = np.argmax(self._upper[node] - self._lower[node])
+        return np.argpartition(self._tree_vectors()[rows, dim], middle)
+
+    def _query_contexts(self, queries):
+        # Projection du bloc entier en un produit matriciel
+        return queries if self.projection is None else self.projection.transform(queries)
+
+    def _node_bounds(self, reduced_query):
+        # Distance entre la requête réduite et la boîte englobante de chaque noeud
+        gap = np.maximum(self._lower - reduced_query, 0) + np.maximum(reduced_query - self._upper, 0)
+        return np.sqrt(np.einsum('ij,ij->i', gap, gap))
+
+    def _filter_leaf(self, reduced_query, node, rows, threshold):
+        if self.projection is None:
+            return rows
+        difference = self.reduced[rows] - reduced_query
+        return rows[np.einsum('ij,ij->i', difference, difference) <= threshold ** 2]
+
+class BallTreeIndex(_TreeIndex):
+    """
+    Index exact par arbre de boules, pour toute distance qui est une métrique.
+
+    Chaque noeud est une boule (centre, rayon). Par l'inégalité triangulaire,
+    aucun point d'une boule n'est à moins de d(q, centre) - rayon de la
+    requête, et dans une feuille aucun point x n'est à moins de
+    |d(q, centre) - d(x, centre)|. Ces bornes ne sont valides que si la
+    stratégie de distance déclare `is_metric`.
+
+    Chaque requête calcule sa distance à tous les centres de noeuds (environ
+    2N / leaf_size) : l'arbre de boules sert les métriques sans borne plus
+    fine ; pour la distance euclidienne, KDTreeIndex élague bien davantage.
+    """
+    _array_attributes = _TreeIndex._array_attributes + (
+        "_centers", "_radii", "_center_distances"
+    )
+
+    def __init__(self, leaf_size: int = 64):
+        """
+        Args:
+            leaf_size: nombre maximal de points par feuille
+        """
+        super().__init__(leaf_size)
+        self._centers = None
+        self._radii = None
+        self._center_distances = None
+
+    def _build(self):
+        if not self.distance_strategy.is_metric:
+            raise ValueError(
+                f"BallTreeIndex nécessite une métrique ; {type(self.distance_strategy).__name__} "
+                "ne vérifie pas l'inégalité triangulaire"
+            )
+
+        self._centers, self._radii = [], []
+        # Distance de chaque point au centre de sa feuille, pour filtrer les feuilles
+        self._center_distances = np.zeros(len(self.vectors), dtype=np.float32)
+        self._build_tree()
+        self._centers = np.array(self._centers, dtype=np.float32)
+        self._radii = np.array(self._radii, dtype=np.float32)
+
+    def _describe_node(self, rows):
+        points = self.vectors[rows]
+        center = points.mean(axis=0, dtype=np.float64).astype(np.float32)
+        distances = self.distance_strategy.pairwise_distances(center[np.newaxis], points)[0]
+        self._centers.append(center)
+        self._radii.append(distances.max())
+        # Les feuilles sont décrites en dernier : leurs valeurs écrasent celles des ancêtres
+        self._center_distances[rows] = distances
+
+    def _split_order(self, rows, middle):
+        # Direction d'étalement : du point le plus éloigné du centre au plus éloigné de celui-ci
+        points = self.vectors[rows]
+        first = points[np.argmax(self._center_distances[rows])]
+        from_first = self.distance_strategy.pairwise_distances(first[np.newaxis], points)[0]
+        second = points[np.argmax(from_first)]
+        return np.argpartition(points @ (second - first), middle)
+
+    def _query_contexts(self, queries):
+        # Une distance par centre de noeud (environ 2N / leaf_size) et par requête,
+        # calculées pour tout le bloc en un seul appel vectorisé
+        self.distance_evaluations += len(queries) * len(self._centers)
+        return self.distance_strategy.pairwise_distances(queries, self._centers)
+
+    def _node_bounds(self, center_distances):
+        return np.maximum(center_distances - self._radii, 0)
+
+    def _filter_leaf(self, center_distances, node, rows, threshold):
+        bounds = np.abs(center_distances[node] - self._center_distances[rows])
+        return rows[bounds <= threshold]
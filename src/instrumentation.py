@@ -0,0 +1,214 @@
+"""
+Instrumentation des étapes coûteuses du classificateur.
+
+Chaque étape (prétraitement, distances, sélection des voisins, vote,
+construction de l'index...) accumule son nombre d'appels, son temps total
+et maximal, et le nombre d'éléments traités. Le coût est de deux lectures
+d'horloge par bloc de requêtes ; désactivée, l'instrumentation ne coûte
+qu'un test.
+"""
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Étapes mesurées, dans l'ordre du chemin d'une requête
+STAGES = ("preprocess", "distance", "selection", "vote", "index_build", "index_update")
+
+_DISABLED = nullcontext()
+
+class _StageTimer:
+    """Contexte de mesure d'une étape"""
+    __slots__ = ("_instrumentation", "_stage", "_items", "_start")
+
+    def __init__(self, instrumentation, stage, items):
+        self._instrumentation = instrumentation
+        self._stage = stage
+        self._items = items
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._instrumentation._record(self._stage, time.perf_counter_ns() - self._start, self._items)
+        return False
+
+class Instrumentation:
+    """
+    Minuteries par étape et compteurs d'événements, sûrs entre threads.
+
+    Usage :
+        with instrumentation.timer("distance", items=len(queries)):
+            ...
+        instrumentation.count("preprocess_pil", 3)
+        instrumentation.snapshot()
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Remet toutes les mesures à zéro"""
+        with self._lock:
+            self._calls = Counter()
+            self._total_ns = Counter()
+            self._max_ns = defaultdict(int)
+            self._items = Counter()
+            self._counters = Counter()
+            self._started = time.time()
+
+    def timer(self, stage: str, items: int = 0):
+        """Contexte mesurant la durée d'une étape, créditée de `items` éléments"""
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, stage, items)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Incrémente un compteur d'événements"""
+        if self.enabled:
+            with self._lock:
+                self._counters[name] += n
+
+    def _record(self, stage, elapsed_ns, items):
+        with self._lock:
+            self._calls[stage] += 1
+            self._total_ns[stage] += elapsed_ns
+            self._items[stage] += items
+            if elapsed_ns > self._max_ns[stage]:
+                self._max_ns[stage] = elapsed_ns
+
+    def snapshot(self) -> Dict:
+        """
+        Instantané des mesures, sérialisable en JSON :
+        {"enabled", "since" (horodatage Unix de la remise à zéro),
+         "stages": {étape: {"calls", "total_s", "max_s", "mean_s", "items"}},
+         "counters": {nom: valeur}}
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "calls": self._calls[stage],
+                    "total_s": self._total_ns[stage] / 1e9,
+                    "max_s": self._max_ns[stage] / 1e9,
+                    "mean_s": self._total_ns[stage] / 1e9 / self._calls[stage],
+                    "items": self._items[stage],
+                }
+                for stage in sorted(self._calls, key=_stage_order)
+            }
+            return {
+                "enabled": self.enabled,
+                "since": self._started,
+                "stages": stages,
+                "counters": dict(self._counters),
+            }
+
+    def __reduce__(self):
+        # Les mesures restent dans le processus qui les a faites
+        return (Instrumentation, (self.enabled,))
+
+def _stage_order(stage):
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), stage)
+
+def to_prometheus(snapshot: Dict, prefix: str = "knn", labels: Optional[Dict[str, str]] = None) -> str:
+    """
+    Convertit un instantané au format texte d'exposition de Prometheus.
+
+    Args:
+        snapshot: résultat de `Instrumentation.snapshot()` (ou de
+            `ImageClassifier.stats()`, dont la partie "caches" est aussi exportée)
+        prefix: préfixe des noms de métriques
+        labels: étiquettes ajoutées à toutes les séries (par exemple le modèle)
+    """
+    def series(name, value, **extra):
+        merged = {**(labels or {}), **extra}
+        label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in merged.items())
+        return f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}"
+
+    lines = []
+    stage_metrics = (
+        ("stage_calls_total", "counter", "calls", "Nombre de passages dans l'étape"),
+        ("stage_seconds_total", "counter", "total_s", "Temps cumulé passé dans l'étape"),
+        ("stage_max_seconds", "gauge", "max_s", "Plus long passage dans l'étape"),
+        ("stage_items_total", "counter", "items", "Éléments traités par l'étape"),
+    )
+    for name, kind, key, help_text in stage_metrics:
+        lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} {kind}"]
+        lines += [series(name, values[key], stage=stage) for stage, values in snapshot["stages"].items()]
+
+    lines += [f"# HELP {prefix}_events_total Compteurs d'événements",
+              f"# TYPE {prefix}_events_total counter"]
+    lines += [series("events_total", value, event=name) for name, value in snapshot["counters"].items()]
+
+    for cache, values in snapshot.get("caches", {}).items():
+        for key in ("hits", "misses", "size"):
+            lines.append(series(f"cache_{key}", values[key], cache=cache))
+    return "\n".join(lines) + "\n"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+@contextmanager
+def profile(path: Union[str, Path], format: str = "pstats", interval: float = 0.001):
+    """
+    Profile le code exécuté dans le bloc et écrit la trace dans `path`.
+
+    - "pstats" : profil cProfile (lisible par pstats, snakeviz, gprof2dot...)
+    - "folded" : piles échantillonnées toutes les `interval` secondes dans
+      le thread appelant, au format « pile;repliée nombre » de flamegraph.pl,
+      speedscope ou inferno
+
+    Usage :
+        with profile("batch.folded", format="folded"):
+            classifier.predict_batch(images)
+    """
+    if format == "pstats":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(path))
+    elif format == "folded":
+        sampler = _StackSampler(threading.get_ident(), interval)
+        sampler.start()
+        try:
+            yield sampler
+        finally:
+            sampler.stop()
+            Path(path).write_text(sampler.folded())
+    else:
+        raise ValueError(f"Format de profil inconnu : {format!r} (pstats ou folded)")
+
+class _StackSampler(threading.Thread):
+    """Échantillonne la pile d'un thread à intervalle régulier"""
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
@@ -1,26 +1,301 @@
-from .strategies import EuclideanDistance, MNISTPreprocessing
-from concurrent.futures import ThreadPoolExecutor
-import heapq
+from .strategies.distance import EuclideanDistance
+from .strategies.preprocessing import MNISTPreprocessing
+from .index import QuantizedIndex, ScalarQuantizer, make_index
+from .parallel import ProcessPoolPredictor, effective_n_jobs
+from .persistence import load_classifier, save_classifier
+from .cache import LRUCache
+from .buffers import RowBuffers
+from .instrumentation import Instrumentation, profile
+from .voting import WEIGHTS, class_votes, first_ranks, neighbor_weights, probabilities, winners
+import copy
+import hashlib
+import os
+import numpy as np
+
+# Nombre d'images prétraitées ensemble par le chemin vectorisé
+_PREPROCESS_CHUNK = 1024
+
+def _as_array_batch(images):
+    """
+    Retourne les images sous la forme d'un seul tableau (N, ...) si elles sont
+    toutes des tableaux NumPy de même forme et de même type, None sinon.
+    """
+    if isinstance(images, np.ndarray) and images.ndim >= 3:
+        return images
+    if len(images) == 0 or not all(isinstance(image, np.ndarray) for image in images):
+        return None
+    first = images[0]
+    if any(image.shape != first.shape or image.dtype != first.dtype for image in images):
+        return None
+    return np.stack(images)
 
 class ImageClassifier:
-    def __init__(self, k=3, distance_strategy=None, preprocessing_strategy=None):
+    def __init__(self, k=3, distance_strategy=None, preprocessing_strategy=None, block_size=128,
+                 index="brute", n_jobs=1, storage="float32", cache_size=0, path_cache_size=0,
+                 compaction_threshold=0.25, instrument=True, weights="uniform"):
+        """
+        Args:
+            k: Nombre de voisins utilisés pour le vote
+            distance_strategy: Stratégie de calcul de distance (euclidienne par défaut)
+            preprocessing_strategy: Stratégie de prétraitement (MNIST par défaut)
+            block_size: Nombre de requêtes traitées ensemble ; borne la mémoire
+                de la matrice de distances à block_size x N
+            index: Index de recherche des voisins : "brute" (exact), "ivf"
+                (approché), "kdtree" (exact, élagage sur ACP, euclidien),
+                "balltree" (exact, toute métrique), "pruned" (exact, abandon
+                précoce, euclidien), "sharded" (exact, vecteurs sur disque),
+                ou une instance de NeighborIndex déjà paramétrée
+            n_jobs: Nombre de processus utilisés pour les prédictions par lot
+                (-1 pour tous les coeurs). Les données d'entraînement sont
+                partagées entre processus via la mémoire partagée.
+            storage: Stockage des vecteurs d'entraînement : "float32", ou
+                "uint8" / "int8" pour un stockage quantifié 4 fois plus
+                compact (index "brute" uniquement ; voir QuantizedIndex)
+            cache_size: Nombre de prédictions mémorisées, indexées par une
+                empreinte des octets de l'image prétraitée (0 pour désactiver).
+                Les images en double ne repassent pas par la recherche.
+            path_cache_size: Nombre d'images prétraitées mémorisées pour les
+                chemins de fichiers, indexées par (chemin, date de modification)
+                (0 pour désactiver)
+            compaction_threshold: Proportion de lignes supprimées par remove()
+                au-delà de laquelle elles sont retirées physiquement (compactage)
+            instrument: Si True, mesure le temps passé dans chaque étape
+                (prétraitement, distances, sélection, vote...) ; voir stats()
+            weights: Pondération des votes des voisins : "uniform", "distance"
+                (1 / distance) ou "gaussian" (noyau de largeur adaptée à
+                chaque requête) ; voir src.voting
+        """
+        if block_size < 1:
+            raise ValueError("block_size doit être supérieur ou égal à 1")
+        effective_n_jobs(n_jobs)
+        if storage not in ("float32",) + tuple(ScalarQuantizer.LEVELS):
+            raise ValueError(f"Stockage inconnu : {storage!r}")
+        if storage != "float32" and index != "brute":
+            raise ValueError("Le stockage quantifié n'est disponible qu'avec index=\"brute\"")
+        if not 0 < compaction_threshold <= 1:
+            raise ValueError("compaction_threshold doit être compris dans ]0, 1]")
+        if weights not in WEIGHTS:
+            raise ValueError(f"Pondération inconnue : {weights!r}. Valeurs possibles : {', '.join(WEIGHTS)}")
         self.k = k
         self.distance_strategy = distance_strategy or EuclideanDistance()
         self.preprocessing_strategy = preprocessing_strategy or MNISTPreprocessing()
-        self.training_images = None
+        self.block_size = block_size
+        self.index = index
+        self.n_jobs = n_jobs
+        self.storage = storage
+        self.compaction_threshold = compaction_threshold
+        self.weights = weights
+        self.instrumentation = Instrumentation(instrument)
+        # Les deux caches sont vidés dès que le modèle change (voir _invalidate_caches)
+        self._prediction_cache = LRUCache(cache_size)
+        self._path_cache = LRUCache(path_cache_size)
         self.labels = None
+        self.classes_ = None
+        self._label_codes = None
+        # Identifiant stable de chaque ligne d'entraînement, croissant dans l'ordre des lignes
+        self.ids_ = None
+        self._next_id = 0
+        self._buffers = RowBuffers()
+        self._index = None
+        self._pool = None
+
+    @property
+    def training_images(self):
+        """
+        Matrice (N, D) des images d'entraînement prétraitées, ou None avant fit()
+        et avec un stockage qui ne conserve pas les vecteurs float32 en mémoire
+        (quantifié, ou index "sharded" dont les vecteurs sont sur disque)
+        """
+        return None if self._index is None else self._index.vectors
     
     def fit(self, images, labels):
         """Entraîne le classificateur avec des images prétraitées"""
         # Vérifions d'abord que les données sont valides
         if len(images) != len(labels):
             raise ValueError("Le nombre d'images et d'étiquettes doit être identique")
-        
-        # Prétraiter toutes les images d'entraînement
-        with ThreadPoolExecutor() as executor:
-            self.training_images = list(executor.map(self.preprocessing_strategy.preprocess, images))        
-        self.labels = labels
+
+        # Ajuster le prétraitement (ACP...), puis prétraiter toutes les images d'entraînement,
+        # sans le cache de chemins : ses entrées datent des anciens paramètres
+        with self.instrumentation.timer("preprocess"):
+            self.preprocessing_strategy.fit(images)
+        self._fit_vectors(self._preprocess(images, parallel=True, use_cache=False), labels)
+
+    def _fit_vectors(self, training_images, labels):
+        """Entraîne le classificateur sur une matrice (N, D) de vecteurs déjà prétraités"""
+        # Construire l'index une fois pour toutes : les requêtes passeront par lui
+        if self.storage == "float32":
+            index = make_index(self.index)
+        else:
+            index = QuantizedIndex(self.storage)
+        index.instrumentation = self.instrumentation
+        with self.instrumentation.timer("index_build", len(training_images)):
+            index.build(training_images, self.distance_strategy)
+        self._attach_index(index, labels)
+
+    def _attach_index(self, index, labels):
+        """Entraîne le classificateur sur un index déjà construit et les labels de ses lignes"""
+        # Les processus de travail éventuels partagent les anciennes données
+        self.close()
+        self._index = index
+        self._index.instrumentation = self.instrumentation
+        self.labels = np.asarray(labels)
+
+        # Encoder les labels en entiers 0..C-1 pour pouvoir voter avec np.bincount
+        self.classes_, self._label_codes = np.unique(self.labels, return_inverse=True)
+        self.ids_ = np.arange(len(self.labels))
+        self._next_id = len(self.labels)
+        self._buffers.clear()
+
+        # Les résultats calculés pendant l'entraînement ne valent plus pour le nouveau modèle
+        self._invalidate_caches()
     
+    def partial_fit(self, images, labels):
+        """
+        Ajoute des images d'entraînement sans refaire fit() : seules les
+        nouvelles images sont prétraitées, et l'index est mis à jour pour un
+        coût proportionnel à leur nombre (amorti). Sans entraînement
+        préalable, équivaut à fit().
+
+        Args:
+            images: Liste ou tableau des nouvelles images
+            labels: Leurs étiquettes ; de nouvelles classes peuvent apparaître
+
+        Returns:
+            numpy array des identifiants attribués aux nouvelles images, à
+            passer à remove() pour les retirer
+        """
+        if len(images) != len(labels):
+            raise ValueError("Le nombre d'images et d'étiquettes doit être identique")
+        if self._index is None:
+            self.fit(images, labels)
+            return self.ids_.copy()
+        if len(images) == 0:
+            return self.ids_[:0].copy()
+
+        self.close()
+        vectors = self._preprocess(images, parallel=True)
+        with self.instrumentation.timer("index_update", len(vectors)):
+            self._index.add(vectors)
+
+        labels = np.asarray(labels)
+        new_classes = np.setdiff1d(labels, self.classes_)
+        if len(new_classes):
+            # Réencoder les labels existants dans la nouvelle liste triée des classes
+            classes = np.union1d(self.classes_, new_classes)
+            self._label_codes = np.searchsorted(classes, self.classes_)[self._label_codes]
+            self.classes_ = classes
+        self.labels = self._buffers.append("labels", self.labels, labels)
+        self._label_codes = self._buffers.append(
+            "_label_codes", self._label_codes, np.searchsorted(self.classes_, labels)
+        )
+
+        ids = np.arange(self._next_id, self._next_id + len(labels))
+        self.ids_ = self._buffers.append("ids_", self.ids_, ids)
+        self._next_id += len(labels)
+
+        self._invalidate_caches()
+        return ids
+
+    def remove(self, ids):
+        """
+        Retire des images d'entraînement par identifiant (voir `ids_` et
+        partial_fit). Les lignes sont marquées comme supprimées et ne sont
+        plus jamais retournées ; elles ne sont retirées physiquement (et les
+        lignes renumérotées) que lorsque leur proportion dépasse
+        `compaction_threshold`.
+
+        Raises:
+            ValueError: Si un identifiant est inconnu ou déjà retiré
+        """
+        if self._index is None:
+            raise ValueError("Le classificateur doit d'abord être entraîné avec fit()")
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        if len(ids) == 0:
+            return
+
+        # Les identifiants sont croissants dans l'ordre des lignes : recherche dichotomique
+        rows = np.searchsorted(self.ids_, ids)
+        known = rows < len(self.ids_)
+        known[known] = self.ids_[rows[known]] == ids[known]
+        if not known.all():
+            raise ValueError(f"Identifiants inconnus : {ids[~known].tolist()}")
+
+        self.close()
+        with self.instrumentation.timer("index_update", len(rows)):
+            self._index.remove(rows)
+        if self._index.n_deleted > self.compaction_threshold * self._index.n_rows:
+            self.compact()
+        self._invalidate_caches()
+
+    def compact(self):
+        """Retire physiquement les images supprimées par remove() ; les identifiants sont conservés"""
+        if self._index is None or not self._index.n_deleted:
+            return
+        self.close()
+        with self.instrumentation.timer("index_update", self._index.n_deleted):
+            keep = self._index.compact()
+        self.labels = self.labels[keep]
+        self._label_codes = self._label_codes[keep]
+        self.ids_ = self.ids_[keep]
+        self._buffers.clear()
+
+    def reduce(self, method=("wilson", "cnn"), reduced_k=None, **params):
+        """
+        Retourne un nouveau classificateur, de mêmes paramètres, entraîné sur
+        un sous-ensemble réduit (ou des prototypes) des images d'entraînement.
+        Les vecteurs déjà prétraités sont réutilisés tels quels.
+
+        Args:
+            method: "cnn" (Hart), "wilson" (édition), "kmeans" (prototypes
+                par classe) ou une liste de méthodes appliquées dans l'ordre
+            reduced_k: k du classificateur réduit. Par défaut 1 après une
+                condensation ("cnn" ou "kmeans") : un ensemble condensé n'est
+                garanti cohérent qu'en 1-NN, chaque prototype représentant
+                seul sa région. Sinon, le k de ce classificateur.
+            **params: paramètres des méthodes (voir src.reduction)
+
+        Returns:
+            Le classificateur réduit ; `reduction_report` compare sa précision
+            et sa vitesse à celles de l'original
+        """
+        from .reduction import reduce_training_set
+
+        if self._index is None:
+            raise ValueError("Le classificateur doit d'abord être entraîné avec fit()")
+        vectors = self._index.stored_vectors()
+        labels = self.labels
+        if self._index.n_deleted:
+            live = ~self._index.tombstones
+            vectors, labels = vectors[live], labels[live]
+        params.setdefault("distance_strategy", self.distance_strategy)
+
+        vectors, labels = reduce_training_set(vectors, labels, method, **params)
+        methods = [method] if isinstance(method, str) else list(method)
+        reduced = self._clone()
+        if reduced_k is not None:
+            reduced.k = reduced_k
+        elif {"cnn", "kmeans"} & set(methods):
+            reduced.k = 1
+        reduced._fit_vectors(np.ascontiguousarray(vectors, dtype=np.float32), labels)
+        return reduced
+
+    def _clone(self):
+        """Classificateur non entraîné ayant les mêmes paramètres"""
+        index = self.index
+        if not isinstance(index, str):
+            # L'instance configurée est celle qui a été construite : en repartir sans ses tableaux
+            index = index.without_arrays()
+        return ImageClassifier(
+            k=self.k, distance_strategy=self.distance_strategy,
+            # Copie : réajuster le prétraitement du clone ne doit pas modifier celui-ci
+            preprocessing_strategy=copy.deepcopy(self.preprocessing_strategy),
+            block_size=self.block_size,
+            index=index, n_jobs=self.n_jobs, storage=self.storage,
+            cache_size=self._prediction_cache.maxsize, path_cache_size=self._path_cache.maxsize,
+            compaction_threshold=self.compaction_threshold, instrument=self.instrumentation.enabled,
+            weights=self.weights,
+        )
+
     def predict(self, image):
         """
         Prédit la catégorie d'une nouvelle image en utilisant les k plus proches voisins.
@@ -34,35 +309,93 @@ class ImageClassifier:
         Raises:
             ValueError: Si le classificateur n'a pas été entraîné
         """
-        if self.training_images is None:
-            raise ValueError("Le classificateur doit d'abord être entraîné avec fit()")
-        
-        # Vérifier que k est valide
-        if self.k < 1:
-            raise ValueError("k doit être supérieur ou égal à 1")
-        if self.k > len(self.training_images):
-            raise ValueError("k ne peut pas être supérieur au nombre d'images d'entraînement")
-        
-        # Prétraiter l'image d'entrée
-        processed_image = self.preprocessing_strategy.preprocess(image)
-
-        # Calculer les distances avec toutes les images d'entraînement
-        distances = []
-        for i, training_image in enumerate(self.training_images):
-            distance = self.distance_strategy.calculate_distance(processed_image, training_image)
-            distances.append((distance, self.labels[i]))
-        
-        # Trier les distances et prendre les k plus proches
-        k_nearest = heapq.nsmallest(self.k, distances, key=lambda x: x[0])  # Prendre les k plus proches
-        
-        # Voter pour déterminer la classe
-        votes = {}
-        for _, label in k_nearest:
-            votes[label] = votes.get(label, 0) + 1
-        
-        # Retourner la classe qui a reçu le plus de votes
-        return max(votes.items(), key=lambda x: x[1])[0]
+        return self.predict_batch([image])[0]
+
+    def predict_batch(self, images):
+        """
+        Prédit la catégorie de plusieurs images, traitées par blocs de `block_size`.
+
+        Args:
+            images: Liste ou tableau d'images à classifier
+
+        Returns:
+            numpy array des catégories prédites, dans l'ordre des images
+
+        Raises:
+            ValueError: Si le classificateur n'a pas été entraîné ou si k est invalide
+
+        Le cache de prédictions n'est consulté que dans le processus courant :
+        les lots répartis entre processus (n_jobs > 1) ne l'utilisent pas.
+        """
+        if self._use_pool(images):
+            predictions = self._get_pool().map(
+                "predict_batch", images, self.block_size, params=self._worker_params()
+            )
+            return np.concatenate(predictions)
+
+        predictions = [
+            self._predict_block(queries) for queries in self._query_blocks(images, self.k)
+        ]
+        if not predictions:
+            return self.classes_[:0]
+        return self.classes_[np.concatenate(predictions)]
+
+    def kneighbors(self, images, k=None, return_distance=True):
+        """
+        Recherche les k plus proches voisins de chaque image, à la manière de scikit-learn.
+
+        Args:
+            images: Liste ou tableau d'images requêtes
+            k: Nombre de voisins (self.k par défaut)
+            return_distance: Si True, retourne aussi les distances
+
+        Returns:
+            (distances, indices) si return_distance, sinon indices seuls.
+            Les deux sont des matrices (Q, k) triées par distance croissante ;
+            les indices désignent des lignes de `training_images`.
+        """
+        k = self.k if k is None else k
+        if self._use_pool(images):
+            blocks = self._get_pool().map(
+                "kneighbors", images, self.block_size, params=self._worker_params(), k=k
+            )
+        else:
+            blocks = list(self._search_blocks(images, k))
+        if blocks:
+            distances = np.concatenate([d for d, _ in blocks])
+            indices = np.concatenate([i for _, i in blocks])
+        else:
+            distances = np.empty((0, k), dtype=np.float32)
+            indices = np.empty((0, k), dtype=np.intp)
+        return (distances, indices) if return_distance else indices
     
+    def predict_proba(self, images, return_predictions=False):
+        """
+        Scores de chaque classe pour un lot d'images : votes pondérés des k
+        plus proches voisins (voir `weights`), normalisés pour sommer à 1.
+        Une seule recherche de voisins par bloc, comme predict_batch.
+
+        Args:
+            images: Liste ou tableau d'images à classifier
+            return_predictions: Si True, retourne aussi les catégories prédites,
+                tirées des mêmes votes (sans seconde recherche)
+
+        Returns:
+            Matrice (Q, C) des scores, colonnes dans l'ordre de `classes_`,
+            et les prédictions si return_predictions. Les requêtes au score
+            maximal faible peuvent être traitées à part (autre modèle,
+            vérification manuelle).
+        """
+        distances, indices = self.kneighbors(images)
+        neighbor_codes = self._label_codes[indices]
+        n_classes = len(self.classes_)
+        with self.instrumentation.timer("vote", len(neighbor_codes)):
+            votes = class_votes(neighbor_codes, neighbor_weights(distances, self.weights), n_classes)
+            scores = probabilities(votes)
+            if not return_predictions:
+                return scores
+            return scores, self.classes_[winners(votes, first_ranks(neighbor_codes, n_classes))]
+
     def evaluate(self, test_images, test_labels):
         """
         Évalue la performance du classificateur sur un ensemble de test.
@@ -76,19 +409,267 @@ class ImageClassifier:
         """
         if len(test_images) != len(test_labels):
             raise ValueError("Le nombre d'images et d'étiquettes doit être identique.")
-        if not test_images or not test_labels:
+        if len(test_images) == 0:
             raise ValueError("Les données de test ne peuvent pas être vides.")
         
-        correct = 0
-        total = len(test_labels)
-        
-        for image, true_label in zip(test_images, test_labels):
-            try:
-                predicted = self.predict(image)
-                if predicted == true_label:
-                    correct += 1
-            except Exception as e:
-                print(f"Erreur lors de la prédiction pour une image : {e}")
+        predictions = self.predict_batch(test_images)
+        return float(np.mean(predictions == np.asarray(test_labels)))
+
+    def save(self, path):
+        """
+        Enregistre le classificateur entraîné dans le répertoire `path`, dans un
+        format versionné dont les tableaux peuvent être projetés en mémoire.
+        """
+        return save_classifier(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Recharge un classificateur enregistré avec `save`.
+
+        Args:
+            path: Répertoire du modèle
+            mmap: Si True, les tableaux sont projetés en mémoire (np.load avec
+                mmap_mode='r') et lus à la demande au lieu d'être copiés
+
+        Returns:
+            Le classificateur, prêt à prédire
+        """
+        classifier = load_classifier(path, mmap=mmap)
+        if not isinstance(classifier, cls):
+            raise TypeError(f"Le modèle enregistré n'est pas un {cls.__name__}")
+        return classifier
+
+    def stats(self):
+        """
+        Instantané des mesures, sérialisable en JSON (voir
+        src.instrumentation.to_prometheus pour l'exposer à Prometheus) :
+        {"enabled", "since", "stages": {étape: {"calls", "total_s", "max_s",
+        "mean_s", "items"}}, "counters": {...}, "caches": cache_info()}
+
+        Avec n_jobs > 1, les étapes exécutées dans les processus de travail
+        n'y figurent pas.
+        """
+        snapshot = self.instrumentation.snapshot()
+        snapshot["caches"] = self.cache_info()
+        return snapshot
+
+    def reset_stats(self):
+        """Remet les mesures à zéro"""
+        self.instrumentation.reset()
+
+    def profile(self, path, format="pstats"):
+        """
+        Contexte écrivant une trace de profilage du code exécuté dans le bloc :
+        "pstats" (cProfile) ou "folded" (piles repliées pour flamegraph.pl
+        ou speedscope).
+
+        Usage :
+            with classifier.profile("lot.folded", format="folded"):
+                classifier.predict_batch(images)
+        """
+        return profile(path, format)
+
+    def cache_info(self):
+        """Compteurs des caches de prédictions et de chemins : hits, misses, taille"""
+        return {
+            "predictions": self._prediction_cache.stats(),
+            "paths": self._path_cache.stats(),
+        }
+
+    def clear_cache(self):
+        """Vide les caches de prédictions et de chemins"""
+        self._invalidate_caches()
+
+    def close(self):
+        """Arrête les processus de travail et libère la mémoire partagée"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def _invalidate_caches(self):
+        """Appelé à chaque modification du modèle : les résultats mémorisés deviennent faux"""
+        self._prediction_cache.clear()
+        self._path_cache.clear()
+
+    def _use_pool(self, images):
+        """Le parallélisme par processus ne vaut que s'il y a plusieurs blocs à répartir"""
+        return (
+            effective_n_jobs(self.n_jobs) > 1
+            and self._index is not None
+            and len(images) > self.block_size
+        )
+
+    def _get_pool(self):
+        """Démarre les processus de travail à la première utilisation, puis les réutilise"""
+        if self._pool is None:
+            self._pool = ProcessPoolPredictor(self, effective_n_jobs(self.n_jobs))
+        return self._pool
+
+    def _worker_params(self):
+        """Paramètres de prédiction transmis aux processus de travail à chaque appel"""
+        return {"k": self.k, "weights": self.weights}
+
+    def _array_state(self):
+        """Grands tableaux du classificateur et de son index, par nom"""
+        arrays = {"labels": self.labels, "_label_codes": self._label_codes, "ids_": self.ids_}
+        arrays.update({f"index.{name}": array for name, array in self._index.get_arrays().items()})
+        return arrays
+
+    def _set_array_state(self, arrays):
+        """Réattache des tableaux obtenus par `_array_state`"""
+        self.labels = arrays["labels"]
+        self._label_codes = arrays["_label_codes"]
+        self.ids_ = arrays.get("ids_")
+        if self.ids_ is None:
+            # Modèle enregistré avant l'ajout des identifiants
+            self.ids_ = np.arange(len(self.labels))
+            self._next_id = len(self.labels)
+        self._index.set_arrays({
+            name[len("index."):]: array for name, array in arrays.items()
+            if name.startswith("index.")
+        })
+
+    def _without_arrays(self):
+        """Copie légère du classificateur, sans ses grands tableaux ni ses processus"""
+        stripped = copy.copy(self)
+        stripped.labels = None
+        stripped._label_codes = None
+        stripped.ids_ = None
+        stripped._index = self._index.without_arrays()
+        stripped._pool = None
+        return stripped
+
+    def __getstate__(self):
+        # Les processus de travail ne se sérialisent pas
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def __setstate__(self, state):
+        # Les modèles enregistrés avant l'ajout des caches n'en ont pas
+        state.setdefault("_prediction_cache", LRUCache(0))
+        state.setdefault("_path_cache", LRUCache(0))
+        state.setdefault("_next_id", 0)
+        state.setdefault("weights", "uniform")
+        if "instrumentation" not in state:
+            state["instrumentation"] = Instrumentation()
+            if state.get("_index") is not None:
+                state["_index"].instrumentation = state["instrumentation"]
+        state["_buffers"] = RowBuffers()
+        self.__dict__.update(state)
+
+    def _preprocess(self, images, parallel=False, use_cache=True):
+        """Prétraite une liste d'images et retourne une matrice (N, D) contiguë en float32"""
+        with self.instrumentation.timer("preprocess", len(images)):
+            return self._preprocess_images(images, parallel, use_cache)
+
+    def _preprocess_images(self, images, parallel, use_cache):
+        batch = _as_array_batch(images)
+        if batch is None:
+            # Chemins, images PIL ou tableaux hétérogènes : une image à la fois
+            self.instrumentation.count("preprocess_per_image", len(images))
+            preprocess_one = self._preprocess_one if use_cache else self.preprocessing_strategy.preprocess
+            if parallel:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor() as executor:
+                    processed = list(executor.map(preprocess_one, images))
+            else:
+                processed = [preprocess_one(image) for image in images]
+            processed = np.stack([np.asarray(image).reshape(-1) for image in processed])
+        else:
+            # Lot homogène : prétraitement vectorisé, par tranches pour borner la mémoire
+            self.instrumentation.count("preprocess_vectorized", len(images))
+            processed = np.concatenate([
+                self.preprocessing_strategy.preprocess_batch(batch[start:start + _PREPROCESS_CHUNK])
+                .reshape(min(_PREPROCESS_CHUNK, len(batch) - start), -1)
+                for start in range(0, len(batch), _PREPROCESS_CHUNK)
+            ])
+
+        # Une seule matrice contiguë (N, D) en float32 : chaque image devient une ligne
+        return np.ascontiguousarray(processed, dtype=np.float32)
+
+    def _preprocess_one(self, image):
+        """Prétraite une image ; les chemins de fichiers passent par le cache de chemins"""
+        if not isinstance(image, str) or self._path_cache.maxsize == 0:
+            return self.preprocessing_strategy.preprocess(image)
+
+        # La date de modification invalide l'entrée si le fichier est réécrit
+        try:
+            key = (os.path.abspath(image), os.stat(image).st_mtime_ns)
+        except OSError:
+            # Même erreur que sans cache
+            raise ValueError("Le chemin spécifié est invalide ou le fichier est introuvable.")
+        processed = self._path_cache.get(key)
+        if processed is None:
+            processed = np.asarray(self.preprocessing_strategy.preprocess(image))
+            processed.setflags(write=False)
+            self._path_cache.put(key, processed)
+        return processed
+
+    def _predict_block(self, queries):
+        """Codes des classes prédites pour un bloc (B, D) de requêtes prétraitées"""
+        self.instrumentation.count("predictions", len(queries))
+        if self._prediction_cache.maxsize == 0:
+            distances, indices = self._index.search(queries, self.k)
+            return self._vote(self._label_codes[indices], distances)
+
+        # k et la pondération font partie de la clé : les changer ne doit pas réutiliser d'anciens votes
+        keys = [
+            (self.k, self.weights, hashlib.blake2b(query.data, digest_size=16).digest())
+            for query in queries
+        ]
+        # Les doublons d'un même bloc ne sont cherchés qu'une fois
+        first_rows = {}
+        for row, key in enumerate(keys):
+            first_rows.setdefault(key, row)
+        unique_codes = {key: self._prediction_cache.get(key, -1) for key in first_rows}
+
+        # Seules les requêtes absentes du cache passent par la recherche
+        missing = [key for key, code in unique_codes.items() if code < 0]
+        if missing:
+            distances, indices = self._index.search(
+                queries[[first_rows[key] for key in missing]], self.k
+            )
+            for key, code in zip(missing, self._vote(self._label_codes[indices], distances).tolist()):
+                unique_codes[key] = code
+                self._prediction_cache.put(key, code)
+        return np.array([unique_codes[key] for key in keys], dtype=np.intp)
+
+    def _query_blocks(self, images, k):
+        """Générateur : vérifie l'état du modèle puis produit les requêtes prétraitées par blocs"""
+        self._check_searchable(k)
+        for start in range(0, len(images), self.block_size):
+            yield self._preprocess(images[start:start + self.block_size])
+
+    def _check_searchable(self, k):
+        """Vérifie que le modèle est entraîné et que k voisins peuvent être cherchés"""
+        if self._index is None:
+            raise ValueError("Le classificateur doit d'abord être entraîné avec fit()")
         
-        accuracy = correct / total
-        return accuracy
+        # Vérifier que k est valide
+        if k < 1:
+            raise ValueError("k doit être supérieur ou égal à 1")
+        if k > len(self._index):
+            raise ValueError("k ne peut pas être supérieur au nombre d'images d'entraînement")
+
+    def _search_blocks(self, images, k):
+        """
+        Générateur : prétraite les requêtes par blocs et produit, pour chaque bloc,
+        les matrices (B, k) des distances et indices des k plus proches voisins.
+        """
+        for queries in self._query_blocks(images, k):
+            yield self._index.search(queries, k)
+
+    def _vote(self, neighbor_codes, distances):
+        """
+        Vote vectorisé sur les matrices (B, k) des labels encodés et des
+        distances des voisins. Retourne le code de la classe gagnante pour
+        chaque ligne ; une égalité est remportée par la classe du voisin le
+        plus proche.
+        """
+        with self.instrumentation.timer("vote", len(neighbor_codes)):
+            n_classes = len(self.classes_)
+            votes = class_votes(neighbor_codes, neighbor_weights(distances, self.weights), n_classes)
+            return winners(votes, first_ranks(neighbor_codes, n_classes))
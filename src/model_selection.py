@@ -0,0 +1,137 @@
+"""
+Sélection de modèle : validation croisée en k plis et balayage de k.
+
+Pour chaque pli, le prétraitement (ACP...) est ajusté sur les seules images
+d'entraînement du pli, puis les voisins de chaque image de validation sont
+cherchés une seule fois, jusqu'à `k_max`. Comme ils sont triés par distance, les
+votes de tous les k de 1 à `k_max` s'obtiennent par une somme cumulée sur
+les rangs : toute la table de précision coûte à peu près une évaluation.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence
+import numpy as np
+from .parallel import effective_n_jobs
+from .voting import WEIGHTS, first_ranks, votes_by_k, winners
+
+def stratified_folds(labels: np.ndarray, n_folds: int = 5, random_state: Optional[int] = 0) -> np.ndarray:
+    """
+    Numéro de pli (0..n_folds-1) de chaque exemple, chaque classe étant
+    répartie le plus également possible entre les plis.
+    """
+    labels = np.asarray(labels)
+    if not 2 <= n_folds <= len(labels):
+        raise ValueError("n_folds doit être compris entre 2 et le nombre d'exemples")
+    rng = np.random.default_rng(random_state)
+    _, codes = np.unique(labels, return_inverse=True)
+
+    # Mélanger, puis numéroter les exemples de chaque classe dans l'ordre mélangé
+    order = rng.permutation(len(labels))
+    order = order[np.argsort(codes[order], kind='stable')]
+    class_starts = np.searchsorted(codes[order], codes[order])
+    folds = np.empty(len(labels), dtype=np.intp)
+    folds[order] = (np.arange(len(labels)) - class_starts) % n_folds
+    return folds
+
+def cross_validate_k(images, labels, k_max: int = 15, n_folds: int = 5,
+                     weights: Sequence[str] = ("uniform", "distance"), classifier=None,
+                     n_jobs: int = 1, random_state: Optional[int] = 0) -> Dict:
+    """
+    Précision en validation croisée de tous les k de 1 à `k_max`, pour
+    chaque pondération des votes, en une seule recherche de voisins par pli.
+
+    Args:
+        images: images d'entraînement ; chaque pli ajuste son propre
+            prétraitement sur ses images d'entraînement, sans voir celles de validation
+        labels: labels correspondants
+        k_max: plus grand k évalué
+        n_folds: nombre de plis (stratifiés par classe)
+        weights: pondérations évaluées ("uniform", "distance", "gaussian")
+        classifier: ImageClassifier modèle dont les stratégies et l'index
+            sont repris (ImageClassifier() par défaut) ; il n'est pas modifié
+        n_jobs: nombre de plis traités simultanément (-1 pour tous les coeurs)
+        random_state: graine du découpage en plis
+
+    Returns:
+        Dictionnaire :
+        - "k" : tableau des k évalués (1..k_max)
+        - "scores" : {pondération: matrice (n_folds, k_max) des précisions}
+        - "mean", "std" : {pondération: précision moyenne et écart-type par k}
+        - "best" : {"weights", "k", "accuracy"} de la meilleure moyenne
+    """
+    from .knn import ImageClassifier
+
+    labels = np.asarray(labels)
+    if len(images) != len(labels):
+        raise ValueError("Le nombre d'images et d'étiquettes doit être identique")
+    unknown = [name for name in weights if name not in WEIGHTS]
+    if unknown:
+        raise ValueError(f"Pondération inconnue : {unknown[0]!r}. Valeurs possibles : {', '.join(WEIGHTS)}")
+
+    # Copie non entraînée : chaque pli en repart, sans modifier `classifier`
+    template = (classifier if classifier is not None else ImageClassifier())._clone()
+    classes, codes = np.unique(labels, return_inverse=True)
+    folds = stratified_folds(labels, n_folds, random_state)
+    if not 1 <= k_max <= len(labels) - np.bincount(folds).max():
+        raise ValueError("k_max doit être compris entre 1 et la taille du plus petit ensemble d'entraînement")
+
+    def score_fold(fold):
+        train_rows, validation_rows = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+        model = template._clone()
+
+        # Prétraitement ajusté sur l'entraînement du pli seulement : la validation
+        # n'influe pas sur la projection, comme pour des images jamais vues
+        with model.instrumentation.timer("preprocess"):
+            model.preprocessing_strategy.fit(_subset(images, train_rows))
+        model._fit_vectors(
+            model._preprocess(_subset(images, train_rows), parallel=True, use_cache=False),
+            labels[train_rows],
+        )
+        validation_vectors = model._preprocess(
+            _subset(images, validation_rows), parallel=True, use_cache=False
+        )
+
+        # Une seule recherche des k_max voisins, par blocs de requêtes
+        train_codes = codes[train_rows]
+        correct = {name: np.zeros(k_max, dtype=np.int64) for name in weights}
+        for start in range(0, len(validation_rows), model.block_size):
+            rows = slice(start, start + model.block_size)
+            distances, indices = model._index.search(validation_vectors[rows], k_max)
+            neighbor_codes = train_codes[indices]
+            ranks = first_ranks(neighbor_codes, len(classes))
+            for name in weights:
+                votes = votes_by_k(neighbor_codes, distances, name, len(classes))
+                predicted = winners(votes, ranks)
+                correct[name] += (predicted == codes[validation_rows[rows]][:, np.newaxis]).sum(axis=0)
+        return {name: correct[name] / len(validation_rows) for name in weights}
+
+    with ThreadPoolExecutor(max_workers=min(n_folds, effective_n_jobs(n_jobs))) as executor:
+        fold_scores = list(executor.map(score_fold, range(n_folds)))
+
+    scores = {name: np.array([fold[name] for fold in fold_scores]) for name in weights}
+    mean = {name: scores[name].mean(axis=0) for name in weights}
+    best_weights = max(weights, key=lambda name: mean[name].max())
+    best_k = int(np.argmax(mean[best_weights])) + 1
+    return {
+        "k": np.arange(1, k_max + 1),
+        "scores": scores,
+        "mean": mean,
+        "std": {name: scores[name].std(axis=0) for name in weights},
+        "best": {"weights": best_weights, "k": best_k, "accuracy": float(mean[best_weights][best_k - 1])},
+    }
+
+def _subset(images, rows):
+    """Lignes `rows` d'un tableau d'images ou d'une liste (chemins...)"""
+    return images[rows] if isinstance(images, np.ndarray) else [images[i] for i in rows]
+
+def format_results(results: Dict) -> str:
+    """Table texte des précisions moyennes (± écart-type) par k et par pondération"""
+    names = list(results["mean"])
+    lines = ["k    " + "".join(f"{name:>20}" for name in names)]
+    for i, k in enumerate(results["k"]):
+        cells = "".join(
+            f"{results['mean'][name][i]:>12.4f} ± {results['std'][name][i]:.4f}" for name in names
+        )
+        lines.append(f"{k:<5}{cells}")
+    best = results["best"]
+    lines.append(f"Meilleur : k={best['k']}, votes {best['weights']}, précision {best['accuracy']:.4f}")
+    return "\n".join(lines)
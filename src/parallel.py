@@ -0,0 +1,141 @@
+import os
+import weakref
+from typing import TYPE_CHECKING, Dict, Tuple
+import numpy as np
+
+# multiprocessing n'est importé qu'au démarrage d'un pool ou d'un segment
+# partagé : les classificateurs séquentiels (n_jobs=1) ne le chargent pas
+if TYPE_CHECKING:
+    from multiprocessing import shared_memory
+
+class SharedArray:
+    """
+    Tableau NumPy publié dans un segment de mémoire partagée.
+
+    Le processus qui crée le tableau en est propriétaire et libère le segment
+    avec `unlink()`. Les autres processus s'y rattachent avec `attach()` à
+    partir de la description retournée par `spec`, sans copie ni sérialisation
+    des données.
+    """
+    def __init__(self, shm: "shared_memory.SharedMemory", shape: Tuple[int, ...], dtype,
+                 owner: bool):
+        self.shm = shm
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        self._owner = owner
+
+    @classmethod
+    def create(cls, array: np.ndarray) -> "SharedArray":
+        """Copie `array` une seule fois dans un nouveau segment de mémoire partagée"""
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        shared = cls(shm, array.shape, array.dtype, owner=True)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, Tuple[int, ...], str]) -> "SharedArray":
+        """Se rattache à un segment existant décrit par `spec`"""
+        from multiprocessing import shared_memory
+
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, np.dtype(dtype), owner=False)
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        """Description picklable (nom, forme, dtype) du segment"""
+        return self.shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self) -> None:
+        self.array = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Ferme et, pour le propriétaire, détruit le segment"""
+        self.close()
+        if self._owner:
+            self.shm.unlink()
+
+# État propre à chaque processus de travail, initialisé une seule fois
+_worker_classifier = None
+_worker_segments = []
+
+def _init_worker(template, specs: Dict[str, Tuple]) -> None:
+    """Reconstruit le classificateur dans le processus de travail à partir de la mémoire partagée"""
+    global _worker_classifier
+    arrays = {}
+    for name, spec in specs.items():
+        segment = SharedArray.attach(spec)
+        _worker_segments.append(segment)
+        arrays[name] = segment.array
+    template._set_array_state(arrays)
+    _worker_classifier = template
+
+def _run_worker(method: str, images, params: Dict, kwargs):
+    # Les paramètres modifiables après le démarrage du pool (k, pondération)
+    # accompagnent chaque appel : la copie initiale du processus peut être périmée
+    for name, value in params.items():
+        setattr(_worker_classifier, name, value)
+    return getattr(_worker_classifier, method)(images, **kwargs)
+
+class ProcessPoolPredictor:
+    """
+    Répartit des lots de requêtes entre plusieurs processus.
+
+    Les grands tableaux du classificateur (matrice d'entraînement, normes,
+    structures d'index, labels) sont publiés une seule fois en mémoire
+    partagée ; chaque processus ne reçoit qu'une copie légère du classificateur
+    qui s'y rattache. Seules les images requêtes et les résultats transitent
+    ensuite entre processus.
+    """
+    def __init__(self, classifier, n_jobs: int):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.n_jobs = n_jobs
+        arrays = classifier._array_state()
+        self._segments = {name: SharedArray.create(array) for name, array in arrays.items()}
+
+        # Copie du classificateur sans ses tableaux, exécutée en séquentiel dans chaque processus
+        template = classifier._without_arrays()
+        template.n_jobs = 1
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(template, {name: s.spec for name, s in self._segments.items()}),
+        )
+        self._finalizer = weakref.finalize(
+            self, ProcessPoolPredictor._release, self._executor, list(self._segments.values())
+        )
+
+    def map(self, method: str, images, chunk_size: int, params: Dict = None, **kwargs):
+        """
+        Applique `method` du classificateur à des tranches de `chunk_size` images,
+        dans l'ordre, après avoir appliqué les attributs `params` à la copie de
+        chaque processus.
+        """
+        params = params or {}
+        futures = [
+            self._executor.submit(_run_worker, method, images[start:start + chunk_size], params, kwargs)
+            for start in range(0, len(images), chunk_size)
+        ]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self._finalizer()
+
+    @staticmethod
+    def _release(executor, segments):
+        executor.shutdown(wait=True)
+        for segment in segments:
+            segment.unlink()
+
+def effective_n_jobs(n_jobs: int) -> int:
+    """Traduit n_jobs (entier positif, ou -1 pour tous les coeurs) en nombre de processus"""
+    if n_jobs == -1:
+        return os.cpu_count() or 1
+    if n_jobs < 1:
+        raise ValueError("n_jobs doit être un entier positif ou -1")
+    return n_jobs
@@ -0,0 +1,115 @@
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Union
+import numpy as np
+
+# Version du format sur disque ; à incrémenter à chaque changement incompatible
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.pkl"
+ARRAYS_DIR = "arrays"
+
+def save_classifier(classifier, path: Union[str, Path]) -> Path:
+    """
+    Enregistre un classificateur entraîné dans un répertoire.
+
+    Organisation du répertoire :
+    - manifest.json : version du format et description du modèle
+    - arrays/*.npy : grands tableaux (matrice d'entraînement, normes, labels,
+      structures d'index), relisibles avec np.load(mmap_mode='r')
+    - model.pkl : le reste du classificateur (k, stratégies, paramètres de
+      l'index), sans ses grands tableaux
+
+    Chaque fichier est écrit à côté puis substitué d'un coup : un modèle
+    chargé avec mmap=True peut être réenregistré à son propre emplacement,
+    ses projections gardant l'ancien contenu jusqu'à leur fermeture.
+
+    Returns:
+        Le chemin du répertoire créé
+    """
+    if classifier._index is None:
+        raise ValueError("Le classificateur doit d'abord être entraîné avec fit()")
+
+    path = Path(path)
+    (path / ARRAYS_DIR).mkdir(parents=True, exist_ok=True)
+
+    arrays = {}
+    for name, array in classifier._array_state().items():
+        filename = f"{name}.npy"
+        _write_replace(path / ARRAYS_DIR / filename, lambda f: np.save(f, np.ascontiguousarray(array)))
+        arrays[name] = filename
+
+    _write_replace(
+        path / MODEL_FILE,
+        lambda f: pickle.dump(classifier._without_arrays(), f, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "n_samples": len(classifier._index),
+        "n_features": int(classifier._index.n_features),
+        "k": classifier.k,
+        "distance_strategy": type(classifier.distance_strategy).__name__,
+        "preprocessing_strategy": type(classifier.preprocessing_strategy).__name__,
+        "index": type(classifier._index).__name__,
+        "arrays": arrays,
+    }
+    # Le manifeste en dernier : il n'annonce que des fichiers complets
+    _write_replace(path / MANIFEST_FILE, lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+    return path
+
+def _write_replace(path: Path, write) -> None:
+    """
+    Écrit `path` par `write(fichier binaire)` dans un fichier temporaire, puis
+    le substitue atomiquement : un fichier existant, même projeté en mémoire
+    et en cours de lecture, n'est jamais tronqué.
+    """
+    temporary = path.with_name(path.name + ".tmp")
+    try:
+        with open(temporary, "wb") as f:
+            write(f)
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+def load_classifier(path: Union[str, Path], mmap: bool = True):
+    """
+    Recharge un classificateur enregistré par `save_classifier`.
+
+    Avec mmap=True, les tableaux sont projetés en mémoire en lecture seule :
+    le chargement est quasi instantané, les pages ne sont lues qu'à leur
+    premier accès, et plusieurs processus d'une même machine partagent le
+    même cache de pages.
+
+    Attention : model.pkl est désérialisé avec pickle ; ne charger que des
+    modèles de provenance sûre.
+
+    Raises:
+        FileNotFoundError: Si le répertoire ne contient pas de modèle
+        ValueError: Si la version du format n'est pas prise en charge
+    """
+    path = Path(path)
+    if not (path / MANIFEST_FILE).exists():
+        raise FileNotFoundError(f"Aucun modèle enregistré dans {path}")
+
+    with open(path / MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Version de format non prise en charge : {manifest.get('format_version')} "
+            f"(attendue : {FORMAT_VERSION})"
+        )
+
+    with open(path / MODEL_FILE, "rb") as f:
+        classifier = pickle.load(f)
+
+    mmap_mode = "r" if mmap else None
+    classifier._set_array_state({
+        name: np.load(path / ARRAYS_DIR / filename, mmap_mode=mmap_mode)
+        for name, filename in manifest["arrays"].items()
+    })
+    return classifier
@@ -0,0 +1,233 @@
+"""
+Réduction de l'ensemble d'entraînement : un KNN sur quelques milliers de
+prototypes bien choisis répond 10 à 50 fois plus vite qu'un KNN sur les
+60 000 images MNIST, pour une précision voisine.
+
+Chaque méthode prend un tableau (N, ...) d'images ou de vecteurs (par
+exemple `ImageClassifier.training_images` ou le résultat de
+`MNISTDataset.get_train_data`) et ses labels, et retourne un tableau plus
+petit de même forme par ligne, avec ses labels.
+"""
+import inspect
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+from .buffers import RowBuffers
+from .index import BruteForceIndex
+from .index.ivf import kmeans
+from .strategies import EuclideanDistance
+
+def _as_vectors(images: np.ndarray) -> np.ndarray:
+    """Matrice (N, D) contiguë en float32 d'un tableau (N, ...)"""
+    images = np.asarray(images)
+    return np.ascontiguousarray(images.reshape(len(images), -1), dtype=np.float32)
+
+def condensed_nearest_neighbour(images: np.ndarray, labels: np.ndarray, distance_strategy=None,
+                                block_size: int = 256, max_passes: int = 10,
+                                random_state: Optional[int] = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Plus proches voisins condensés de Hart.
+
+    Part d'un exemple par classe puis ajoute au magasin tout exemple que le
+    1-NN du magasin classe mal, jusqu'à ce qu'une passe complète n'ajoute
+    plus rien : le magasin classe alors correctement tout l'ensemble
+    d'entraînement en 1-NN. Les exemples sont examinés par blocs de
+    `block_size` (tous les mal classés d'un bloc sont ajoutés ensemble), ce
+    qui grossit un peu le magasin par rapport à la version séquentielle mais
+    permet des recherches vectorisées. Méthode sensible au bruit : la faire
+    précéder de `wilson_editing`.
+
+    Returns:
+        Tuple (images, labels) des exemples retenus, dans leur ordre d'origine
+    """
+    rows = condensed_rows(_as_vectors(images), np.asarray(labels), distance_strategy,
+                          block_size, max_passes, random_state)
+    return np.asarray(images)[rows], np.asarray(labels)[rows]
+
+def condensed_rows(vectors, labels, distance_strategy=None, block_size=256, max_passes=10,
+                   random_state=0) -> np.ndarray:
+    """Indices triés des lignes retenues par `condensed_nearest_neighbour`"""
+    _, codes = np.unique(labels, return_inverse=True)
+    order = np.random.default_rng(random_state).permutation(len(vectors))
+
+    # Un premier exemple par classe, dans l'ordre aléatoire
+    _, first = np.unique(codes[order], return_index=True)
+    store = order[first]
+    in_store = np.zeros(len(vectors), dtype=bool)
+    in_store[store] = True
+
+    index = BruteForceIndex()
+    index.build(vectors[store], distance_strategy or EuclideanDistance())
+    buffers = RowBuffers()
+    store_codes = codes[store]
+
+    for _ in range(max_passes):
+        added = False
+        for start in range(0, len(order), block_size):
+            block = order[start:start + block_size]
+            block = block[~in_store[block]]
+            if len(block) == 0:
+                continue
+            _, nearest = index.search(vectors[block], 1)
+            wrong = block[store_codes[nearest[:, 0]] != codes[block]]
+            if len(wrong):
+                index.add(vectors[wrong])
+                store_codes = buffers.append("codes", store_codes, codes[wrong])
+                store = buffers.append("rows", store, wrong)
+                in_store[wrong] = True
+                added = True
+        if not added:
+            break
+    return np.sort(store)
+
+def wilson_editing(images: np.ndarray, labels: np.ndarray, k: int = 3, distance_strategy=None,
+                   block_size: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Édition de Wilson : retire chaque exemple que ses k plus proches voisins
+    (lui-même exclu) classent mal. Supprime le bruit et lisse les frontières
+    entre classes ; la compression seule est faible.
+
+    Returns:
+        Tuple (images, labels) des exemples conservés, dans leur ordre d'origine
+    """
+    rows = edited_rows(_as_vectors(images), np.asarray(labels), k, distance_strategy, block_size)
+    return np.asarray(images)[rows], np.asarray(labels)[rows]
+
+def edited_rows(vectors, labels, k=3, distance_strategy=None, block_size=256) -> np.ndarray:
+    """Indices triés des lignes conservées par `wilson_editing`"""
+    if not 1 <= k < len(vectors):
+        raise ValueError("k doit être compris entre 1 et le nombre d'exemples moins un")
+    classes, codes = np.unique(labels, return_inverse=True)
+    index = BruteForceIndex()
+    index.build(vectors, distance_strategy or EuclideanDistance())
+
+    keep = np.zeros(len(vectors), dtype=bool)
+    for start in range(0, len(vectors), block_size):
+        rows = np.arange(start, min(start + block_size, len(vectors)))
+        _, neighbors = index.search(vectors[rows], k + 1)
+
+        # Exclure l'exemple lui-même ; s'il n'apparaît pas (doublons), garder les k premiers
+        is_self = neighbors == rows[:, np.newaxis]
+        is_self[~is_self.any(axis=1), -1] = True
+        neighbors = neighbors[~is_self].reshape(len(rows), k)
+
+        offsets = np.arange(len(rows))[:, np.newaxis] * len(classes)
+        votes = np.bincount((codes[neighbors] + offsets).ravel(), minlength=len(rows) * len(classes))
+        keep[rows] = votes.reshape(len(rows), len(classes)).argmax(axis=1) == codes[rows]
+    return np.flatnonzero(keep)
+
+def kmeans_prototypes(images: np.ndarray, labels: np.ndarray, n_per_class: int = 100,
+                      n_iter: int = 10, random_state: Optional[int] = 0,
+                      max_samples: Optional[int] = 20000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Prototypes par k-means dans chaque classe : `n_per_class` centroïdes par
+    classe (moins si la classe est plus petite). Les prototypes sont des
+    moyennes d'exemples, pas des exemples ; pour des images entières, ils
+    sont arrondis dans le type d'origine.
+
+    Returns:
+        Tuple (prototypes, labels), les prototypes ayant la forme et le type
+        des lignes d'entrée
+    """
+    if n_per_class < 1:
+        raise ValueError("n_per_class doit être supérieur ou égal à 1")
+    images, labels = np.asarray(images), np.asarray(labels)
+    vectors = _as_vectors(images)
+
+    prototypes, prototype_labels = [], []
+    for label in np.unique(labels):
+        members = vectors[labels == label]
+        centroids = kmeans(members, min(n_per_class, len(members)), n_iter, random_state, max_samples)
+        prototypes.append(centroids)
+        prototype_labels.append(np.full(len(centroids), label, dtype=labels.dtype))
+
+    prototypes = np.concatenate(prototypes).reshape((-1,) + images.shape[1:])
+    if np.issubdtype(images.dtype, np.integer):
+        limits = np.iinfo(images.dtype)
+        prototypes = np.clip(np.rint(prototypes), limits.min, limits.max)
+    return prototypes.astype(images.dtype), np.concatenate(prototype_labels)
+
+# Méthodes disponibles par leur nom
+REDUCTIONS: Dict[str, Callable] = {
+    "cnn": condensed_nearest_neighbour,
+    "wilson": wilson_editing,
+    "kmeans": kmeans_prototypes,
+}
+
+def reduce_training_set(images: np.ndarray, labels: np.ndarray,
+                        method: Union[str, Sequence[str]] = ("wilson", "cnn"),
+                        distance_strategy=None, **params) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Applique une méthode de réduction, ou une suite de méthodes dans l'ordre
+    (par défaut l'édition de Wilson puis la condensation de Hart).
+
+    Args:
+        images: tableau (N, ...) d'images ou de vecteurs
+        labels: labels correspondants
+        method: nom ("cnn", "wilson", "kmeans") ou liste de noms
+        distance_strategy: distance transmise aux méthodes qui l'utilisent
+            ("cnn", "wilson") ; "kmeans" travaille en distance euclidienne
+        **params: paramètres des méthodes ; chaque méthode ne reçoit que
+            ceux qu'elle accepte
+
+    Returns:
+        Tuple (images, labels) réduit
+
+    Raises:
+        ValueError: si une méthode est inconnue, ou si un paramètre n'est
+            accepté par aucune des méthodes demandées
+    """
+    methods = [method] if isinstance(method, str) else list(method)
+    unknown = [name for name in methods if name not in REDUCTIONS]
+    if unknown:
+        raise ValueError(
+            f"Méthode de réduction inconnue : {unknown[0]!r}. "
+            f"Valeurs possibles : {', '.join(REDUCTIONS)}"
+        )
+    # Paramètres nommés de chaque méthode, hors images et labels
+    accepted = {
+        name: list(inspect.signature(REDUCTIONS[name]).parameters)[2:] for name in methods
+    }
+    unexpected = sorted(set(params).difference(*accepted.values()))
+    if unexpected:
+        raise ValueError(
+            f"Paramètre de réduction inconnu : {unexpected[0]!r}. Valeurs possibles pour "
+            f"{', '.join(methods)} : {', '.join(sorted(set().union(*accepted.values())))}"
+        )
+    if distance_strategy is not None:
+        params["distance_strategy"] = distance_strategy
+    for name in methods:
+        images, labels = REDUCTIONS[name](images, labels, **{
+            key: value for key, value in params.items() if key in accepted[name]
+        })
+    return images, labels
+
+def reduction_report(classifier, reduced, test_images, test_labels) -> Dict[str, float]:
+    """
+    Compare un classificateur réduit (voir `ImageClassifier.reduce`) à
+    l'original sur un ensemble de test.
+
+    Returns:
+        Dictionnaire : n_original, n_reduced, compression_ratio, accuracy,
+        reduced_accuracy, accuracy_delta (réduit - original), predict_s,
+        reduced_predict_s et speedup (temps original / temps réduit)
+    """
+    timings = {}
+    accuracies = {}
+    for name, model in (("original", classifier), ("reduced", reduced)):
+        start = time.perf_counter()
+        predictions = model.predict_batch(test_images)
+        timings[name] = time.perf_counter() - start
+        accuracies[name] = float(np.mean(predictions == np.asarray(test_labels)))
+
+    return {
+        "n_original": len(classifier._index),
+        "n_reduced": len(reduced._index),
+        "compression_ratio": len(classifier._index) / len(reduced._index),
+        "accuracy": accuracies["original"],
+        "reduced_accuracy": accuracies["reduced"],
+        "accuracy_delta": accuracies["reduced"] - accuracies["original"],
+        "predict_s": timings["original"],
+        "reduced_predict_s": timings["reduced"],
+        "speedup": timings["original"] / timings["reduced"],
+    }
@@ -0,0 +1,5 @@
+from .batcher import MicroBatcher
+from .client import HTTPClient
+from .server import InferenceServer, decode_image
+
+__all__ = ["MicroBatcher", "HTTPClient", "InferenceServer", "decode_image"]
@@ -0,0 +1,41 @@
+"""
+Sert un ImageClassifier enregistré avec save().
+
+Exemples :
+    python -m src.serving --model models/mnist --port 8000
+    python -m src.serving --model models/mnist --unix /tmp/knn.sock --max-batch-size 64
+"""
+import argparse
+import asyncio
+from ..knn import ImageClassifier
+from .server import InferenceServer
+
+async def _serve(args):
+    server = InferenceServer(
+        ImageClassifier.load(args.model), args.max_batch_size, args.max_wait_ms, args.workers
+    )
+    await server.start(args.host, args.port, args.unix)
+    print(f"Serveur d'inférence à l'écoute sur {server.address}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--model", required=True, help="répertoire du modèle enregistré")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix", help="chemin d'une socket Unix (remplace --host/--port)")
+    parser.add_argument("--max-batch-size", type=int, default=32, help="images par micro-lot")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="attente maximale avant de traiter un lot incomplet")
+    parser.add_argument("--workers", type=int, default=1, help="lots traités simultanément")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+class MicroBatcher:
+    """
+    Regroupe des requêtes concurrentes en micro-lots.
+
+    Chaque appel à `submit` dépose un élément dans une file. Une tâche de
+    fond ouvre un lot au premier élément reçu puis le complète jusqu'à
+    `max_batch_size` éléments ou jusqu'à `max_wait_ms` millisecondes après
+    ce premier élément, selon ce qui arrive en premier. Le lot est traité par
+    `handler` dans un exécuteur, hors de la boucle d'événements ; au plus
+    `max_concurrent_batches` lots sont traités en même temps, les suivants
+    se remplissant pendant ce temps.
+
+    `handler` reçoit la liste des éléments et retourne une liste de même
+    longueur. Un résultat qui est une exception est levé pour la seule
+    requête concernée ; une exception levée par `handler` échoue tout le lot.
+    """
+    def __init__(self, handler: Callable[[List[Any]], Sequence[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, executor: Optional[Executor] = None,
+                 max_concurrent_batches: int = 1):
+        """
+        Args:
+            handler: fonction de traitement d'un lot
+            max_batch_size: nombre maximal d'éléments par lot
+            max_wait_ms: attente maximale, en millisecondes, entre le premier
+                élément d'un lot et son traitement
+            executor: exécuteur des lots (celui de la boucle par défaut)
+            max_concurrent_batches: nombre de lots traités simultanément
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être supérieur ou égal à 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms doit être positif ou nul")
+        if max_concurrent_batches < 1:
+            raise ValueError("max_concurrent_batches doit être supérieur ou égal à 1")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+        self.max_concurrent_batches = max_concurrent_batches
+        self.batches = 0
+        self.requests = 0
+        self._queue = None
+        self._task = None
+        self._slots = None
+        self._running = set()
+
+    async def start(self) -> None:
+        """Démarre la tâche de regroupement sur la boucle courante"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self) -> None:
+        """Arrête le regroupement après avoir terminé les lots en cours"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+        # Les requêtes encore en file ne seront jamais traitées
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Le serveur s'est arrêté"))
+
+    async def submit(self, item: Any) -> Any:
+        """Dépose un élément et attend son résultat"""
+        if self._task is None:
+            raise RuntimeError("MicroBatcher.start() doit être appelé avant submit()")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def stats(self) -> Dict[str, float]:
+        """Nombre de lots et de requêtes traités, et taille moyenne des lots"""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "pending": 0 if self._queue is None else self._queue.qsize(),
+        }
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Un lot ne s'ouvre que lorsqu'un exécuteur est libre : pendant ce
+            # temps, les requêtes s'accumulent et le lot suivant sera plus plein
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Les requêtes arrivées entre-temps complètent le lot sans attente
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            task = loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(self.executor, self.handler, items)
+            if len(results) != len(batch):
+                raise RuntimeError("Le traitement d'un lot doit retourner un résultat par élément")
+        except Exception as error:
+            results = [error] * len(batch)
+        finally:
+            self._slots.release()
+
+        self.batches += 1
+        self.requests += len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # Requête abandonnée par le client (délai dépassé, connexion fermée)
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,69 @@
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+class HTTPClient:
+    """
+    Client HTTP/1.1 asynchrone minimal pour InferenceServer, sur une seule
+    connexion persistante (TCP ou socket Unix). Une requête à la fois par
+    client : ouvrir plusieurs clients pour des requêtes concurrentes.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 8000, unix_path: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self._reader = None
+        self._writer = None
+
+    async def connect(self) -> "HTTPClient":
+        if self.unix_path is not None:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.unix_path)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._writer = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def request(self, method: str, path: str, body: bytes = b"",
+                      content_type: str = "application/octet-stream") -> Tuple[int, Dict]:
+        """Envoie une requête et retourne (code HTTP, réponse JSON décodée ou texte brut)"""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        )
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("Connexion fermée par le serveur")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        payload = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("content-type", "").startswith("text/plain"):
+            return status, payload.decode("utf-8")
+        return status, json.loads(payload) if payload else {}
+
+    async def predict(self, body: bytes, content_type: str = "image/png") -> Tuple[int, Dict]:
+        return await self.request("POST", "/predict", body, content_type)
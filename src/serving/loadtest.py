@@ -0,0 +1,54 @@
+import asyncio
+import io
+import time
+from typing import Dict, Optional, Sequence
+import numpy as np
+from .client import HTTPClient
+
+def encode_npy(image: np.ndarray) -> bytes:
+    """Sérialise une image au format .npy, accepté par POST /predict"""
+    buffer = io.BytesIO()
+    np.save(buffer, image, allow_pickle=False)
+    return buffer.getvalue()
+
+async def run_load_test(bodies: Sequence[bytes], n_requests: int = 1000, concurrency: int = 32,
+                        host: str = "127.0.0.1", port: int = 8000, unix_path: Optional[str] = None,
+                        content_type: str = "application/x-npy") -> Dict[str, float]:
+    """
+    Envoie `n_requests` prédictions à un serveur, depuis `concurrency` clients
+    qui enchaînent chacun leurs requêtes sur une connexion persistante.
+
+    Returns:
+        Dictionnaire : requests, errors, duration_s, qps, et latences
+        p50_ms, p90_ms, p99_ms, max_ms (mesurées côté client)
+    """
+    if n_requests < 1 or concurrency < 1:
+        raise ValueError("n_requests et concurrency doivent être supérieurs ou égaux à 1")
+    counter = iter(range(n_requests))
+    latencies, errors = [], 0
+
+    async def client_loop():
+        nonlocal errors
+        async with HTTPClient(host, port, unix_path) as client:
+            for i in counter:
+                start = time.perf_counter()
+                status, _ = await client.predict(bodies[i % len(bodies)], content_type)
+                latencies.append(time.perf_counter() - start)
+                errors += status != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(min(concurrency, n_requests))))
+    duration = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": duration,
+        "qps": len(latencies) / duration,
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(latencies_ms.max()),
+    }
@@ -0,0 +1,275 @@
+import asyncio
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..instrumentation import to_prometheus
+from .batcher import MicroBatcher
+
+# Taille maximale acceptée pour une image envoyée
+MAX_BODY_BYTES = 10 * 1024 * 1024
+# Taille maximale de la ligne de requête et de chaque en-tête
+MAX_LINE_BYTES = 8192
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+class HTTPError(Exception):
+    """Erreur renvoyée au client avec un code HTTP"""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def decode_image(body: bytes, content_type: str = "") -> np.ndarray:
+    """
+    Décode une image envoyée au serveur.
+
+    Les fichiers .npy (Content-Type application/x-npy) sont lus sans pickle ;
+    tout autre contenu est ouvert avec Pillow (PNG, JPEG, BMP...) et converti
+    en niveaux de gris, ce qui permet de prétraiter les lots d'images de même
+    taille par le chemin vectorisé.
+
+    Raises:
+        ValueError: Si le contenu n'est pas une image lisible
+    """
+    try:
+        if content_type.split(";")[0].strip() == "application/x-npy":
+            return np.load(io.BytesIO(body), allow_pickle=False)
+        from PIL import Image
+        with Image.open(io.BytesIO(body)) as image:
+            return np.asarray(image.convert("L"))
+    except Exception as error:
+        raise ValueError(f"Image illisible : {error}") from error
+
+def _json_value(value):
+    """Convertit une étiquette NumPy en valeur JSON"""
+    return value.item() if isinstance(value, np.generic) else value
+
+class InferenceServer:
+    """
+    Serveur d'inférence asynchrone pour un ImageClassifier entraîné.
+
+    HTTP/1.1 minimal (connexions persistantes, corps de taille connue) sur
+    les flux d'asyncio, en TCP ou sur une socket Unix locale :
+
+    - POST /predict : corps = image (PNG, JPEG... ou .npy) ; réponse
+      {"label": ...}
+    - GET /health : {"status": "ok"}
+    - GET /stats : compteurs du regroupement en micro-lots
+    - GET /metrics : mesures du classificateur et du regroupement, au
+      format texte de Prometheus
+
+    Les requêtes concurrentes sont regroupées par un MicroBatcher : le
+    décodage et predict_batch s'exécutent dans un pool de threads, hors de
+    la boucle d'événements, un lot entier à la fois.
+    """
+    def __init__(self, classifier, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 n_workers: int = 1, request_timeout: float = 30.0):
+        """
+        Args:
+            classifier: ImageClassifier entraîné (par exemple chargé avec load)
+            max_batch_size: nombre maximal d'images par lot
+            max_wait_ms: attente maximale avant de traiter un lot incomplet
+            n_workers: nombre de lots traités simultanément
+            request_timeout: délai maximal de lecture d'une requête et de
+                traitement d'une prédiction, en secondes
+        """
+        if classifier._index is None:
+            raise ValueError("Le classificateur doit d'abord être entraîné avec fit()")
+        self.classifier = classifier
+        self.request_timeout = request_timeout
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="knn-serving")
+        self.batcher = MicroBatcher(
+            self._predict_batch, max_batch_size, max_wait_ms, self._executor,
+            max_concurrent_batches=n_workers,
+        )
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000,
+                    unix_path: Optional[str] = None) -> None:
+        """
+        Démarre l'écoute en TCP (port 0 pour un port libre, voir `address`)
+        ou, si `unix_path` est fourni, sur une socket Unix.
+        """
+        await self.batcher.start()
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, unix_path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+    @property
+    def address(self):
+        """Adresse d'écoute effective : (hôte, port) en TCP, chemin pour une socket Unix"""
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        """Cesse d'accepter des connexions, termine les lots en cours et libère le pool"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.batcher.stop()
+        self._executor.shutdown(wait=True)
+
+    def _metrics(self) -> str:
+        batching = self.batcher.stats()
+        lines = [
+            "# TYPE knn_serving_batches_total counter",
+            f"knn_serving_batches_total {batching['batches']}",
+            "# TYPE knn_serving_requests_total counter",
+            f"knn_serving_requests_total {batching['requests']}",
+            "# TYPE knn_serving_pending gauge",
+            f"knn_serving_pending {batching['pending']}",
+        ]
+        return to_prometheus(self.classifier.stats()) + "\n".join(lines) + "\n"
+
+    def _predict_batch(self, items: List[Tuple[bytes, str]]) -> List:
+        """Décode puis classe un lot ; une image illisible n'échoue que sa propre requête"""
+        results, images, positions = [], [], []
+        for position, (body, content_type) in enumerate(items):
+            try:
+                images.append(decode_image(body, content_type))
+                positions.append(position)
+                results.append(None)
+            except ValueError as error:
+                results.append(HTTPError(400, str(error)))
+
+        if images:
+            try:
+                labels = self.classifier.predict_batch(images)
+            except (TypeError, ValueError):
+                # Une image de forme inutilisable fait échouer le lot : la traiter seule
+                labels = [self._predict_one(image) for image in images]
+            for position, label in zip(positions, labels):
+                results[position] = label
+        return results
+
+    def _predict_one(self, image):
+        try:
+            return self.classifier.predict(image)
+        except (TypeError, ValueError) as error:
+            return HTTPError(400, str(error))
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), self.request_timeout)
+                except asyncio.TimeoutError:
+                    await _write_response(writer, 408, {"error": "Délai de lecture dépassé"}, False)
+                    break
+                except HTTPError as error:
+                    await _write_response(writer, error.status, {"error": str(error)}, False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self._dispatch(method, path, headers, body)
+                await _write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, method: str, path: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple[int, Dict]:
+        path = path.split("?")[0]
+        routes = {"/predict": "POST", "/health": "GET", "/stats": "GET", "/metrics": "GET"}
+        if path not in routes:
+            return 404, {"error": f"Chemin inconnu : {path}"}
+        if method != routes[path]:
+            return 405, {"error": f"Méthode {method} non autorisée sur {path}"}
+
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, self.batcher.stats()
+        if path == "/metrics":
+            return 200, self._metrics()
+
+        if not body:
+            return 400, {"error": "Le corps de la requête doit contenir une image"}
+        try:
+            label = await asyncio.wait_for(
+                self.batcher.submit((body, headers.get("content-type", ""))), self.request_timeout
+            )
+        except HTTPError as error:
+            return error.status, {"error": str(error)}
+        except asyncio.TimeoutError:
+            return 503, {"error": "Délai de prédiction dépassé"}
+        except Exception as error:
+            return 500, {"error": str(error)}
+        return 200, {"label": _json_value(label)}
+
+async def _read_request(reader: asyncio.StreamReader):
+    """
+    Lit une requête HTTP/1.1 : (méthode, chemin, en-têtes, corps), ou None
+    si le client a fermé la connexion.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    if len(line) > MAX_LINE_BYTES:
+        raise HTTPError(400, "Ligne de requête trop longue")
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Ligne de requête invalide")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if len(line) > MAX_LINE_BYTES:
+            raise HTTPError(400, "En-tête trop long")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(400, "Transfer-Encoding chunked non pris en charge ; fournir Content-Length")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Content-Length invalide")
+    if length < 0:
+        raise HTTPError(400, "Content-Length invalide")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Image trop volumineuse (maximum {MAX_BODY_BYTES} octets)")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, payload,
+                          keep_alive: bool) -> None:
+    """Écrit une réponse : JSON pour un dictionnaire, texte brut pour une chaîne"""
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
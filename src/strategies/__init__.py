@@ -1,2 +1,45 @@
-from .distance import EuclideanDistance  # Notre stratégie de distance existante
-from .preprocessing import MNISTPreprocessing  # Notre stratégie de prétraitement existante
\ No newline at end of file
+# Stratégies chargées à la première utilisation (voir src/__init__.py) : le
+# prétraitement n'importe Pillow que pour les images qui en ont besoin
+import importlib
+from typing import TYPE_CHECKING
+
+# Nom public -> module qui le définit
+_LAZY_ATTRIBUTES = {
+    # Nos stratégies de distance
+    **dict.fromkeys((
+        "DistanceStrategy", "EuclideanDistance", "CosineDistance", "ManhattanDistance",
+        "MinkowskiDistance", "ChiSquareDistance",
+    ), ".distance"),
+    # Notre stratégie de prétraitement existante
+    "MNISTPreprocessing": ".preprocessing",
+    # Réduction de dimension pour les index arborescents
+    "PCAProjection": ".projection",
+    # Extraction de caractéristiques avant le calcul des distances
+    **dict.fromkeys((
+        "FeatureExtractor", "FeaturePipeline", "BlockDownsampling", "HOGFeatures", "PCAReduction",
+        "RandomProjection",
+    ), ".features"),
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .distance import (
+        DistanceStrategy, EuclideanDistance, CosineDistance, ManhattanDistance,
+        MinkowskiDistance, ChiSquareDistance,
+    )
+    from .preprocessing import MNISTPreprocessing
+    from .projection import PCAProjection
+    from .features import (
+        FeatureExtractor, FeaturePipeline, BlockDownsampling, HOGFeatures, PCAReduction, RandomProjection,
+    )
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,12 +1,86 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 import numpy as np
 
+# Nombre maximal d'éléments des tableaux intermédiaires (requêtes x vecteurs x dimensions)
+# pour les distances sans forme matricielle
+_BROADCAST_ELEMENTS = 1 << 16
+
 class DistanceStrategy(ABC):
+    # La distance vérifie-t-elle l'inégalité triangulaire ? Les index
+    # arborescents n'élaguent avec elle que si c'est le cas.
+    is_metric = False
+
     @abstractmethod
     def calculate_distance(self, image1, image2):
         pass
 
+    def precompute(self, vectors: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Calcule une fois pour toutes les données auxiliaires associées
+        aux vecteurs d'entraînement (par exemple leurs normes).
+
+        Le résultat doit être indexable ligne par ligne comme `vectors`,
+        afin de pouvoir être découpé en même temps que la matrice.
+        """
+        return None
+
+    def pairwise_distances(self, queries: np.ndarray, vectors: np.ndarray,
+                           precomputed: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcule toutes les distances entre un bloc de requêtes et les vecteurs.
+
+        Implémentation par défaut : boucle sur `calculate_distance`. Les
+        stratégies concrètes la remplacent par une opération matricielle.
+
+        Args:
+            queries: matrice (Q, D) des requêtes
+            vectors: matrice (N, D) des vecteurs d'entraînement
+            precomputed: résultat de `precompute(vectors)`, ou None
+
+        Returns:
+            Matrice (Q, N) des distances
+        """
+        distances = np.empty((len(queries), len(vectors)), dtype=np.float32)
+        for i, query in enumerate(queries):
+            for j, vector in enumerate(vectors):
+                distances[i, j] = self.calculate_distance(query, vector)
+        return distances
+
+def _check_shapes(image1, image2):
+    if image1.shape != image2.shape:
+        raise ValueError("Les images doivent avoir les mêmes dimensions")
+
+def _blocked_reduce(queries, vectors, reduce):
+    """
+    Applique `reduce(q, v)` à des sous-blocs (b, 1, D) x (1, t, D) diffusés,
+    de taille bornée par _BROADCAST_ELEMENTS, et assemble la matrice (Q, N).
+    `reduce` doit réduire le dernier axe.
+    """
+    if queries.shape[1] != vectors.shape[1]:
+        raise ValueError("Les images doivent avoir les mêmes dimensions")
+    dims = max(1, vectors.shape[1])
+    tile = max(1, min(len(vectors), _BROADCAST_ELEMENTS // dims))
+    rows = max(1, _BROADCAST_ELEMENTS // (dims * tile))
+
+    distances = np.empty((len(queries), len(vectors)), dtype=np.float32)
+    for start in range(0, len(vectors), tile):
+        block = vectors[np.newaxis, start:start + tile]
+        for row in range(0, len(queries), rows):
+            distances[row:row + rows, start:start + tile] = reduce(
+                queries[row:row + rows, np.newaxis], block
+            )
+    return distances
+
+def _l1(queries, vectors):
+    """Somme des écarts absolus sur le dernier axe, sans tableau intermédiaire supplémentaire"""
+    difference = queries - vectors
+    np.abs(difference, out=difference)
+    return difference.sum(axis=-1)
+
 class EuclideanDistance(DistanceStrategy):
+    is_metric = True
+
     def calculate_distance(self, image1, image2):
         """
         Calcule la distance euclidienne entre deux images.
@@ -16,9 +90,139 @@ class EuclideanDistance(DistanceStrategy):
         comme un vecteur de 784 valeurs (28*28).
         """
         # Vérification des dimensions
-        if image1.shape != image2.shape:
-            raise ValueError("Les images doivent avoir les mêmes dimensions")
+        _check_shapes(image1, image2)
         
         # La distance euclidienne est la racine carrée de la somme 
         # des différences au carré
         return np.sqrt(np.sum((image1 - image2) ** 2))
+
+    def precompute(self, vectors):
+        """Normes au carré des vecteurs d'entraînement, réutilisées à chaque requête"""
+        return np.einsum('ij,ij->i', vectors, vectors)
+
+    def pairwise_distances(self, queries, vectors, precomputed=None):
+        """
+        Distances euclidiennes (Q, N) via le développement
+        ||a||² + ||b||² - 2ab, calculé en un seul produit matriciel.
+        """
+        if queries.shape[1] != vectors.shape[1]:
+            raise ValueError("Les images doivent avoir les mêmes dimensions")
+        if precomputed is None:
+            precomputed = self.precompute(vectors)
+
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+        squared = queries @ vectors.T
+        squared *= -2
+        squared += query_norms[:, np.newaxis]
+        squared += precomputed[np.newaxis, :]
+        # Les erreurs d'arrondi peuvent produire de petites valeurs négatives
+        np.maximum(squared, 0, out=squared)
+        return np.sqrt(squared, out=squared)
+
+class CosineDistance(DistanceStrategy):
+    """
+    Distance cosinus : 1 - cos(a, b).
+
+    Les inverses des normes d'entraînement sont précalculés : sur des vecteurs
+    ainsi normalisés, un bloc de distances se réduit à un seul produit
+    matriciel. Ce n'est pas une métrique (pas d'inégalité triangulaire).
+    """
+    def calculate_distance(self, image1, image2):
+        _check_shapes(image1, image2)
+        norms = np.linalg.norm(image1) * np.linalg.norm(image2)
+        if norms == 0:
+            return 1.0
+        return 1.0 - np.sum(image1 * image2) / norms
+
+    @staticmethod
+    def _inverse_norms(vectors):
+        norms = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+        # Un vecteur nul n'a pas de direction : similarité nulle avec tout vecteur
+        return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+    def precompute(self, vectors):
+        """Inverses des normes des vecteurs d'entraînement"""
+        return self._inverse_norms(vectors)
+
+    def pairwise_distances(self, queries, vectors, precomputed=None):
+        if queries.shape[1] != vectors.shape[1]:
+            raise ValueError("Les images doivent avoir les mêmes dimensions")
+        if precomputed is None:
+            precomputed = self.precompute(vectors)
+
+        similarities = queries @ vectors.T
+        similarities *= self._inverse_norms(queries)[:, np.newaxis]
+        similarities *= precomputed[np.newaxis, :]
+        return np.subtract(1.0, similarities, out=similarities)
+
+class ManhattanDistance(DistanceStrategy):
+    """Distance L1 : somme des écarts absolus. Métrique."""
+    is_metric = True
+
+    def calculate_distance(self, image1, image2):
+        _check_shapes(image1, image2)
+        return np.sum(np.abs(image1 - image2))
+
+    def pairwise_distances(self, queries, vectors, precomputed=None):
+        return _blocked_reduce(queries, vectors, _l1)
+
+class MinkowskiDistance(DistanceStrategy):
+    """
+    Distance de Minkowski d'ordre p : (somme |a - b|^p)^(1/p).
+
+    p=1 donne la distance de Manhattan, p=2 la distance euclidienne (calculée
+    alors par produit matriciel), p=inf la distance de Tchebychev. C'est une
+    métrique pour p >= 1 uniquement.
+    """
+    def __init__(self, p: float = 3):
+        if p <= 0:
+            raise ValueError("p doit être strictement positif")
+        self.p = p
+        self.is_metric = p >= 1
+        self._euclidean = EuclideanDistance() if p == 2 else None
+
+    def calculate_distance(self, image1, image2):
+        _check_shapes(image1, image2)
+        difference = np.abs(image1 - image2)
+        if np.isinf(self.p):
+            return np.max(difference)
+        return np.sum(difference ** self.p) ** (1 / self.p)
+
+    def precompute(self, vectors):
+        return None if self._euclidean is None else self._euclidean.precompute(vectors)
+
+    def pairwise_distances(self, queries, vectors, precomputed=None):
+        if self._euclidean is not None:
+            return self._euclidean.pairwise_distances(queries, vectors, precomputed)
+        if np.isinf(self.p):
+            return _blocked_reduce(queries, vectors, lambda q, v: np.abs(q - v).max(axis=-1))
+        if self.p == 1:
+            return _blocked_reduce(queries, vectors, _l1)
+        powered = _blocked_reduce(
+            queries, vectors, lambda q, v: (np.abs(q - v) ** self.p).sum(axis=-1)
+        )
+        return np.power(powered, 1 / self.p, out=powered)
+
+class ChiSquareDistance(DistanceStrategy):
+    """
+    Distance du khi-deux entre histogrammes à valeurs positives :
+    1/2 * somme (a - b)² / (a + b), les composantes nulles des deux côtés
+    étant ignorées. Ce n'est pas une métrique.
+    """
+    def calculate_distance(self, image1, image2):
+        _check_shapes(image1, image2)
+        return self._reduce(image1, image2)
+
+    @staticmethod
+    def _reduce(a, b):
+        total = a + b
+        terms = a - b
+        terms *= terms
+        # Pour des histogrammes positifs, a + b = 0 implique a = b = 0 : borner le
+        # dénominateur laisse ces termes nuls sans division conditionnelle (lente)
+        np.maximum(total, np.finfo(np.float32).tiny, out=total)
+        terms /= total
+        return 0.5 * terms.sum(axis=-1)
+
+    def pairwise_distances(self, queries, vectors, precomputed=None):
+        return _blocked_reduce(queries, vectors, self._reduce)
@@ -0,0 +1,229 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Optional, Sequence
+import numpy as np
+from .preprocessing import MNISTPreprocessing, PreprocessingStrategy
+from .projection import PCAProjection
+
+class FeatureExtractor(ABC):
+    """
+    Étape vectorisée d'un FeaturePipeline : transforme un lot (N, ...) de
+    tableaux en un autre lot. Les étapes qui apprennent des paramètres
+    (ACP, projection aléatoire) le font dans `fit`.
+    """
+    def fit(self, batch: np.ndarray) -> "FeatureExtractor":
+        """Apprend les paramètres de l'étape sur un lot ; par défaut, rien à apprendre"""
+        return self
+
+    @abstractmethod
+    def transform(self, batch: np.ndarray) -> np.ndarray:
+        """Transforme un lot (N, ...) et retourne un lot (N, ...) en float32"""
+        pass
+
+    def fit_transform(self, batch: np.ndarray) -> np.ndarray:
+        return self.fit(batch).transform(batch)
+
+def _images(batch: np.ndarray) -> np.ndarray:
+    if batch.ndim != 3:
+        raise ValueError(f"Lot d'images (N, H, W) attendu, reçu un tableau de forme {batch.shape}")
+    return batch
+
+@lru_cache(maxsize=32)
+def _pooling_matrix(in_size: int, factor: int) -> np.ndarray:
+    """Matrice (ceil(in_size / factor), in_size) qui moyenne des groupes de `factor` valeurs"""
+    out_size = -(-in_size // factor)
+    matrix = np.zeros((out_size, in_size), dtype=np.float32)
+    matrix[np.arange(in_size) // factor, np.arange(in_size)] = 1.0 / factor
+    return matrix
+
+class BlockDownsampling(FeatureExtractor):
+    """
+    Réduit chaque image en moyennant des blocs de factor x factor pixels :
+    une image 28x28 devient 14x14 (factor=2) ou 7x7 (factor=4). Les bords
+    qui ne remplissent pas un bloc entier sont complétés par des zéros.
+    """
+    def __init__(self, factor: int = 2):
+        if factor < 1:
+            raise ValueError("factor doit être supérieur ou égal à 1")
+        self.factor = factor
+
+    def transform(self, batch):
+        images = _images(batch).astype(np.float32, copy=False)
+        # Moyenne séparable, comme le rééchantillonnage de MNISTPreprocessing : deux produits matriciels
+        rows = _pooling_matrix(images.shape[1], self.factor)
+        columns = _pooling_matrix(images.shape[2], self.factor)
+        return rows @ images @ columns.T
+
+class HOGFeatures(FeatureExtractor):
+    """
+    Histogrammes de gradients orientés (HOG), calculés pour tout le lot à la fois.
+
+    Le gradient de chaque pixel (différences centrées) vote, pondéré par sa
+    norme, dans l'histogramme des orientations (non signées, 0-180°) de sa
+    cellule, réparti entre les deux classes d'angle les plus proches. Les
+    histogrammes sont normalisés par blocs de block x block cellules
+    (L2-Hys : normalisation, écrêtage à 0.2, renormalisation), ce qui rend le
+    descripteur insensible au contraste et à l'épaisseur du trait.
+
+    Pour une image 28x28 avec les valeurs par défaut : 4x4 cellules de 7
+    pixels, 3x3 blocs de 2x2 cellules, 9 orientations, soit 324 valeurs.
+    """
+    def __init__(self, cell_size: int = 7, n_bins: int = 9, block: int = 2, clip: float = 0.2):
+        if cell_size < 1 or n_bins < 1 or block < 1:
+            raise ValueError("cell_size, n_bins et block doivent être supérieurs ou égaux à 1")
+        self.cell_size = cell_size
+        self.n_bins = n_bins
+        self.block = block
+        self.clip = clip
+
+    def transform(self, batch):
+        images = _images(batch).astype(np.float32, copy=False)
+        n = len(images)
+        c, n_bins = self.cell_size, self.n_bins
+        cells_y, cells_x = images.shape[1] // c, images.shape[2] // c
+        if min(cells_y, cells_x) < self.block:
+            raise ValueError("Image trop petite pour la taille de cellule et de bloc demandée")
+        images = images[:, :cells_y * c, :cells_x * c]
+
+        # Gradients par différences centrées (nuls sur les bords)
+        gx = np.zeros_like(images)
+        gy = np.zeros_like(images)
+        gx[:, :, 1:-1] = images[:, :, 2:] - images[:, :, :-2]
+        gy[:, 1:-1, :] = images[:, 2:, :] - images[:, :-2, :]
+        magnitude = np.sqrt(gx * gx + gy * gy)
+        orientation = np.arctan2(gy, gx)
+        # Orientation non signée dans [0, pi] (np.where évite un modulo flottant, coûteux)
+        orientation = np.where(orientation < 0, orientation + np.float32(np.pi), orientation)
+
+        # Vote interpolé entre les deux classes d'orientation voisines, circulairement
+        position = orientation * np.float32(n_bins / np.pi) - np.float32(0.5)
+        low = np.floor(position)
+        upper_weight = position - low
+        low = low.astype(np.intp)
+        high = np.where(low == n_bins - 1, 0, low + 1)
+        low = np.where(low < 0, n_bins - 1, low)
+
+        # Numéro de l'histogramme (image, cellule) de chaque pixel
+        cell_rows = np.arange(cells_y * c) // c
+        cell_cols = np.arange(cells_x * c) // c
+        cells = (cell_rows[:, np.newaxis] * cells_x + cell_cols[np.newaxis, :])
+        offsets = (np.arange(n)[:, np.newaxis, np.newaxis] * (cells_y * cells_x) + cells) * n_bins
+        size = n * cells_y * cells_x * n_bins
+        histograms = (
+            np.bincount((offsets + low).ravel(), (magnitude * (1 - upper_weight)).ravel(), size)
+            + np.bincount((offsets + high).ravel(), (magnitude * upper_weight).ravel(), size)
+        ).reshape(n, cells_y, cells_x, n_bins)
+
+        # Blocs de block x block cellules voisines, au pas d'une cellule
+        b = self.block
+        blocks = np.stack([
+            histograms[:, dy:cells_y - b + 1 + dy, dx:cells_x - b + 1 + dx]
+            for dy in range(b) for dx in range(b)
+        ], axis=3).reshape(n, cells_y - b + 1, cells_x - b + 1, -1)
+        blocks = blocks / np.sqrt(np.sum(blocks ** 2, axis=-1, keepdims=True) + 1e-6)
+        blocks = np.minimum(blocks, self.clip)
+        blocks = blocks / np.sqrt(np.sum(blocks ** 2, axis=-1, keepdims=True) + 1e-6)
+        return blocks.reshape(n, -1).astype(np.float32)
+
+class PCAReduction(FeatureExtractor):
+    """
+    Projection sur les `n_components` premières composantes principales,
+    apprises pendant fit() (voir PCAProjection). Les distances entre
+    projections minorent les distances d'origine et en conservent l'essentiel.
+    """
+    def __init__(self, n_components: int = 64, max_samples: Optional[int] = 20000):
+        self.n_components = n_components
+        self.max_samples = max_samples
+        self.projection = None
+
+    def fit(self, batch):
+        vectors = np.asarray(batch, dtype=np.float32).reshape(len(batch), -1)
+        self.projection = PCAProjection(self.n_components, self.max_samples).fit(vectors)
+        return self
+
+    def transform(self, batch):
+        if self.projection is None:
+            raise RuntimeError("PCAReduction doit d'abord être apprise avec fit()")
+        vectors = np.asarray(batch, dtype=np.float32).reshape(len(batch), -1)
+        return np.ascontiguousarray(self.projection.transform(vectors), dtype=np.float32)
+
+class RandomProjection(FeatureExtractor):
+    """
+    Projection aléatoire gaussienne sur `n_components` dimensions
+    (Johnson-Lindenstrauss) : les distances sont conservées en moyenne, sans
+    apprentissage autre que la dimension d'entrée. Moins précise que l'ACP à
+    dimension égale, mais indépendante des données.
+    """
+    def __init__(self, n_components: int = 64, random_state: Optional[int] = 0):
+        if n_components < 1:
+            raise ValueError("n_components doit être supérieur ou égal à 1")
+        self.n_components = n_components
+        self.random_state = random_state
+        self.matrix = None
+
+    def fit(self, batch):
+        n_features = int(np.prod(np.shape(batch)[1:]))
+        rng = np.random.default_rng(self.random_state)
+        self.matrix = (
+            rng.standard_normal((n_features, self.n_components)) / np.sqrt(self.n_components)
+        ).astype(np.float32)
+        return self
+
+    def transform(self, batch):
+        if self.matrix is None:
+            raise RuntimeError("RandomProjection doit d'abord être apprise avec fit()")
+        return np.asarray(batch, dtype=np.float32).reshape(len(batch), -1) @ self.matrix
+
+class FeaturePipeline(PreprocessingStrategy):
+    """
+    Prétraitement composé : une stratégie de base (MNISTPreprocessing par
+    défaut) puis une suite d'étapes vectorisées appliquées au lot, par
+    exemple :
+
+        FeaturePipeline([HOGFeatures(), PCAReduction(64)])
+
+    Les étapes qui apprennent des paramètres sont ajustées par fit(), que
+    ImageClassifier.fit appelle sur les images d'entraînement ; elles sont
+    enregistrées avec le modèle. Les vecteurs plus courts réduisent
+    d'autant le coût de chaque distance et la mémoire de l'index.
+    """
+    def __init__(self, steps: Sequence[FeatureExtractor] = (),
+                 base: Optional[PreprocessingStrategy] = None,
+                 fit_samples: Optional[int] = 10000, random_state: Optional[int] = 0):
+        """
+        Args:
+            steps: étapes appliquées dans l'ordre à la sortie de `base`
+            base: prétraitement de chaque image (MNISTPreprocessing par défaut)
+            fit_samples: nombre maximal d'images d'entraînement, tirées au
+                hasard, sur lesquelles les étapes sont ajustées (None : toutes)
+            random_state: graine de ce tirage
+        """
+        self.steps = list(steps)
+        self.base = base or MNISTPreprocessing()
+        self.fit_samples = fit_samples
+        self.random_state = random_state
+
+    def fit(self, images) -> "FeaturePipeline":
+        """Ajuste les étapes, dans l'ordre, sur (un échantillon) des images d'entraînement"""
+        if self.fit_samples is not None and len(images) > self.fit_samples:
+            rng = np.random.default_rng(self.random_state)
+            rows = np.sort(rng.choice(len(images), self.fit_samples, replace=False))
+            images = images[rows] if isinstance(images, np.ndarray) else [images[i] for i in rows]
+
+        batch = self.base.preprocess_batch(images)
+        for step in self.steps:
+            batch = step.fit_transform(batch)
+        return self
+
+    def _transform(self, batch):
+        for step in self.steps:
+            batch = step.transform(batch)
+        return batch
+
+    def preprocess(self, image):
+        """Prétraite une image avec la stratégie de base, puis la fait passer par les étapes"""
+        batch = np.asarray(self.base.preprocess(image), dtype=np.float32)[np.newaxis]
+        return self._transform(batch)[0]
+
+    def preprocess_batch(self, images) -> np.ndarray:
+        return np.asarray(self._transform(self.base.preprocess_batch(images)), dtype=np.float32)
@@ -1,14 +1,75 @@
 from abc import ABC, abstractmethod
+import sys
 import numpy as np
-from PIL import Image
-from typing import Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Union
+
+# Pillow n'est importé que pour les images qui passent par lui (chemins,
+# images PIL, tableaux hors du chemin vectorisé)
+if TYPE_CHECKING:
+    from PIL import Image
+
+def _is_pil_image(image) -> bool:
+    """Vrai pour une image PIL ; sans importer Pillow s'il ne l'est pas déjà (aucune ne peut alors exister)"""
+    module = sys.modules.get("PIL.Image")
+    return module is not None and isinstance(image, module.Image)
 
 class PreprocessingStrategy(ABC):
     @abstractmethod
-    def preprocess(self, image: Union[Image.Image, str, np.ndarray]):
+    def preprocess(self, image: Union["Image.Image", str, np.ndarray]):
         """Prétraite une image pour la classification"""
         pass
 
+    def fit(self, images) -> "PreprocessingStrategy":
+        """
+        Apprend les paramètres éventuels de la stratégie sur les images
+        d'entraînement ; appelé par ImageClassifier.fit avant le
+        prétraitement. Par défaut, il n'y a rien à apprendre.
+        """
+        return self
+
+    def preprocess_batch(self, images) -> np.ndarray:
+        """
+        Prétraite un lot d'images et retourne un tableau (N, ...) en float32.
+
+        Implémentation par défaut : applique `preprocess` à chaque image. Les
+        stratégies concrètes la remplacent par un traitement vectorisé.
+        """
+        return np.stack([np.asarray(self.preprocess(image), dtype=np.float32) for image in images])
+
+# Types NumPy acceptés par Image.fromarray en niveaux de gris, que le chemin
+# vectorisé reproduit à l'identique
+_GRAYSCALE_DTYPES = (np.uint8, np.bool_, np.int32, np.float32, np.float64)
+
+def _lanczos(x: np.ndarray) -> np.ndarray:
+    """Noyau de Lanczos à 3 lobes, identique au filtre LANCZOS de Pillow"""
+    return np.where(np.abs(x) < 3, np.sinc(x) * np.sinc(x / 3), 0.0)
+
+@lru_cache(maxsize=32)
+def _resize_matrix(in_size: int, out_size: int) -> np.ndarray:
+    """
+    Matrice (out_size, in_size) de rééchantillonnage LANCZOS le long d'un axe.
+
+    Reprend le calcul des coefficients de Pillow : lors d'une réduction, le
+    support du filtre est élargi du facteur d'échelle.
+    """
+    scale = in_size / out_size
+    filter_scale = max(scale, 1.0)
+    support = 3 * filter_scale
+
+    matrix = np.zeros((out_size, in_size))
+    for out in range(out_size):
+        center = (out + 0.5) * scale
+        start = max(int(center - support + 0.5), 0)
+        stop = min(int(center + support + 0.5), in_size)
+        weights = _lanczos((np.arange(start, stop) - center + 0.5) / filter_scale)
+        matrix[out, start:stop] = weights / weights.sum()
+    return matrix
+
+def _to_uint8(values: np.ndarray) -> np.ndarray:
+    """Arrondit et borne entre 0 et 255, comme les passes de rééchantillonnage 8 bits de Pillow"""
+    return np.clip(np.floor(values + 0.5), 0, 255)
+
 class MNISTPreprocessing(PreprocessingStrategy):
     """
     Stratégie de prétraitement adaptée au format MNIST :
@@ -19,7 +80,7 @@ class MNISTPreprocessing(PreprocessingStrategy):
     def __init__(self, target_size=(28, 28)):
         self.target_size = target_size
     
-    def preprocess(self, image: Union[Image.Image, str, np.ndarray]):
+    def preprocess(self, image: Union["Image.Image", str, np.ndarray]):
         """
         Prétraite une image pour la rendre compatible avec MNIST.
 
@@ -34,12 +95,18 @@ class MNISTPreprocessing(PreprocessingStrategy):
             ValueError: Si la conversion échoue ou si l'image n'est pas utilisable.
         """
         # Vérifier le type de l'entrée
-        if not isinstance(image, (Image.Image, str, np.ndarray)):
+        if not (isinstance(image, (str, np.ndarray)) or _is_pil_image(image)):
             raise TypeError(
                 f"L'entrée doit être de type PIL.Image.Image, str ou np.ndarray. "
                 f"Type reçu : {type(image)}"
             )
 
+        # Les tableaux NumPy passent par le chemin vectorisé, sans Pillow
+        if isinstance(image, np.ndarray) and self._supports_vectorized(image[np.newaxis]):
+            return self._preprocess_array(image[np.newaxis])[0]
+
+        from PIL import Image
+
         try:
             # Si l’entrée est un chemin (str), charger l’image avec Pillow
             if isinstance(image, str):
@@ -66,3 +133,53 @@ class MNISTPreprocessing(PreprocessingStrategy):
             raise ValueError("L'image fournie est corrompue ou n'est pas une image valide.")
         except Exception as e:
             raise ValueError(f"Une erreur inattendue est survenue : {str(e)}")
+
+    def preprocess_batch(self, images) -> np.ndarray:
+        """
+        Prétraite un lot d'images en une seule passe vectorisée.
+
+        Args:
+            images: tableau (N, H, W) en niveaux de gris, (N, H, W, 3|4) en
+                couleur, ou liste d'images de types quelconques
+
+        Returns:
+            numpy array (N, 28, 28) en float32, normalisé entre 0 et 1
+        """
+        if isinstance(images, np.ndarray) and self._supports_vectorized(images):
+            return self._preprocess_array(images)
+        return super().preprocess_batch(images)
+
+    def _supports_vectorized(self, images: np.ndarray) -> bool:
+        """Le lot peut-il être traité sans Pillow avec un résultat identique ?"""
+        if images.ndim == 3:
+            return images.dtype.type in _GRAYSCALE_DTYPES
+        return images.ndim == 4 and images.shape[3] in (3, 4) and images.dtype == np.uint8
+
+    def _preprocess_array(self, images: np.ndarray) -> np.ndarray:
+        """Équivalent vectorisé de convert('L'), resize(LANCZOS) et normalisation"""
+        target_width, target_height = self.target_size
+
+        # Déjà au format MNIST : ni conversion ni redimensionnement
+        if images.dtype == np.uint8 and images.shape[1:] == (target_height, target_width):
+            return images.astype(np.float32) / 255.0
+
+        # Conversion en niveaux de gris 8 bits, avec les mêmes règles que Pillow
+        if images.ndim == 4:
+            rgb = images[..., :3].astype(np.uint32)
+            gray = (rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000) >> 16
+        elif images.dtype == np.bool_:
+            gray = images * 255
+        elif images.dtype.kind == 'f':
+            gray = np.trunc(np.clip(np.nan_to_num(images), 0, 255))
+        else:
+            gray = np.clip(images, 0, 255)
+        gray = gray.astype(np.float64)
+
+        # Rééchantillonnage séparable : d'abord les colonnes, puis les lignes
+        height, width = gray.shape[1:]
+        if width != target_width:
+            gray = _to_uint8(gray @ _resize_matrix(width, target_width).T)
+        if height != target_height:
+            gray = _to_uint8(np.einsum('oh,nhw->now', _resize_matrix(height, target_height), gray))
+
+        return gray.astype(np.float32) / 255.0
@@ -0,0 +1,60 @@
+from typing import Optional
+import numpy as np
+
+class PCAProjection:
+    """
+    Projection linéaire sur les composantes principales des vecteurs d'entraînement.
+
+    Les composantes sont orthonormées : la distance euclidienne entre deux
+    vecteurs projetés ne dépasse jamais leur distance dans l'espace complet.
+    Elle peut donc servir de borne inférieure pour élaguer une recherche exacte.
+    """
+    def __init__(self, n_components: int = 32, max_samples: Optional[int] = 20000,
+                 random_state: Optional[int] = 0):
+        """
+        Args:
+            n_components: dimension de l'espace réduit
+            max_samples: taille du sous-échantillon utilisé pour estimer la covariance
+            random_state: graine du sous-échantillonnage
+        """
+        if n_components < 1:
+            raise ValueError("n_components doit être supérieur ou égal à 1")
+        self.n_components = n_components
+        self.max_samples = max_samples
+        self.random_state = random_state
+        self.mean_ = None
+        self.components_ = None
+        self.explained_variance_ = None
+
+    def fit(self, vectors: np.ndarray) -> "PCAProjection":
+        """
+        Estime les composantes principales d'une matrice (N, D).
+
+        Returns:
+            self, pour pouvoir chaîner fit(...).transform(...)
+        """
+        if self.n_components > vectors.shape[1]:
+            raise ValueError("n_components ne peut pas dépasser la dimension des vecteurs")
+
+        if self.max_samples is not None and len(vectors) > self.max_samples:
+            rng = np.random.default_rng(self.random_state)
+            vectors = vectors[np.sort(rng.choice(len(vectors), self.max_samples, replace=False))]
+
+        # Décomposition de la matrice de covariance (D x D), calculée en float64
+        self.mean_ = vectors.mean(axis=0, dtype=np.float64)
+        centered = vectors - self.mean_
+        covariance = centered.T @ centered / max(1, len(vectors) - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+
+        # eigh trie les valeurs propres par ordre croissant
+        top = np.argsort(eigenvalues)[::-1][:self.n_components]
+        self.explained_variance_ = eigenvalues[top]
+        self.components_ = np.ascontiguousarray(eigenvectors[:, top].T, dtype=np.float32)
+        self.mean_ = self.mean_.astype(np.float32)
+        return self
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """Projette une matrice (N, D) dans l'espace réduit (N, n_components)"""
+        if self.components_ is None:
+            raise RuntimeError("La projection doit d'abord être apprise avec fit()")
+        return (vectors - self.mean_) @ self.components_.T
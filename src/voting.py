@@ -0,0 +1,121 @@
+"""
+Votes des k plus proches voisins, vectorisés sur des matrices (Q, k) de
+labels encodés en entiers 0..C-1 et de distances triées par ordre croissant.
+"""
+from typing import Optional
+import numpy as np
+
+# Pondérations disponibles
+WEIGHTS = ("uniform", "distance", "gaussian")
+
+def neighbor_weights(distances: np.ndarray, weights: str = "uniform") -> np.ndarray:
+    """
+    Poids (Q, k) des voisins.
+
+    - "uniform" : chaque voisin compte pour 1
+    - "distance" : chaque voisin compte pour 1 / distance ; si des voisins
+      sont à distance nulle, ils se partagent seuls le vote
+    - "gaussian" : noyau gaussien exp(-d² / 2h²), de largeur h adaptée à
+      chaque requête : la distance de son k-ième (dernier) voisin
+    """
+    if weights == "uniform":
+        return np.ones(distances.shape, dtype=np.float64)
+    if weights == "distance":
+        distances = np.asarray(distances, dtype=np.float64)
+        exact = distances == 0
+        with np.errstate(divide="ignore"):
+            result = 1.0 / distances
+        has_exact = exact.any(axis=1)
+        result[has_exact] = exact[has_exact]
+        return result
+    if weights == "gaussian":
+        distances = np.asarray(distances, dtype=np.float64)
+        bandwidth = distances[:, -1:]
+        scaled = np.divide(distances, bandwidth, out=np.zeros_like(distances), where=bandwidth > 0)
+        return np.exp(-0.5 * scaled ** 2)
+    raise ValueError(f"Pondération inconnue : {weights!r}. Valeurs possibles : {', '.join(WEIGHTS)}")
+
+def class_votes(neighbor_codes: np.ndarray, weights: np.ndarray, n_classes: int) -> np.ndarray:
+    """
+    Votes (Q, C) de chaque classe, en un seul np.bincount pour tout le lot.
+
+    Args:
+        neighbor_codes: matrice (Q, k) des labels encodés des voisins
+        weights: matrice (Q, k) des poids des voisins
+        n_classes: nombre de classes C
+    """
+    n_queries = len(neighbor_codes)
+    offsets = np.arange(n_queries)[:, np.newaxis] * n_classes
+    return np.bincount(
+        (neighbor_codes + offsets).ravel(), weights=np.ravel(weights), minlength=n_queries * n_classes
+    ).reshape(n_queries, n_classes)
+
+def first_ranks(neighbor_codes: np.ndarray, n_classes: int) -> np.ndarray:
+    """
+    Rang (Q, C) du plus proche voisin de chaque classe, k si la classe est
+    absente des voisins ; sert à départager les égalités de votes.
+    """
+    n_queries, k = neighbor_codes.shape
+    ranks = np.full((n_queries, n_classes), k, dtype=np.intp)
+    rows = np.arange(n_queries)
+    # Du plus lointain au plus proche : le rang le plus petit écrase les autres
+    for rank in range(k - 1, -1, -1):
+        ranks[rows, neighbor_codes[:, rank]] = rank
+    return ranks
+
+def probabilities(votes: np.ndarray) -> np.ndarray:
+    """Votes normalisés : scores par classe de somme 1 sur la dernière dimension"""
+    return votes / votes.sum(axis=-1, keepdims=True)
+
+def cumulative_votes(neighbor_codes: np.ndarray, weights: np.ndarray, n_classes: int) -> np.ndarray:
+    """
+    Votes de chaque classe pour tous les k à la fois.
+
+    Args:
+        neighbor_codes: matrice (Q, K) des labels encodés des voisins, du plus proche au plus lointain
+        weights: matrice (Q, K) des poids des voisins
+        n_classes: nombre de classes C
+
+    Returns:
+        Tableau (Q, K, C) : [q, k - 1, c] est le vote de la classe c parmi
+        les k premiers voisins de la requête q
+    """
+    n_queries, k_max = neighbor_codes.shape
+    votes = np.zeros((n_queries, k_max, n_classes), dtype=np.float64)
+    queries, ranks = np.indices(neighbor_codes.shape)
+    votes[queries, ranks, neighbor_codes] = weights
+    return np.cumsum(votes, axis=1, out=votes)
+
+def votes_by_k(neighbor_codes: np.ndarray, distances: np.ndarray, weights: str,
+               n_classes: int) -> np.ndarray:
+    """
+    Votes (Q, K, C) pour tous les k à la fois, comme `cumulative_votes`.
+
+    La largeur du noyau gaussien dépend de k : ses votes sont calculés
+    séparément pour chaque k.
+    """
+    if weights != "gaussian":
+        return cumulative_votes(neighbor_codes, neighbor_weights(distances, weights), n_classes)
+    n_queries, k_max = neighbor_codes.shape
+    votes = np.empty((n_queries, k_max, n_classes), dtype=np.float64)
+    for k in range(1, k_max + 1):
+        votes[:, k - 1] = class_votes(
+            neighbor_codes[:, :k], neighbor_weights(distances[:, :k], weights), n_classes
+        )
+    return votes
+
+def winners(votes: np.ndarray, ranks: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Classe gagnante de chaque vote (Q, C) ou (Q, K, C).
+
+    En cas d'égalité (aux arrondis près), la classe dont le plus proche
+    voisin est le mieux classé l'emporte si `ranks` (voir first_ranks) est
+    fourni, sinon celle de plus petit code : le résultat est déterministe.
+    """
+    if ranks is None:
+        return np.argmax(votes, axis=-1)
+    if votes.ndim == 3:
+        ranks = ranks[:, np.newaxis, :]
+    best = votes.max(axis=-1, keepdims=True)
+    tied = (votes > 0) & (votes >= best * (1 - 1e-9))
+    return np.argmin(np.where(tied, ranks, np.iinfo(np.intp).max), axis=-1)
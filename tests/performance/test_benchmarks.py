@@ -1,6 +1,10 @@
+import json
+import os
 import pytest
 import numpy as np
+from pathlib import Path
 from src import ImageClassifier
+from src.benchmarks import compare_to_baseline, load_report, run_benchmarks, save_report
 import time
 
 class TestPerformance:
@@ -15,4 +19,31 @@ class TestPerformance:
         classifier.fit(images, labels)
         parallel_time = time.time() - start
         
-        assert parallel_time < 5.0  # Un seuil raisonnable à ajuster
\ No newline at end of file
+        assert parallel_time < 5.0  # Un seuil raisonnable à ajuster
+
+class TestBenchmarkSuite:
+    """
+    Exécute une version réduite de la suite de benchmarks et écrit ses
+    résultats en JSON. Si KNN_BENCHMARK_BASELINE désigne un rapport de
+    référence (produit par scripts/benchmark.py sur la même machine), le test
+    échoue en cas de régression au-delà de KNN_BENCHMARK_TOLERANCE.
+    """
+
+    def test_suite_report(self, tmp_path):
+        report = run_benchmarks(sizes=(2000,), ks=(1, 5), n_queries=200, n_latency=50)
+        output = Path(os.environ.get("KNN_BENCHMARK_OUTPUT", tmp_path / "benchmarks.json"))
+        save_report(report, output)
+
+        names = {result["name"] for result in report["results"]}
+        assert names == {"fit", "predict", "predict_batch", "evaluate"}
+        assert report["meta"]["max_rss_mb"] > 0
+        assert json.loads(output.read_text())["results"] == report["results"]
+
+        baseline = os.environ.get("KNN_BENCHMARK_BASELINE")
+        if baseline:
+            tolerance = float(os.environ.get("KNN_BENCHMARK_TOLERANCE", "0.25"))
+            regressions = compare_to_baseline(report, load_report(baseline), tolerance)
+            assert not regressions, "\n".join(
+                f"{r['key']} : {r['baseline']:.4g} -> {r['current']:.4g} ({r['change']:+.1%})"
+                for r in regressions
+            )
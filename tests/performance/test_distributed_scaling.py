@@ -0,0 +1,27 @@
+import numpy as np
+from src import ImageClassifier
+from src.distributed import DistributedClassifier, LocalWorkers, format_scaling, scaling_report
+
+class TestDistributedScaling:
+    """Débit du coordinateur selon le nombre de workers (processus locaux lancés comme des noeuds)"""
+
+    def test_scaling_efficiency(self, tmp_path):
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (20000, 28, 28), dtype=np.uint8)
+        labels = rng.integers(0, 10, 20000)
+        classifier = ImageClassifier(k=5, block_size=256)
+        classifier.fit(images, labels)
+        classifier.save(tmp_path / "model")
+        queries = rng.integers(0, 256, (1024, 28, 28), dtype=np.uint8)
+
+        with LocalWorkers(tmp_path / "model", 2) as local, \
+                DistributedClassifier(ImageClassifier.load(tmp_path / "model"), local.addresses) as distributed:
+            np.testing.assert_array_equal(
+                distributed.predict_batch(queries[:256]), classifier.predict_batch(queries[:256])
+            )
+
+        rows = scaling_report(tmp_path / "model", queries, worker_counts=(1, 2, 4), repeats=2)
+        print("\n" + format_scaling(rows))
+        assert [row["workers"] for row in rows] == [1, 2, 4]
+        assert rows[0]["efficiency"] == 1.0
+        assert all(row["qps"] > 0 for row in rows)
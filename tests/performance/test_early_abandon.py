@@ -0,0 +1,39 @@
+import time
+import numpy as np
+from src.index import BruteForceIndex, PrunedIndex, recall_at_k
+from src.strategies import EuclideanDistance
+
+class TestEarlyAbandon:
+    """Candidats élagués et latence par requête : parcours élagué contre parcours linéaire"""
+
+    def test_pruned_fraction_and_latency(self):
+        # Données de faible dimension intrinsèque plongées en 784 dimensions,
+        # comme les chiffres manuscrits
+        rng = np.random.default_rng(0)
+        latent = rng.normal(size=(20000, 12)).astype(np.float32)
+        mixing = rng.normal(size=(12, 784)).astype(np.float32)
+        vectors = (latent @ mixing + 0.1 * rng.normal(size=(20000, 784))).astype(np.float32)
+        queries = vectors[rng.choice(20000, 100, replace=False)] + 0.01
+        k = 5
+
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        pruned = PrunedIndex()
+        pruned.build(vectors, EuclideanDistance())
+
+        results = {}
+        for name, index in (("linéaire", exact), ("élagué", pruned)):
+            start = time.perf_counter()
+            batch = index.search(queries, k)
+            batch_elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            for query in queries:
+                index.search(query[np.newaxis], k)
+            results[name] = batch
+            print(f"\n{name:9s} : lot {batch_elapsed * 1000:7.1f} ms, "
+                  f"requête seule {(time.perf_counter() - start) * 10:6.2f} ms")
+
+        print(f"candidats élagués : {pruned.pruned_fraction():.2%}, "
+              f"coordonnées lues : {pruned.work_fraction():.2%} du parcours linéaire")
+        assert recall_at_k(results["élagué"][1], results["linéaire"][1]) == 1.0
+        assert pruned.pruned_fraction() > 0.9
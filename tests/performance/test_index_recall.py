@@ -0,0 +1,40 @@
+import time
+import numpy as np
+from src.index import BruteForceIndex, IVFIndex, recall_at_k
+from src.strategies import EuclideanDistance
+
+class TestIVFRecall:
+    """Compromis rappel/latence de l'index IVF par rapport à la recherche exacte"""
+
+    def test_recall_latency_tradeoff(self):
+        rng = np.random.default_rng(0)
+        centers = rng.random((50, 784), dtype=np.float32)
+        vectors = (centers[rng.integers(0, 50, 20000)]
+                   + 0.3 * rng.random((20000, 784), dtype=np.float32)).astype(np.float32)
+        queries = vectors[rng.choice(20000, 200, replace=False)] + 0.01
+        k = 10
+
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        start = time.perf_counter()
+        _, expected = exact.search(queries, k)
+        exact_time = time.perf_counter() - start
+
+        ivf = IVFIndex(n_lists=100)
+        ivf.build(vectors, EuclideanDistance())
+
+        print(f"\nrecherche exacte : {exact_time * 1000:.1f} ms pour {len(queries)} requêtes")
+        recalls = []
+        for nprobe in (1, 4, 16, 100):
+            ivf.nprobe = nprobe
+            start = time.perf_counter()
+            _, found = ivf.search(queries, k)
+            elapsed = time.perf_counter() - start
+            recalls.append(recall_at_k(found, expected))
+            print(f"nprobe={nprobe:3d}  recall@{k}={recalls[-1]:.3f}  "
+                  f"temps={elapsed * 1000:.1f} ms")
+
+        # Visiter plus de cellules ne dégrade pas le rappel, et toutes les visiter revient
+        # à la recherche exacte (aux égalités près dues aux arrondis float32)
+        assert all(a <= b for a, b in zip(recalls, recalls[1:]))
+        assert recalls[-1] >= 0.999
@@ -0,0 +1,44 @@
+import time
+import tracemalloc
+import numpy as np
+from src.index import BruteForceIndex, ShardedIndex
+from src.strategies import EuclideanDistance
+
+class TestOutOfCore:
+    """Débit et mémoire de la recherche sur shards projetés, comparés au parcours en mémoire"""
+
+    def test_throughput_and_peak_memory(self, tmp_path):
+        rng = np.random.default_rng(0)
+        vectors = rng.random((100000, 196), dtype=np.float32)
+        queries = rng.random((512, 196), dtype=np.float32)
+        k = 5
+
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        sharded = ShardedIndex(tmp_path, shard_size=8192)
+        sharded.build(vectors, EuclideanDistance())
+        # Cache de pages chaud : les shards viennent d'être écrits et lus une fois
+        sharded.search(queries[:8], k)
+
+        results, elapsed = {}, {}
+        for name, index in (("en mémoire", exact), ("shards", sharded)):
+            start = time.perf_counter()
+            results[name] = [index.search(queries[i:i + 128], k) for i in range(0, 512, 128)]
+            elapsed[name] = time.perf_counter() - start
+            print(f"\n{name:10s} : {len(queries) / elapsed[name]:8.0f} requêtes/s")
+
+        tracemalloc.start()
+        sharded.search(queries[:128], k)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"pic mémoire d'une recherche : {peak / 1e6:.1f} Mo "
+              f"(matrice complète : {vectors.nbytes / 1e6:.1f} Mo)")
+
+        for (_, expected), (_, found) in zip(results["en mémoire"], results["shards"]):
+            np.testing.assert_array_equal(found, expected)
+        # La mémoire ne dépend que de la taille des shards, pas de celle de l'ensemble :
+        # (prefetch + 1) shards en mémoire et quelques matrices de distances (128, shard_size)
+        shard_bytes = 8192 * 196 * 4
+        assert peak < (sharded.prefetch + 1) * shard_bytes + 3 * 128 * 8192 * 4
+        assert peak < vectors.nbytes / 2
+        assert elapsed["shards"] < 2 * elapsed["en mémoire"]
@@ -0,0 +1,32 @@
+import os
+import time
+import numpy as np
+from src import ImageClassifier
+
+class TestParallelScaling:
+    """Débit de predict_batch en fonction du nombre de processus"""
+
+    def test_throughput_by_n_jobs(self):
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (20000, 28, 28), dtype=np.uint8)
+        labels = rng.integers(0, 10, 20000)
+        queries = images[:1024]
+
+        classifier = ImageClassifier(k=3, block_size=64)
+        classifier.fit(images, labels)
+
+        print()
+        baseline = None
+        for n_jobs in sorted({1, 2, os.cpu_count() or 1}):
+            classifier.n_jobs = n_jobs
+            # Premier appel : démarrage des processus et publication en mémoire partagée
+            classifier.predict_batch(queries[:2 * classifier.block_size])
+            start = time.perf_counter()
+            predictions = classifier.predict_batch(queries)
+            throughput = len(queries) / (time.perf_counter() - start)
+            classifier.close()
+
+            baseline = baseline or throughput
+            print(f"n_jobs={n_jobs:2d}  {throughput:8.1f} requêtes/s  "
+                  f"(accélération {throughput / baseline:.2f}x)")
+            assert len(predictions) == len(queries)
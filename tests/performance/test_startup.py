@@ -0,0 +1,16 @@
+from src.benchmarks import run_startup_benchmarks
+
+class TestStartup:
+    """Démarrage à froid d'un processus de prédiction : import, chargement du modèle, première prédiction"""
+
+    def test_cold_start(self):
+        report = run_startup_benchmarks(n=2000, k=3, repeat=3)
+        (startup,) = report["results"]
+        print("\n" + "  ".join(f"{name}={value:.1f}" for name, value in startup["metrics"].items()))
+        for row in report["import_profile"][:8]:
+            print(f"{row['module']:<40} {row['cumulative_ms']:8.1f} ms")
+
+        # Les prédictions sur tableaux n'ont besoin ni de Pillow, ni de requests, ni de multiprocessing
+        assert startup["optional_modules"] == []
+        assert {"import_ms", "load_ms", "first_predict_ms"} <= set(startup["metrics"])
+        assert report["import_profile"][0]["module"] == "src.knn"
@@ -0,0 +1,57 @@
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image
+from src import ImageClassifier
+from src.benchmarks import synthetic_mnist
+from src.evaluation import iter_image_folder, stream_evaluate
+
+class TestStreamingEvaluation:
+    """Débit et mémoire de l'évaluation en flux, comparés à evaluate sur les mêmes données"""
+
+    def test_png_folder_throughput(self, tmp_path):
+        images, labels = synthetic_mnist(6000)
+        classifier = ImageClassifier(k=5, block_size=128)
+        classifier.fit(images[:5000], labels[:5000])
+        test_images, test_labels = images[5000:], labels[5000:]
+        for i, (image, label) in enumerate(zip(test_images, test_labels)):
+            (tmp_path / str(label)).mkdir(exist_ok=True)
+            Image.fromarray(image).resize((56, 56)).save(tmp_path / str(label) / f"{i:05d}.png")
+        paths, folder_labels = map(list, zip(*(
+            pair for batch in iter_image_folder(tmp_path) for pair in zip(*batch)
+        )))
+
+        start = time.perf_counter()
+        accuracy = classifier.evaluate(paths, folder_labels)
+        sequential = time.perf_counter() - start
+        report = stream_evaluate(classifier, iter_image_folder(tmp_path, batch_size=512))
+
+        print(f"\nevaluate        : {len(paths) / sequential:8.0f} images/s")
+        print(f"stream_evaluate : {report['images_per_second']:8.0f} images/s")
+        assert report["n_images"] == len(paths) and report["n_failed"] == 0
+        assert report["accuracy"] == accuracy
+
+    def test_memory_is_bounded_by_blocks(self):
+        images, labels = synthetic_mnist(2000)
+        classifier = ImageClassifier(k=5, block_size=256)
+        classifier.fit(images, labels)
+        batch_size, n_batches = 1024, 40
+
+        def batches():
+            # Jeu de test de 40 960 images, produit au fil de l'eau et jamais matérialisé
+            rng = np.random.default_rng(0)
+            for _ in range(n_batches):
+                rows = rng.integers(0, len(images), batch_size)
+                yield images[rows], labels[rows]
+
+        tracemalloc.start()
+        report = stream_evaluate(classifier, batches(), max_pending=2)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        materialized = batch_size * n_batches * 28 * 28 * 4
+        print(f"\nstream_evaluate : {report['images_per_second']:8.0f} images/s, "
+              f"pic {peak / 2**20:.1f} Mo (jeu prétraité complet : {materialized / 2**20:.0f} Mo)")
+        assert report["n_images"] == batch_size * n_batches
+        assert report["accuracy"] > 0.9
+        assert peak < materialized / 8
@@ -0,0 +1,43 @@
+import time
+import numpy as np
+from src.index import BruteForceIndex, KDTreeIndex, recall_at_k
+from src.strategies import EuclideanDistance
+
+class TestKDTreePruning:
+    """
+    Distances calculées et temps par requête : arbre k-d sur ACP contre
+    parcours linéaire. L'arbre calcule des centaines de fois moins de
+    distances, mais son parcours Python par requête le laisse plus lent en
+    temps qu'un parcours linéaire vectorisé sur un bloc de requêtes.
+    """
+
+    def test_distance_evaluations_saved(self):
+        # Données de faible dimension intrinsèque plongées en 784 dimensions,
+        # comme les chiffres manuscrits
+        rng = np.random.default_rng(0)
+        latent = rng.normal(size=(20000, 12)).astype(np.float32)
+        mixing = rng.normal(size=(12, 784)).astype(np.float32)
+        vectors = (latent @ mixing + 0.1 * rng.normal(size=(20000, 784))).astype(np.float32)
+        queries = vectors[rng.choice(20000, 100, replace=False)] + 0.01
+        k = 5
+
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        start = time.perf_counter()
+        _, expected = exact.search(queries, k)
+        linear_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        print(f"\nparcours linéaire : {len(vectors)} distances par requête, {linear_ms:.2f} ms par requête")
+        for n_components in (8, 16, 32):
+            tree = KDTreeIndex(n_components=n_components)
+            tree.build(vectors, EuclideanDistance())
+            start = time.perf_counter()
+            _, found = tree.search(queries, k)
+            per_query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+            evaluations = tree.evaluations_per_query()
+            print(f"ACP {n_components:2d} dims : {evaluations:8.1f} distances par requête "
+                  f"({len(vectors) / evaluations:6.1f}x moins), {per_query_ms:.2f} ms par requête "
+                  f"({per_query_ms / linear_ms:.1f}x le temps linéaire)")
+
+            assert recall_at_k(found, expected) == 1.0
+            assert evaluations < len(vectors) / 10
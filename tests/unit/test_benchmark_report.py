@@ -0,0 +1,54 @@
+import tracemalloc
+from src.benchmarks import _measure, compare_to_baseline, synthetic_mnist
+
+def make_report(seconds, queries_per_second, accuracy=0.9):
+    return {"meta": {}, "results": [
+        {"name": "fit", "n": 100, "k": 3, "metrics": {"seconds": seconds}},
+        {"name": "predict_batch", "n": 100, "k": 3,
+         "metrics": {"queries_per_second": queries_per_second}},
+        {"name": "evaluate", "n": 100, "k": 3, "metrics": {"accuracy": accuracy}},
+    ]}
+
+class TestCompareToBaseline:
+    def test_within_tolerance(self):
+        baseline = make_report(seconds=1.0, queries_per_second=1000)
+        assert compare_to_baseline(make_report(1.2, 900), baseline, tolerance=0.25) == []
+
+    def test_slower_is_a_regression(self):
+        baseline = make_report(seconds=1.0, queries_per_second=1000)
+        regressions = compare_to_baseline(make_report(1.5, 1000), baseline, tolerance=0.25)
+        assert [r["key"] for r in regressions] == ["fit[n=100,k=3].seconds"]
+
+    def test_lower_throughput_is_a_regression(self):
+        baseline = make_report(seconds=1.0, queries_per_second=1000)
+        regressions = compare_to_baseline(make_report(1.0, 500), baseline, tolerance=0.25)
+        assert [r["key"] for r in regressions] == ["predict_batch[n=100,k=3].queries_per_second"]
+
+    def test_faster_is_not_a_regression(self):
+        baseline = make_report(seconds=1.0, queries_per_second=1000)
+        assert compare_to_baseline(make_report(0.1, 10000), baseline) == []
+
+    def test_accuracy_drop(self):
+        baseline = make_report(1.0, 1000, accuracy=0.95)
+        regressions = compare_to_baseline(make_report(1.0, 1000, accuracy=0.90), baseline)
+        assert [r["key"] for r in regressions] == ["evaluate[n=100,k=3].accuracy"]
+
+    def test_synthetic_mnist_format(self):
+        images, labels = synthetic_mnist(50)
+        assert images.shape == (50, 28, 28)
+        assert images.dtype.name == "uint8"
+        assert labels.shape == (50,)
+
+class TestMeasure:
+    def test_allocations_are_traced_outside_timed_runs(self):
+        """Les exécutions chronométrées ne subissent pas le coût de tracemalloc"""
+        tracing = []
+
+        def function():
+            tracing.append(tracemalloc.is_tracing())
+            return bytearray(4 * 1024 * 1024)
+
+        measured = _measure(function, repeat=3)
+        assert tracing == [False, False, False, True]
+        assert measured["peak_alloc_mb"] >= 4
+        assert set(measured) == {"value", "seconds", "peak_alloc_mb"}
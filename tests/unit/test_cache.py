@@ -0,0 +1,145 @@
+import os
+import pickle
+import numpy as np
+import pytest
+from PIL import Image
+from src import ImageClassifier
+from src.cache import LRUCache
+from src.strategies import FeaturePipeline, PCAReduction
+
+class TestLRUCache:
+    def test_eviction_order(self):
+        """L'entrée la moins récemment utilisée est évincée en premier"""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert cache.stats() == {"hits": 1, "misses": 0, "size": 2, "maxsize": 2}
+
+    def test_disabled_cache(self):
+        """Un cache de taille 0 ne conserve rien et compte les échecs"""
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.misses == 1
+
+    def test_pickle_gives_empty_cache(self):
+        """Sérialiser un cache ne conserve que sa taille maximale"""
+        cache = LRUCache(4)
+        cache.put("a", 1)
+        restored = pickle.loads(pickle.dumps(cache))
+        assert restored.maxsize == 4
+        assert len(restored) == 0
+
+class TestPredictionCache:
+    @pytest.fixture
+    def dataset(self):
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, size=(40, 28, 28), dtype=np.uint8)
+        labels = np.arange(40) % 4
+        return images, labels
+
+    def test_duplicates_hit_cache(self, dataset):
+        """Les images en double ne sont cherchées qu'une fois, avec le même résultat"""
+        images, labels = dataset
+        cached = ImageClassifier(k=3, cache_size=100)
+        plain = ImageClassifier(k=3)
+        cached.fit(images, labels)
+        plain.fit(images, labels)
+
+        queries = np.concatenate([images[:10], images[:10]])
+        np.testing.assert_array_equal(cached.predict_batch(queries), plain.predict_batch(queries))
+        assert cached.predict(images[3]) == plain.predict(images[3])
+
+        stats = cached.cache_info()["predictions"]
+        assert stats["misses"] == 10
+        assert stats["hits"] == 1
+        assert stats["size"] == 10
+
+    def test_bounded_size(self, dataset):
+        """Le cache ne dépasse jamais sa taille maximale"""
+        images, labels = dataset
+        classifier = ImageClassifier(k=1, cache_size=5)
+        classifier.fit(images, labels)
+        classifier.predict_batch(images)
+        assert classifier.cache_info()["predictions"]["size"] == 5
+
+    def test_k_change_is_not_served_from_cache(self, dataset):
+        """Modifier k ne réutilise pas les votes calculés avec l'ancien k"""
+        images, labels = dataset
+        classifier = ImageClassifier(k=1, cache_size=100)
+        classifier.fit(images, labels)
+        classifier.predict_batch(images[:5])
+        classifier.k = 3
+        classifier.predict_batch(images[:5])
+        assert classifier.cache_info()["predictions"]["hits"] == 0
+
+    def test_fit_invalidates(self, dataset):
+        """Un nouvel entraînement vide le cache : les anciennes prédictions ne sont pas servies"""
+        images, labels = dataset
+        classifier = ImageClassifier(k=1, cache_size=100)
+        classifier.fit(images, labels)
+        assert classifier.predict(images[0]) == labels[0]
+
+        classifier.fit(images, (labels + 1) % 4)
+        assert classifier.cache_info()["predictions"]["size"] == 0
+        assert classifier.predict(images[0]) == (labels[0] + 1) % 4
+
+class TestPathCache:
+    def test_keyed_by_path_and_mtime(self, tmp_path):
+        """Un fichier réécrit est prétraité à nouveau"""
+        rng = np.random.default_rng(1)
+        images = rng.integers(0, 256, size=(6, 28, 28), dtype=np.uint8)
+        paths = []
+        for i, image in enumerate(images):
+            path = str(tmp_path / f"{i}.png")
+            Image.fromarray(image).save(path)
+            paths.append(path)
+
+        classifier = ImageClassifier(k=1, path_cache_size=10)
+        classifier.fit(images, np.arange(6))
+        assert classifier.predict(paths[2]) == 2
+        assert classifier.predict(paths[2]) == 2
+        assert classifier.cache_info()["paths"]["hits"] == 1
+
+        # Réécrire le fichier avec une autre image change sa date de modification
+        Image.fromarray(images[4]).save(paths[2])
+        stat = os.stat(paths[2])
+        os.utime(paths[2], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert classifier.predict(paths[2]) == 4
+        assert classifier.cache_info()["paths"]["misses"] == 2
+
+    @pytest.mark.parametrize("path_cache_size", [0, 10])
+    def test_missing_path_raises_value_error(self, tmp_path, path_cache_size):
+        """Un fichier absent lève la même ValueError, cache de chemins actif ou non"""
+        images = np.random.default_rng(2).integers(0, 256, size=(4, 28, 28), dtype=np.uint8)
+        classifier = ImageClassifier(k=1, path_cache_size=path_cache_size)
+        classifier.fit(images, np.arange(4))
+        with pytest.raises(ValueError, match="introuvable"):
+            classifier.predict(str(tmp_path / "absent.png"))
+
+    def test_refit_ignores_paths_cached_with_old_parameters(self, tmp_path):
+        """fit prétraite les images d'entraînement avec les nouveaux paramètres de l'ACP"""
+        rng = np.random.default_rng(3)
+        images = rng.integers(0, 256, size=(12, 28, 28), dtype=np.uint8)
+        paths = []
+        for i, image in enumerate(images):
+            path = str(tmp_path / f"{i}.png")
+            Image.fromarray(image).save(path)
+            paths.append(path)
+
+        classifier = ImageClassifier(k=1, path_cache_size=20,
+                                     preprocessing_strategy=FeaturePipeline([PCAReduction(4)]))
+        classifier.fit(images[6:], np.arange(6))
+        classifier.predict_batch(paths)
+        classifier.fit(paths, np.arange(12))
+
+        uncached = ImageClassifier(k=1, preprocessing_strategy=FeaturePipeline([PCAReduction(4)]))
+        uncached.fit(paths, np.arange(12))
+        np.testing.assert_allclose(classifier.training_images, uncached.training_images, atol=1e-5)
+        assert classifier.cache_info()["paths"]["size"] == 0
@@ -22,4 +22,55 @@ class TestImageClassifier:
         
         # L'image test est plus proche des zeros
         test_image = np.zeros((28, 28)) + 0.1
-        assert classifier.predict(test_image) == 0
\ No newline at end of file
+        assert classifier.predict(test_image) == 0
+
+    def test_training_matrix_layout(self, sample_dataset):
+        """Après fit, les images d'entraînement forment une matrice (N, D) contiguë en float32"""
+        classifier = ImageClassifier(k=1)
+        images, labels = sample_dataset
+        classifier.fit(images, labels)
+
+        assert classifier.training_images.shape == (3, 784)
+        assert classifier.training_images.dtype == np.float32
+        assert classifier.training_images.flags['C_CONTIGUOUS']
+
+    def test_kneighbors_sorted_by_distance(self, sample_dataset):
+        """kneighbors retourne des voisins triés par distance croissante"""
+        classifier = ImageClassifier(k=2)
+        images, labels = sample_dataset
+        classifier.fit(images, labels)
+
+        distances, indices = classifier.kneighbors([np.ones((28, 28))], k=3)
+
+        assert distances.shape == (1, 3)
+        assert indices[0, 0] == 1
+        assert np.all(np.diff(distances, axis=1) >= 0)
+        np.testing.assert_array_equal(
+            classifier.kneighbors([np.ones((28, 28))], k=3, return_distance=False), indices
+        )
+
+    def test_predict_batch_matches_predict(self):
+        """predict_batch donne les mêmes résultats que predict, quelle que soit la taille de bloc"""
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (40, 28, 28), dtype=np.uint8)
+        labels = rng.integers(0, 4, 40)
+        queries = rng.integers(0, 256, (13, 28, 28), dtype=np.uint8)
+
+        classifier = ImageClassifier(k=5, block_size=4)
+        classifier.fit(images, labels)
+
+        expected = [classifier.predict(query) for query in queries]
+        np.testing.assert_array_equal(classifier.predict_batch(queries), expected)
+
+    def test_evaluate_propagates_errors(self, sample_dataset):
+        """evaluate ne masque plus les erreurs de prédiction"""
+        classifier = ImageClassifier(k=3)
+        images, labels = sample_dataset
+        classifier.fit(images, labels)
+
+        with pytest.raises(TypeError):
+            classifier.evaluate([42], [0])
+
+    def test_invalid_block_size(self):
+        with pytest.raises(ValueError):
+            ImageClassifier(block_size=0)
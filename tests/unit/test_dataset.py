@@ -0,0 +1,30 @@
+import pytest
+import numpy as np
+from src.data.dataset import Dataset
+
+class InMemoryDataset(Dataset):
+    """Dataset minimal pour tester l'interface commune"""
+    def _check_exists(self):
+        return True
+
+    def _download(self):
+        pass
+
+    def _load_data(self):
+        self.train_data = np.arange(10 * 4, dtype=np.float32).reshape(10, 2, 2)
+        self.train_labels = np.arange(10)
+        self.test_data = self.train_data[:3]
+        self.test_labels = self.train_labels[:3]
+
+class TestDataset:
+    def test_iter_batches(self, tmp_path):
+        dataset = InMemoryDataset(tmp_path)
+        batches = list(dataset.iter_batches("train", batch_size=4))
+
+        assert [len(images) for images, _ in batches] == [4, 4, 2]
+        np.testing.assert_array_equal(np.concatenate([labels for _, labels in batches]), np.arange(10))
+
+    def test_iter_batches_invalid_split(self, tmp_path):
+        dataset = InMemoryDataset(tmp_path)
+        with pytest.raises(ValueError):
+            next(dataset.iter_batches("validation", batch_size=4))
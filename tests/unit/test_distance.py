@@ -1,4 +1,6 @@
+import pytest
 from src import EuclideanDistance
+from src.strategies import ChiSquareDistance, CosineDistance, ManhattanDistance, MinkowskiDistance
 import numpy as np
 
 class TestEuclideanDistance:
@@ -14,4 +16,69 @@ class TestEuclideanDistance:
         img1 = np.zeros((2, 2))
         img2 = np.ones((2, 2))
         # La distance devrait être sqrt(4) = 2 car on a 4 pixels différant de 1
-        assert strategy.calculate_distance(img1, img2) == 2.0
\ No newline at end of file
+        assert strategy.calculate_distance(img1, img2) == 2.0
+
+    def test_pairwise_matches_pairwise_loop(self):
+        """La version matricielle doit donner les mêmes distances que calculate_distance"""
+        strategy = EuclideanDistance()
+        rng = np.random.default_rng(0)
+        queries = rng.random((4, 784), dtype=np.float32)
+        vectors = rng.random((20, 784), dtype=np.float32)
+
+        distances = strategy.pairwise_distances(queries, vectors, strategy.precompute(vectors))
+
+        assert distances.shape == (4, 20)
+        for i in range(4):
+            for j in range(20):
+                expected = strategy.calculate_distance(queries[i], vectors[j])
+                assert distances[i, j] == pytest.approx(expected, rel=1e-4)
+
+    def test_pairwise_without_precomputed_norms(self):
+        """Les normes sont recalculées si elles ne sont pas fournies"""
+        strategy = EuclideanDistance()
+        queries = np.zeros((1, 4), dtype=np.float32)
+        vectors = np.ones((2, 4), dtype=np.float32)
+        np.testing.assert_allclose(strategy.pairwise_distances(queries, vectors), [[2.0, 2.0]])
+
+
+class TestBatchedDistances:
+    @pytest.mark.parametrize("strategy", [
+        EuclideanDistance(),
+        CosineDistance(),
+        ManhattanDistance(),
+        MinkowskiDistance(p=3),
+        MinkowskiDistance(p=np.inf),
+        ChiSquareDistance(),
+    ], ids=lambda strategy: f"{type(strategy).__name__}{getattr(strategy, 'p', '')}")
+    def test_pairwise_matches_calculate_distance(self, strategy):
+        rng = np.random.default_rng(0)
+        queries = rng.random((3, 50), dtype=np.float32)
+        vectors = rng.random((40, 50), dtype=np.float32)
+        vectors[0] = 0  # vecteur nul : cas limite du cosinus et du khi-deux
+
+        distances = strategy.pairwise_distances(queries, vectors, strategy.precompute(vectors))
+
+        expected = [[strategy.calculate_distance(q, v) for v in vectors] for q in queries]
+        np.testing.assert_allclose(distances, expected, rtol=1e-4, atol=1e-5)
+
+    def test_metric_declarations(self):
+        assert EuclideanDistance().is_metric
+        assert ManhattanDistance().is_metric
+        assert MinkowskiDistance(p=3).is_metric
+        assert not MinkowskiDistance(p=0.5).is_metric
+        assert not CosineDistance().is_metric
+        assert not ChiSquareDistance().is_metric
+
+    def test_cosine_ignores_scale(self):
+        strategy = CosineDistance()
+        vector = np.arange(1, 5, dtype=np.float32)[np.newaxis]
+        np.testing.assert_allclose(strategy.pairwise_distances(vector, 3 * vector), [[0.0]], atol=1e-6)
+
+    def test_minkowski_two_is_euclidean(self):
+        rng = np.random.default_rng(1)
+        queries = rng.random((2, 8), dtype=np.float32)
+        vectors = rng.random((5, 8), dtype=np.float32)
+        np.testing.assert_allclose(
+            MinkowskiDistance(p=2).pairwise_distances(queries, vectors),
+            EuclideanDistance().pairwise_distances(queries, vectors),
+        )
@@ -0,0 +1,199 @@
+import json
+import socket
+import threading
+import numpy as np
+import pytest
+from src import ImageClassifier
+from src import distributed as distributed_module
+from src.distributed import (
+    DistributedClassifier, ProtocolError, ShardWorker, WorkerError, _Connection, recv_message,
+    send_message, shard_bounds
+)
+
+class _SilentServer:
+    """Accepte les connexions mais ne répond jamais : un worker retardataire"""
+    def __init__(self):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.address = self.sock.getsockname()[:2]
+        self.connections = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                self.connections.append(self.sock.accept()[0])
+            except OSError:
+                return
+
+    def close(self):
+        self.sock.close()
+        for connection in self.connections:
+            connection.close()
+
+class TestProtocol:
+    def test_round_trip_without_pickle(self):
+        left, right = socket.socketpair()
+        with left, right:
+            arrays = [np.arange(12, dtype=np.float32).reshape(3, 4), np.array([], dtype=np.int64)]
+            send_message(left, {"op": "search", "k": 3}, arrays)
+            header, received = recv_message(right)
+
+            assert header == {"op": "search", "k": 3}
+            for sent, got in zip(arrays, received):
+                assert got.dtype == sent.dtype and got.shape == sent.shape
+                np.testing.assert_array_equal(got, sent)
+
+            with pytest.raises(ProtocolError):
+                send_message(left, {}, [np.array([object()])])
+
+    def test_rejects_object_arrays_and_bad_headers(self):
+        left, right = socket.socketpair()
+        with left, right:
+            header = json.dumps({"arrays": [["|O", [1]]]}).encode()
+            left.sendall(len(header).to_bytes(4, "big") + header)
+            with pytest.raises(ProtocolError):
+                recv_message(right)
+
+            left.sendall((3).to_bytes(4, "big") + b"{{{")
+            with pytest.raises(ProtocolError):
+                recv_message(right)
+
+    def test_shard_bounds_cover_all_rows(self):
+        bounds = [shard_bounds(10, shard, 3) for shard in range(3)]
+        assert bounds == [(0, 3), (3, 6), (6, 10)]
+        with pytest.raises(ValueError):
+            shard_bounds(10, 3, 3)
+
+class TestDistributedClassifier:
+    @pytest.fixture
+    def model(self, tmp_path):
+        rng = np.random.default_rng(0)
+        images = np.repeat(np.arange(0, 250, 50, dtype=np.uint8), 40)[:, None, None] \
+            + rng.integers(0, 40, (200, 28, 28), dtype=np.uint8)
+        labels = np.repeat(np.arange(5), 40)
+        classifier = ImageClassifier(k=5, weights="distance", block_size=16)
+        classifier.fit(images, labels)
+        classifier.remove(classifier.ids_[::7])
+        classifier.save(tmp_path / "model")
+        return classifier, images, tmp_path / "model"
+
+    @pytest.fixture
+    def servers(self, model):
+        _, _, path = model
+        servers = [ShardWorker(path, shard, 3).serve() for shard in range(3)]
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield servers
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_matches_single_node_classifier(self, model, servers):
+        classifier, images, path = model
+        queries = images[::3] + 5
+        with DistributedClassifier(ImageClassifier.load(path), [s.address for s in servers]) as distributed:
+            info = distributed.workers_info()
+            assert [(w["start"], w["stop"]) for w in info] == [(0, 66), (66, 133), (133, 200)]
+            assert sum(w["rows"] for w in info) == len(classifier._index)
+
+            distances, indices = distributed.kneighbors(queries)
+            expected_distances, expected = classifier.kneighbors(queries)
+            np.testing.assert_array_equal(np.sort(indices, axis=1), np.sort(expected, axis=1))
+            np.testing.assert_allclose(distances, expected_distances, atol=1e-3)
+            np.testing.assert_array_equal(
+                distributed.predict_batch(queries), classifier.predict_batch(queries)
+            )
+            stats = distributed.stats()
+            assert stats["batches"] == 2 * len(range(0, len(queries), 16))
+            assert all(worker["requests"] > 0 for worker in stats["workers"])
+
+    def test_quantized_shards_merge_exactly(self, model, tmp_path):
+        """Les shards reprennent la quantification du modèle : la fusion est exacte"""
+        _, images, _ = model
+        classifier = ImageClassifier(k=5, storage="int8")
+        # Lignes triées par classe : chaque shard couvre une autre plage de valeurs
+        classifier.fit(images, np.repeat(np.arange(5), 40))
+        classifier.remove(classifier.ids_[::9])
+        classifier.save(tmp_path / "int8")
+        shards = [ShardWorker(tmp_path / "int8", shard, 3) for shard in range(3)]
+        assert all(shard.classifier._index.quantizer.scale == classifier._index.quantizer.scale
+                   for shard in shards)
+
+        queries = classifier._preprocess(images[::4] + 5)
+        partial = [shard.search(queries, 5) for shard in shards]
+        distances = np.concatenate([d for d, _ in partial], axis=1)
+        indices = np.concatenate([i for _, i in partial], axis=1)
+        best = np.argsort(distances, axis=1, kind="stable")[:, :5]
+        expected_distances, expected = classifier._index.search(queries, 5)
+        np.testing.assert_array_equal(np.take_along_axis(distances, best, axis=1), expected_distances)
+        np.testing.assert_array_equal(
+            np.sort(np.take_along_axis(indices, best, axis=1), axis=1), np.sort(expected, axis=1)
+        )
+
+    def test_straggler_policies(self, model, servers):
+        classifier, images, path = model
+        silent = _SilentServer()
+        addresses = [s.address for s in servers] + [silent.address]
+        try:
+            with DistributedClassifier(classifier, addresses, timeout=0.3) as distributed:
+                with pytest.raises(WorkerError):
+                    distributed.predict_batch(images[:4])
+
+            with DistributedClassifier(classifier, addresses, timeout=0.3,
+                                       straggler_policy="partial") as distributed:
+                # Les trois workers qui répondent couvrent tout le modèle
+                predictions = distributed.predict_batch(images[:20])
+                np.testing.assert_array_equal(predictions, classifier.predict_batch(images[:20]))
+                stats = distributed.stats()
+                assert stats["partial_batches"] == stats["batches"] == 2
+                assert stats["workers"][-1]["timeouts"] == 2
+        finally:
+            silent.close()
+
+    def test_late_request_does_not_close_newer_socket(self, servers, monkeypatch):
+        """Une requête en retard qui échoue ne ferme pas la socket du bloc suivant"""
+        connection = _Connection(servers[0].address, 1)
+        stalled, late_failed = threading.Event(), threading.Event()
+        release = threading.Event()
+
+        def recv(sock):
+            if not stalled.is_set():
+                stalled.set()
+                release.wait(5)
+                raise socket.timeout("réponse en retard")
+            # La requête suivante attend l'échec de la précédente avant de lire sa réponse
+            late_failed.wait(5)
+            return recv_message(sock)
+        monkeypatch.setattr(distributed_module, "recv_message", recv)
+
+        def late_request():
+            try:
+                connection.request({"op": "info"}, [], 1)
+            except socket.timeout:
+                late_failed.set()
+        late = threading.Thread(target=late_request)
+        late.start()
+        assert stalled.wait(5)
+        connection.reset()  # comme _fan_out après le délai
+
+        responses = []
+        next_request = threading.Thread(
+            target=lambda: responses.append(connection.request({"op": "info"}, [], 1))
+        )
+        next_request.start()
+        release.set()
+        late.join(5)
+        next_request.join(5)
+        assert late_failed.is_set()
+        assert len(responses) == 1 and responses[0][0]["rows"] > 0
+
+    def test_unreachable_worker_and_invalid_policy(self, model):
+        classifier, images, _ = model
+        closed = socket.create_server(("127.0.0.1", 0))
+        address = closed.getsockname()[:2]
+        closed.close()
+        with DistributedClassifier(classifier, [address], timeout=1) as distributed:
+            with pytest.raises(WorkerError):
+                distributed.predict_batch(images[:2])
+        with pytest.raises(ValueError):
+            DistributedClassifier(classifier, [address], straggler_policy="ignore")
@@ -0,0 +1,217 @@
+import gzip
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pytest
+from src.data.download import MANIFEST, ChecksumError, DownloadManager
+from src.data.mnist_loader import MNISTDataset
+
+class _FileServer:
+    """Serveur HTTP local : sert des fichiers en mémoire, gère Range et peut couper une réponse"""
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+        self.truncate_next = set()
+        self.support_range = True
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                name = self.path.lstrip("/")
+                server.requests.append((name, self.headers.get("Range")))
+                if name not in server.files:
+                    self.send_error(404)
+                    return
+                body, status, headers = server.files[name], 200, {}
+                requested = self.headers.get("Range")
+                if requested and server.support_range:
+                    start = int(requested.split("=")[1].rstrip("-"))
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(body)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                    body, status = body[start:], 206
+
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if name in server.truncate_next:
+                    # Connexion coupée au milieu du corps annoncé
+                    server.truncate_next.discard(name)
+                    self.wfile.write(body[:len(body) // 2])
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def body_requests(self, name):
+        return [headers for served, headers in self.requests if served == name]
+
+def _idx_gz(header, payload):
+    return gzip.compress(b"".join(value.to_bytes(4, "big") for value in header) + payload)
+
+class TestDownloadManager:
+    @pytest.fixture
+    def files(self):
+        rng = np.random.default_rng(0)
+        return {f"file{i}.bin": rng.bytes(200_000 + i) for i in range(4)}
+
+    @pytest.fixture
+    def server(self, files):
+        server = _FileServer(files)
+        yield server
+        server.close()
+
+    def test_fetch_all_downloads_and_caches(self, tmp_path, server, files):
+        with DownloadManager(tmp_path, max_workers=4, chunk_bytes=4096) as manager:
+            paths = manager.fetch_all((server.url + name, None, None) for name in files)
+            assert manager.stats()["downloads"] == 4
+
+        assert sorted(paths) == sorted(files)
+        for name, body in files.items():
+            assert paths[name].read_bytes() == body
+        manifest = (tmp_path / MANIFEST).read_text()
+        assert hashlib.sha256(files["file0.bin"]).hexdigest() + "  file0.bin" in manifest
+
+        # Un nouveau démarrage trouve tout dans le cache, sans requête
+        served = len(server.requests)
+        with DownloadManager(tmp_path) as manager:
+            manager.fetch_all((server.url + name, None, None) for name in files)
+            assert manager.stats()["cache_hits"] == 4
+        assert len(server.requests) == served
+
+    def test_resume_partial_file_with_range(self, tmp_path, server, files):
+        body = files["file1.bin"]
+        (tmp_path / "file1.bin.part").write_bytes(body[:50_000])
+
+        with DownloadManager(tmp_path) as manager:
+            path = manager.fetch(server.url + "file1.bin")
+            assert manager.stats()["resumed"] == 1
+            assert manager.stats()["bytes"] == len(body) - 50_000
+
+        assert path.read_bytes() == body
+        assert server.body_requests("file1.bin") == ["bytes=50000-"]
+        assert not (tmp_path / "file1.bin.part").exists()
+
+    def test_complete_partial_file_is_only_verified(self, tmp_path, server, files):
+        body = files["file1.bin"]
+        (tmp_path / "file1.bin.part").write_bytes(body)
+
+        with DownloadManager(tmp_path) as manager:
+            assert manager.fetch(server.url + "file1.bin").read_bytes() == body
+            assert manager.stats()["bytes"] == 0
+
+    def test_oversized_partial_file_is_downloaded_again(self, tmp_path, server, files):
+        """Un morceau plus long que le fichier n'est pas pris pour un fichier complet"""
+        body = files["file1.bin"]
+        (tmp_path / "file1.bin.part").write_bytes(body + b"garbage")
+
+        with DownloadManager(tmp_path) as manager:
+            path = manager.fetch(server.url + "file1.bin")
+            assert manager.stats()["bytes"] == len(body)
+            assert manager.cached("file1.bin", hashlib.sha256(body).hexdigest())
+
+        assert path.read_bytes() == body
+        assert server.body_requests("file1.bin") == [f"bytes={len(body) + 7}-", None]
+
+    def test_interrupted_download_is_retried_and_resumed(self, tmp_path, server, files):
+        server.truncate_next.add("file2.bin")
+
+        with DownloadManager(tmp_path, retries=2) as manager:
+            path = manager.fetch(server.url + "file2.bin")
+            assert manager.stats()["retries"] == 1
+
+        assert path.read_bytes() == files["file2.bin"]
+        first, second = server.body_requests("file2.bin")
+        # La reprise commence après le dernier morceau reçu en entier
+        offset = int(second.split("=")[1].rstrip("-"))
+        assert first is None and 0 < offset <= len(files["file2.bin"]) // 2
+
+    def test_server_without_range_restarts_from_scratch(self, tmp_path, server, files):
+        server.support_range = False
+        (tmp_path / "file3.bin.part").write_bytes(b"garbage")
+
+        with DownloadManager(tmp_path) as manager:
+            path = manager.fetch(server.url + "file3.bin")
+        assert path.read_bytes() == files["file3.bin"]
+
+    def test_checksum_mismatch_is_rejected(self, tmp_path, server, files):
+        with DownloadManager(tmp_path) as manager:
+            with pytest.raises(ChecksumError):
+                manager.fetch(server.url + "file0.bin", sha256="0" * 64)
+            assert not (tmp_path / "file0.bin").exists()
+            assert not (tmp_path / "file0.bin.part").exists()
+
+            expected = hashlib.sha256(files["file0.bin"]).hexdigest()
+            assert manager.fetch(server.url + "file0.bin", sha256=expected).exists()
+
+    def test_corrupted_cache_is_downloaded_again(self, tmp_path, server, files):
+        with DownloadManager(tmp_path) as manager:
+            path = manager.fetch(server.url + "file0.bin")
+        path.write_bytes(b"corrupted")
+
+        with DownloadManager(tmp_path) as manager:
+            assert not manager.cached("file0.bin")
+            assert manager.fetch(server.url + "file0.bin").read_bytes() == files["file0.bin"]
+
+    def test_falls_back_to_mirror(self, tmp_path, server, files):
+        with DownloadManager(tmp_path, retries=0) as manager:
+            path = manager.fetch([server.url + "missing/file0.bin", server.url + "file0.bin"])
+        assert path.name == "file0.bin"
+        assert path.read_bytes() == files["file0.bin"]
+        assert [name for name, _ in server.requests] == ["missing/file0.bin", "file0.bin"]
+
+    def test_mnist_dataset_downloads_once(self, tmp_path):
+        images = np.arange(10 * 28 * 28, dtype=np.uint8).tobytes()
+        labels = np.arange(10, dtype=np.uint8).tobytes()
+        files = {
+            "train-images-idx3-ubyte.gz": _idx_gz((2051, 10, 28, 28), images),
+            "train-labels-idx1-ubyte.gz": _idx_gz((2049, 10), labels),
+            "t10k-images-idx3-ubyte.gz": _idx_gz((2051, 10, 28, 28), images),
+            "t10k-labels-idx1-ubyte.gz": _idx_gz((2049, 10), labels),
+        }
+        server = _FileServer(files)
+        try:
+            class LocalMNIST(MNISTDataset):
+                URLS = {
+                    name: server.url + url.split("/")[-1] for name, url in MNISTDataset.URLS.items()
+                }
+                MIRRORS = ()
+                SHA256 = {name: hashlib.sha256(body).hexdigest() for name, body in files.items()}
+
+            dataset = LocalMNIST(tmp_path / "mnist")
+            assert dataset.train_data.shape == (10, 28, 28)
+            np.testing.assert_array_equal(dataset.test_labels, np.arange(10))
+            assert len(server.requests) == 4
+
+            LocalMNIST(tmp_path / "mnist")
+            assert len(server.requests) == 4
+
+            # Les empreintes publiées de MNIST sont vérifiées : des fichiers différents sont rejetés
+            class PinnedMNIST(LocalMNIST):
+                SHA256 = MNISTDataset.SHA256
+
+            with pytest.raises(ChecksumError):
+                PinnedMNIST(tmp_path / "pinned")
+        finally:
+            server.close()
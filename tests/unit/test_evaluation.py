@@ -0,0 +1,119 @@
+import threading
+import numpy as np
+import pytest
+from PIL import Image
+from src import ImageClassifier
+from src.benchmarks import synthetic_mnist
+from src.evaluation import iter_image_folder, stream_evaluate, stream_predict
+
+@pytest.fixture
+def model():
+    images, labels = synthetic_mnist(300, n_classes=4)
+    classifier = ImageClassifier(k=3, block_size=32)
+    classifier.fit(images[:200], labels[:200])
+    return classifier, images[200:], labels[200:]
+
+def _batches(images, labels, sizes):
+    """Lots de tailles irrégulières, comme un Dataset lu par morceaux"""
+    start = 0
+    for size in sizes:
+        yield images[start:start + size], labels[start:start + size]
+        start += size
+
+class TestStreamEvaluate:
+    def test_matches_batch_evaluation(self, model):
+        classifier, images, labels = model
+        # Quelques étiquettes fausses pour avoir des erreurs à rapporter
+        labels = labels.copy()
+        labels[::9] = (labels[::9] + 1) % 4
+        report = stream_evaluate(classifier, _batches(images, labels, (7, 50, 1, 42)),
+                                 n_workers=2, max_pending=1)
+
+        predictions = classifier.predict_batch(images)
+        assert report["n_images"] == 100 and report["n_failed"] == 0
+        assert report["accuracy"] == pytest.approx(classifier.evaluate(images, labels))
+        expected = np.zeros((4, 4), dtype=np.int64)
+        np.add.at(expected, (labels, predictions), 1)
+        np.testing.assert_array_equal(report["confusion_matrix"], expected)
+        np.testing.assert_allclose(report["per_class_accuracy"], expected.diagonal() / expected.sum(axis=1))
+
+        wrong = np.flatnonzero(predictions != labels)
+        assert report["n_errors"] == len(wrong)
+        assert [error["index"] for error in report["errors"]] == wrong.tolist()
+        assert report["errors"][0] == {
+            "index": int(wrong[0]), "path": None,
+            "label": int(labels[wrong[0]]), "predicted": int(predictions[wrong[0]]),
+        }
+        assert report["images_per_second"] > 0
+
+        capped = stream_evaluate(classifier, [(images, labels)], max_errors=2)
+        assert len(capped["errors"]) == 2 and capped["n_errors"] == len(wrong)
+
+    def test_image_folder_with_unreadable_file(self, model, tmp_path):
+        classifier, images, labels = model
+        for i, (image, label) in enumerate(zip(images[:20], labels[:20])):
+            (tmp_path / str(label)).mkdir(exist_ok=True)
+            Image.fromarray(image).save(tmp_path / str(label) / f"{i:03d}.png")
+        (tmp_path / "2" / "corrompu.png").write_bytes(b"pas une image")
+        (tmp_path / "2" / "notes.txt").write_text("ignoré")
+
+        batches = list(iter_image_folder(tmp_path, batch_size=8))
+        assert [len(paths) for paths, _ in batches] == [8, 8, 5]
+        assert all(isinstance(label, int) for _, batch_labels in batches for label in batch_labels)
+
+        report = stream_evaluate(classifier, iter_image_folder(tmp_path, batch_size=8), n_workers=3)
+        assert report["n_images"] == 20 and report["n_failed"] == 1
+        failure = report["failures"][0]
+        assert failure["path"].endswith("corrompu.png") and failure["label"] == 2
+        assert failure["error"].startswith("ValueError") and "corrompue" in failure["error"]
+        assert report["accuracy"] == pytest.approx(classifier.evaluate(images[:20], labels[:20]))
+
+    def test_unknown_labels_and_empty_stream(self, model):
+        classifier, images, labels = model
+        report = stream_evaluate(classifier, [(images[:10], np.full(10, 9))])
+        assert report["n_errors"] == 10 and report["accuracy"] == 0.0
+        assert report["confusion_matrix"].sum() == 0
+        assert np.isnan(report["per_class_accuracy"]).all()
+
+        with pytest.raises(ValueError):
+            stream_evaluate(classifier, [])
+        with pytest.raises(ValueError):
+            stream_evaluate(classifier, [(images[:3], labels[:2])])
+        with pytest.raises(ValueError):
+            stream_evaluate(ImageClassifier(), [(images, labels)])
+
+class TestStreamPredict:
+    def test_matches_predict_batch(self, model):
+        classifier, images, _ = model
+        blocks = list(stream_predict(classifier, iter(images), n_workers=2))
+        assert [len(block) for block in blocks] == [32, 32, 32, 4]
+        np.testing.assert_array_equal(np.concatenate(blocks), classifier.predict_batch(images))
+
+        with pytest.raises(ValueError, match="introuvable"):
+            list(stream_predict(classifier, ["absent.png"]))
+
+    def test_abandoned_stream_stops_reading(self, model):
+        """La lecture de l'entrée s'arrête avec le consommateur, quelques blocs d'avance au plus"""
+        classifier, images, _ = model
+        read = []
+
+        def endless():
+            while True:
+                read.append(1)
+                yield images[len(read) % len(images)]
+
+        stream = stream_predict(classifier, endless(), max_pending=2)
+        next(stream)
+        stream.close()
+        assert len(read) <= 32 * (2 + 3)
+        assert not any(thread.name == "stream-reader" for thread in threading.enumerate())
+
+    def test_input_errors_are_raised(self, model):
+        classifier, images, _ = model
+
+        def broken():
+            yield images[0]
+            raise RuntimeError("lecture interrompue")
+
+        with pytest.raises(RuntimeError, match="lecture interrompue"):
+            list(stream_predict(classifier, broken()))
@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+from PIL import Image
+from src import ImageClassifier
+from src.strategies import (
+    BlockDownsampling, FeaturePipeline, HOGFeatures, PCAReduction, RandomProjection
+)
+
+class TestFeaturePipeline:
+    @pytest.fixture
+    def digits(self):
+        """Dix motifs de traits, décalés et bruités : 30 images par classe"""
+        rng = np.random.default_rng(0)
+        templates = np.zeros((10, 28, 28))
+        for label in range(10):
+            templates[label, 4 + 2 * label:7 + 2 * label, 4:24] = 1
+            templates[label, 4:24, 20 - label:23 - label] = 1
+        labels = np.repeat(np.arange(10), 30)
+        images = np.stack([
+            np.roll(templates[label], rng.integers(-2, 3), axis=1) for label in labels
+        ]) * 200 + rng.integers(0, 40, (300, 28, 28))
+        return np.clip(images, 0, 255).astype(np.uint8), labels
+
+    def test_block_downsampling_averages_blocks(self):
+        images = np.arange(2 * 4 * 6, dtype=np.float32).reshape(2, 4, 6)
+        reduced = BlockDownsampling(2).transform(images)
+
+        assert reduced.shape == (2, 2, 3)
+        np.testing.assert_allclose(reduced, images.reshape(2, 2, 2, 3, 2).mean(axis=(2, 4)))
+        # Bords incomplets : complétés par des zéros
+        assert BlockDownsampling(4).transform(images).shape == (2, 1, 2)
+
+    def test_hog_descriptor(self):
+        images = np.zeros((3, 28, 28), dtype=np.float32)
+        images[0, :, 14:] = 1   # bord vertical : gradient horizontal
+        images[1, 14:, :] = 1   # bord horizontal : gradient vertical
+        images[2] = images[0] * 0.2  # même bord, contraste plus faible
+
+        features = HOGFeatures().transform(images)
+
+        assert features.shape == (3, 3 * 3 * 4 * 9)
+        assert features.dtype == np.float32
+        histogram = features.reshape(3, 9, 4, 9).sum(axis=(1, 2))
+        assert np.argmax(histogram[0]) == 0   # orientation 0°
+        assert np.argmax(histogram[1]) == 4   # orientation 90°
+        # La normalisation par blocs rend le descripteur insensible au contraste
+        np.testing.assert_allclose(features[2], features[0], atol=1e-3)
+
+    def test_projections_are_fitted(self, digits):
+        images, _ = digits
+        vectors = images.reshape(len(images), -1).astype(np.float32)
+
+        with pytest.raises(RuntimeError):
+            PCAReduction(8).transform(vectors)
+        assert PCAReduction(8).fit_transform(vectors).shape == (300, 8)
+        assert RandomProjection(16).fit_transform(images).shape == (300, 16)
+
+    def test_single_image_matches_batch(self, digits):
+        images, _ = digits
+        pipeline = FeaturePipeline([HOGFeatures(), PCAReduction(20)]).fit(images)
+
+        batch = pipeline.preprocess_batch(images[:5])
+        assert batch.shape == (5, 20)
+        np.testing.assert_allclose(pipeline.preprocess(images[3]), batch[3], atol=1e-5)
+        pil_image = Image.fromarray(images[3])
+        np.testing.assert_allclose(pipeline.preprocess(pil_image), batch[3], atol=1e-5)
+
+    def test_classifier_fits_pipeline_and_saves_it(self, digits, tmp_path):
+        images, labels = digits
+        pipeline = FeaturePipeline([BlockDownsampling(2), PCAReduction(32)], fit_samples=200)
+        classifier = ImageClassifier(k=3, preprocessing_strategy=pipeline)
+        classifier.fit(images, labels)
+
+        # Les vecteurs indexés sont ceux de la sortie du pipeline
+        assert classifier.training_images.shape == (300, 32)
+        assert classifier.evaluate(images[::3], labels[::3]) > 0.95
+
+        classifier.save(tmp_path / "model")
+        loaded = ImageClassifier.load(tmp_path / "model")
+        np.testing.assert_allclose(
+            loaded.preprocessing_strategy.steps[1].projection.components_,
+            pipeline.steps[1].projection.components_,
+        )
+        np.testing.assert_array_equal(loaded.predict_batch(images), classifier.predict_batch(images))
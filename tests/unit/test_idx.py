@@ -0,0 +1,49 @@
+import gzip
+import pytest
+import numpy as np
+from src.data.idx import idx_to_npy, iter_idx_chunks
+
+class TestIdxReader:
+    @pytest.fixture
+    def images_file(self, tmp_path):
+        """Fichier IDX gzip de 50 images 28x28"""
+        images = np.random.default_rng(0).integers(0, 256, (50, 28, 28), dtype=np.uint8)
+        path = tmp_path / "images.gz"
+        with gzip.open(path, 'wb') as f:
+            for value in (2051, 50, 28, 28):
+                f.write(value.to_bytes(4, 'big'))
+            f.write(images.tobytes())
+        return path, images
+
+    def test_chunks_are_bounded(self, images_file):
+        path, images = images_file
+        # 784 octets par image : 4 images par morceau de 3200 octets
+        chunks = list(iter_idx_chunks(path, chunk_bytes=3200))
+
+        assert all(len(chunk) <= 4 for chunk in chunks)
+        np.testing.assert_array_equal(np.concatenate(chunks), images)
+
+    def test_idx_to_npy_writes_memmap(self, images_file, tmp_path):
+        path, images = images_file
+        result = idx_to_npy(path, tmp_path / "images.npy", divisor=255.0, chunk_bytes=3200)
+
+        assert isinstance(result, np.memmap)
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, images.astype(np.float32) / 255.0)
+        assert not (tmp_path / "images.npy.tmp").exists()
+
+    def test_truncated_file(self, tmp_path):
+        path = tmp_path / "labels.gz"
+        with gzip.open(path, 'wb') as f:
+            f.write((2049).to_bytes(4, 'big'))
+            f.write((10).to_bytes(4, 'big'))
+            f.write(bytes(5))
+        with pytest.raises(ValueError):
+            list(iter_idx_chunks(path))
+
+    def test_invalid_header(self, tmp_path):
+        path = tmp_path / "bad.gz"
+        with gzip.open(path, 'wb') as f:
+            f.write(b'GIF89a')
+        with pytest.raises(ValueError):
+            list(iter_idx_chunks(path))
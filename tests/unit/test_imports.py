@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+import src
+
+ROOT = Path(__file__).resolve().parents[2]
+
+def loaded_modules(code):
+    """Modules chargés par `code` dans un nouvel interpréteur, parmi les dépendances lourdes"""
+    script = code + "\nimport sys\nprint(' '.join(m for m in ('numpy', 'PIL', 'requests', "\
+        "'multiprocessing', 'src.knn') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    return set(result.stdout.split())
+
+class TestLazyImports:
+    def test_package_import_loads_nothing_heavy(self):
+        assert loaded_modules("import src") == set()
+
+    def test_classifier_does_not_load_optional_dependencies(self):
+        code = (
+            "import numpy as np\nfrom src import ImageClassifier\n"
+            "c = ImageClassifier(k=1)\nc.fit(np.zeros((2, 28, 28), np.uint8), [0, 1])\n"
+            "c.predict(np.ones((28, 28), np.uint8))"
+        )
+        assert loaded_modules(code) == {"numpy", "src.knn"}
+
+    def test_pillow_is_loaded_for_the_paths_that_need_it(self, tmp_path):
+        from PIL import Image
+        Image.new("L", (10, 10), 255).save(tmp_path / "image.png")
+        code = (
+            "from src.strategies import MNISTPreprocessing\n"
+            f"MNISTPreprocessing().preprocess({str(tmp_path / 'image.png')!r})"
+        )
+        assert "PIL" in loaded_modules(code)
+
+    def test_cached_download_does_not_load_requests(self, tmp_path):
+        (tmp_path / "file.bin").write_bytes(b"data")
+        code = (
+            "from src.data.download import DownloadManager\n"
+            f"with DownloadManager({str(tmp_path)!r}) as manager:\n"
+            "    manager.fetch('http://127.0.0.1:9/file.bin')"
+        )
+        assert "requests" not in loaded_modules(code)
+
+    def test_lazy_attributes(self):
+        from src.strategies import EuclideanDistance, FeaturePipeline
+        assert src.ImageClassifier.__name__ == "ImageClassifier"
+        assert "ImageClassifier" in dir(src)
+        assert FeaturePipeline.__module__ == "src.strategies.features"
+        with pytest.raises(AttributeError):
+            src.Classifier
+        with pytest.raises(ImportError):
+            from src.strategies import Unknown  # noqa: F401
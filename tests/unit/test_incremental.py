@@ -0,0 +1,158 @@
+import pytest
+import numpy as np
+from src import ImageClassifier
+from src.buffers import RowBuffers
+from src.index import IVFIndex
+
+INDEX_SETTINGS = [
+    {"index": "brute"},
+    {"index": "kdtree"},
+    {"index": "balltree"},
+    # Toutes les cellules visitées : la recherche IVF devient exacte
+    {"index": IVFIndex(n_lists=4, nprobe=4)},
+    {"storage": "uint8"},
+]
+
+def make_images(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (n, 28, 28), dtype=np.uint8)
+
+def assert_same_neighbors(incremental, reference, reference_ids, queries):
+    """Mêmes voisins (par identifiant) et mêmes distances qu'un modèle entraîné d'un coup"""
+    distances, indices = incremental.kneighbors(queries, k=5)
+    expected_distances, expected_indices = reference.kneighbors(queries, k=5)
+    np.testing.assert_array_equal(incremental.ids_[indices], reference_ids[expected_indices])
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-3, atol=5e-2)
+
+class TestRowBuffers:
+    def test_amortized_growth(self):
+        """Les ajouts écrivent dans la réserve, qui n'est réallouée que lorsqu'elle est pleine"""
+        buffers = RowBuffers()
+        array = buffers.append("x", None, np.arange(100))
+        reallocations = 0
+        for i in range(100):
+            grown = buffers.append("x", array, np.array([100 + i]))
+            reallocations += grown.base is not array.base
+            array = grown
+        np.testing.assert_array_equal(array, np.arange(200))
+        assert reallocations <= 3
+
+    def test_dtype_widening(self):
+        """Des labels textuels plus longs élargissent le type au lieu d'être tronqués"""
+        buffers = RowBuffers()
+        labels = buffers.append("labels", np.array(["a", "b"]), np.array(["chat"]))
+        assert labels.tolist() == ["a", "b", "chat"]
+
+class TestIncrementalUpdates:
+    @pytest.mark.parametrize("settings", INDEX_SETTINGS)
+    def test_partial_fit_matches_fit(self, settings):
+        """Ajouter par morceaux donne les mêmes voisins qu'un entraînement d'un coup"""
+        images = make_images(400, 0)
+        labels = np.arange(400) % 7
+        classifier = ImageClassifier(k=3, **settings)
+        classifier.fit(images[:200], labels[:200])
+        new_ids = classifier.partial_fit(images[200:], labels[200:])
+
+        np.testing.assert_array_equal(new_ids, np.arange(200, 400))
+        reference = ImageClassifier(k=3)
+        reference.fit(images, labels)
+        assert_same_neighbors(classifier, reference, np.arange(400), make_images(20, 1))
+
+    @pytest.mark.parametrize("settings", INDEX_SETTINGS)
+    def test_remove_excludes_rows(self, settings):
+        """Une image retirée n'est plus jamais retournée, avant comme après compactage"""
+        images = make_images(300, 2)
+        labels = np.arange(300) % 5
+        classifier = ImageClassifier(k=3, compaction_threshold=0.3, **settings)
+        classifier.fit(images, labels)
+
+        removed = np.arange(0, 300, 5)
+        classifier.remove(removed)
+        assert len(classifier.training_images if classifier.storage == "float32"
+                   else classifier._index.codes) == 300
+        kept = np.setdiff1d(np.arange(300), removed)
+        reference = ImageClassifier(k=3)
+        reference.fit(images[kept], labels[kept])
+        assert_same_neighbors(classifier, reference, kept, images[:20])
+
+        # Au-delà du seuil, les lignes sont retirées physiquement ; les identifiants restent
+        classifier.remove(np.arange(1, 300, 5))
+        assert classifier._index.n_deleted == 0
+        kept = np.setdiff1d(kept, np.arange(1, 300, 5))
+        np.testing.assert_array_equal(classifier.ids_, kept)
+        reference.fit(images[kept], labels[kept])
+        assert_same_neighbors(classifier, reference, kept, images[:20])
+
+    @pytest.mark.parametrize("settings", INDEX_SETTINGS[:4])
+    def test_large_update_rebuilds_structures(self, settings):
+        """Un ajout dépassant le seuil fusionne les lignes en attente dans l'index"""
+        images = make_images(1400, 3)
+        labels = np.arange(1400) % 10
+        classifier = ImageClassifier(k=3, **settings)
+        classifier.fit(images[:100], labels[:100])
+        classifier.remove([0, 1, 2])
+        classifier.partial_fit(images[100:1400], labels[100:1400])
+
+        kept = np.arange(3, 1400)
+        reference = ImageClassifier(k=3)
+        reference.fit(images[kept], labels[kept])
+        assert_same_neighbors(classifier, reference, kept, make_images(10, 4))
+
+    def test_new_classes(self):
+        """Une classe apparue dans partial_fit est prédite, les anciennes restent correctes"""
+        images = make_images(30, 5)
+        classifier = ImageClassifier(k=1)
+        classifier.fit(images[:20], ["b"] * 10 + ["d"] * 10)
+        classifier.partial_fit(images[20:], ["a"] * 5 + ["cheval"] * 5)
+
+        assert classifier.classes_.tolist() == ["a", "b", "cheval", "d"]
+        expected = ["b"] * 10 + ["d"] * 10 + ["a"] * 5 + ["cheval"] * 5
+        assert classifier.predict_batch(images).tolist() == expected
+
+    def test_partial_fit_without_fit(self):
+        """Sans entraînement préalable, partial_fit équivaut à fit"""
+        classifier = ImageClassifier(k=1)
+        ids = classifier.partial_fit(make_images(5, 6), [0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(ids, np.arange(5))
+
+    def test_invalid_ids(self):
+        classifier = ImageClassifier(k=1)
+        classifier.fit(make_images(10, 7), np.arange(10))
+        with pytest.raises(ValueError):
+            classifier.remove([42])
+        classifier.remove([3])
+        with pytest.raises(ValueError):
+            classifier.remove([3])
+
+    def test_k_limited_to_remaining_images(self):
+        classifier = ImageClassifier(k=3)
+        classifier.fit(make_images(4, 8), np.arange(4))
+        classifier.remove([0, 1])
+        with pytest.raises(ValueError):
+            classifier.predict(make_images(1, 9)[0])
+
+    def test_updates_invalidate_prediction_cache(self):
+        images = make_images(10, 10)
+        classifier = ImageClassifier(k=1, cache_size=10)
+        classifier.fit(images[:5], np.zeros(5, dtype=int))
+        assert classifier.predict(images[7]) == 0
+        classifier.partial_fit(images[5:], np.ones(5, dtype=int))
+        assert classifier.predict(images[7]) == 1
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_save_load_after_updates(self, tmp_path, mmap):
+        """Un modèle mis à jour puis rechargé (éventuellement projeté en mémoire) reste modifiable"""
+        images = make_images(60, 11)
+        labels = np.arange(60) % 3
+        classifier = ImageClassifier(k=3, index=IVFIndex(n_lists=4, nprobe=4))
+        classifier.fit(images[:40], labels[:40])
+        classifier.partial_fit(images[40:], labels[40:])
+        classifier.remove([5, 45])
+        classifier.save(tmp_path / "model")
+
+        loaded = ImageClassifier.load(tmp_path / "model", mmap=mmap)
+        np.testing.assert_array_equal(loaded.kneighbors(images)[1], classifier.kneighbors(images)[1])
+
+        loaded.remove([6])
+        np.testing.assert_array_equal(loaded.partial_fit(images[:2], labels[:2]), [60, 61])
+        assert 6 not in loaded.ids_[loaded.kneighbors(images, k=10)[1]]
@@ -0,0 +1,332 @@
+import gc
+import pytest
+import numpy as np
+from src import ImageClassifier
+from src.index import (
+    BallTreeIndex, BruteForceIndex, IVFIndex, KDTreeIndex, PrunedIndex, QuantizedIndex, ScalarQuantizer,
+    ShardedIndex, make_index, recall_at_k
+)
+from src.index.ivf import kmeans
+from src.index.tree import _TreeIndex
+from src.strategies import (
+    CosineDistance, DistanceStrategy, EuclideanDistance, FeaturePipeline, ManhattanDistance, PCAProjection,
+    PCAReduction
+)
+
+class TestIndexes:
+    @pytest.fixture
+    def vectors(self):
+        """Vecteurs regroupés en 5 amas bien séparés"""
+        rng = np.random.default_rng(0)
+        centers = rng.random((5, 16), dtype=np.float32) * 10
+        return (centers[rng.integers(0, 5, 500)]
+                + rng.random((500, 16), dtype=np.float32)).astype(np.float32)
+
+    def test_brute_force_is_exact(self, vectors):
+        index = BruteForceIndex()
+        index.build(vectors, EuclideanDistance())
+
+        distances, indices = index.search(vectors[:10], 3)
+
+        # Chaque vecteur est son propre plus proche voisin (aux arrondis float32 près)
+        np.testing.assert_array_equal(indices[:, 0], np.arange(10))
+        np.testing.assert_allclose(distances[:, 0], 0, atol=5e-2)
+
+    def test_ivf_probing_every_list_is_exact(self, vectors):
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        ivf = IVFIndex(n_lists=10, nprobe=10)
+        ivf.build(vectors, EuclideanDistance())
+
+        queries = vectors[::25] + 0.05
+        _, expected = exact.search(queries, 5)
+        _, found = ivf.search(queries, 5)
+
+        assert recall_at_k(found, expected) == 1.0
+
+    def test_ivf_always_returns_k_neighbors(self, vectors):
+        """Même avec nprobe=1, assez de cellules sont visitées pour réunir k candidats"""
+        ivf = IVFIndex(n_lists=50, nprobe=1)
+        ivf.build(vectors, EuclideanDistance())
+
+        distances, indices = ivf.search(vectors[:4], 40)
+
+        assert indices.shape == (4, 40)
+        assert all(len(set(row)) == 40 for row in indices)
+        assert np.all(np.diff(distances, axis=1) >= 0)
+
+    def test_kmeans_centroids_shape(self, vectors):
+        centroids = kmeans(vectors, 5, n_iter=5)
+        assert centroids.shape == (5, 16)
+        assert centroids.dtype == np.float32
+
+    def test_recall_at_k(self):
+        exact = np.array([[0, 1], [2, 3]])
+        approx = np.array([[1, 0], [2, 4]])
+        assert recall_at_k(approx, exact) == 0.75
+
+    def test_make_index_unknown_name(self):
+        with pytest.raises(ValueError):
+            make_index("annoy")
+
+    def test_classifier_with_ivf_index(self):
+        rng = np.random.default_rng(1)
+        images = np.repeat(np.arange(0, 250, 25, dtype=np.uint8), 20)[:, None, None] \
+            + rng.integers(0, 5, (200, 28, 28), dtype=np.uint8)
+        labels = np.repeat(np.arange(10), 20)
+
+        classifier = ImageClassifier(k=3, index=IVFIndex(n_lists=10, nprobe=2))
+        classifier.fit(images, labels)
+
+        assert classifier.evaluate(images[::7], labels[::7]) == 1.0
+
+    def test_kdtree_matches_brute_force(self, vectors):
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        tree = KDTreeIndex(n_components=4, leaf_size=8)
+        tree.build(vectors, EuclideanDistance())
+
+        queries = vectors[::10] + 0.05
+        _, expected = exact.search(queries, 7)
+        distances, found = tree.search(queries, 7)
+
+        assert recall_at_k(found, expected) == 1.0
+        assert np.all(np.diff(distances, axis=1) >= 0)
+        # L'élagage évite de comparer chaque requête à tous les vecteurs
+        assert tree.evaluations_per_query() < len(vectors)
+
+    def test_kdtree_requires_euclidean_distance(self, vectors):
+        class ConstantDistance(DistanceStrategy):
+            def calculate_distance(self, image1, image2):
+                return 0.0
+
+        with pytest.raises(ValueError):
+            KDTreeIndex().build(vectors, ConstantDistance())
+
+    def test_pca_projection_lower_bounds_distances(self, vectors):
+        """La distance entre projections ne dépasse jamais la distance complète"""
+        projection = PCAProjection(n_components=3).fit(vectors)
+        reduced = projection.transform(vectors)
+
+        full = np.linalg.norm(vectors[:50, None] - vectors[None, 50:100], axis=2)
+        projected = np.linalg.norm(reduced[:50, None] - reduced[None, 50:100], axis=2)
+        assert np.all(projected <= full + 1e-4)
+
+    def test_uint8_storage_is_lossless_on_mnist_pixels(self):
+        """Les pixels MNIST normalisés tombent exactement sur la grille uint8"""
+        rng = np.random.default_rng(2)
+        images = rng.integers(0, 256, (200, 28, 28), dtype=np.uint8)
+        queries = rng.integers(0, 256, (20, 28, 28), dtype=np.uint8)
+        labels = rng.integers(0, 10, 200)
+
+        exact = ImageClassifier(k=5)
+        exact.fit(images, labels)
+        compact = ImageClassifier(k=5, storage="uint8")
+        compact.fit(images, labels)
+
+        assert compact.training_images is None
+        assert compact._index.codes.dtype == np.uint8
+        assert compact._index.codes.nbytes * 4 == exact.training_images.nbytes
+        expected_distances, expected = exact.kneighbors(queries)
+        distances, found = compact.kneighbors(queries)
+        np.testing.assert_array_equal(found, expected)
+        np.testing.assert_allclose(distances, expected_distances, rtol=1e-3)
+
+    def test_int8_rerank_recovers_exact_neighbors(self, vectors):
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        quantized = QuantizedIndex("int8", rerank=4)
+        quantized.build(vectors, EuclideanDistance())
+
+        queries = vectors[::20] + 0.05
+        expected_distances, expected = exact.search(queries, 5)
+        distances, found = quantized.search(queries, 5)
+
+        assert quantized.codes.dtype == np.int8
+        assert recall_at_k(found, expected) == 1.0
+        np.testing.assert_allclose(distances, expected_distances, atol=2e-3)
+
+    def test_quantizer_round_trip(self, vectors):
+        quantizer = ScalarQuantizer("int8").fit(vectors)
+        decoded = quantizer.decode(quantizer.encode(vectors))
+        assert np.abs(decoded - vectors).max() <= quantizer.scale / 2 + 1e-5
+
+    def test_uint8_storage_rejects_features_outside_unit_range(self):
+        """Des composantes PCA sortent de [0, 1] : uint8 les refuse, int8 les quantifie"""
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (200, 28, 28), dtype=np.uint8)
+        labels = np.arange(200) % 4
+        pca = lambda: FeaturePipeline([PCAReduction(16)])
+        with pytest.raises(ValueError, match="storage='int8'"):
+            ImageClassifier(k=5, storage="uint8", preprocessing_strategy=pca()).fit(images, labels)
+        with pytest.raises(ValueError):
+            ScalarQuantizer("uint8").fit(np.array([[-0.5, 0.5]], dtype=np.float32))
+
+        exact = ImageClassifier(k=5, preprocessing_strategy=pca())
+        exact.fit(images, labels)
+        compact = ImageClassifier(k=5, storage="int8", preprocessing_strategy=pca())
+        compact.fit(images, labels)
+        assert (compact.predict_batch(images[:50]) == exact.predict_batch(images[:50])).mean() > 0.9
+
+    def test_quantized_storage_requires_brute_index(self):
+        with pytest.raises(ValueError):
+            ImageClassifier(storage="int8", index="ivf")
+        with pytest.raises(ValueError):
+            ImageClassifier(storage="float16")
+
+    def test_ball_tree_matches_brute_force_for_l1(self, vectors):
+        exact = BruteForceIndex()
+        exact.build(vectors, ManhattanDistance())
+        tree = BallTreeIndex(leaf_size=8)
+        tree.build(vectors, ManhattanDistance())
+
+        queries = vectors[::10] + 0.05
+        expected_distances, expected = exact.search(queries, 6)
+        distances, found = tree.search(queries, 6)
+
+        assert recall_at_k(found, expected) == 1.0
+        np.testing.assert_allclose(distances, expected_distances, rtol=1e-5)
+        assert tree.evaluations_per_query() < len(vectors)
+
+    def test_ball_tree_requires_metric(self, vectors):
+        with pytest.raises(ValueError):
+            BallTreeIndex().build(vectors, CosineDistance())
+
+    def test_pruned_index_matches_brute_force(self, vectors):
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        pruned = PrunedIndex(stages=(2, 6, 12), seed_factor=2)
+        pruned.build(vectors, EuclideanDistance())
+
+        queries = vectors[::10] + 0.05
+        expected_distances, expected = exact.search(queries, 7)
+        distances, found = pruned.search(queries, 7)
+
+        assert recall_at_k(found, expected) == 1.0
+        np.testing.assert_allclose(distances, expected_distances, atol=1e-3)
+        # Les bornes écartent la plupart des candidats avant le calcul complet
+        assert 0.5 < pruned.pruned_fraction() < 1
+        assert pruned.work_fraction() < 1
+
+    def test_pruned_index_after_add_and_remove(self, vectors):
+        exact = BruteForceIndex()
+        exact.build(vectors[:300], EuclideanDistance())
+        pruned = PrunedIndex(stages=(4, 8))
+        pruned.build(vectors[:300], EuclideanDistance())
+        for index in (exact, pruned):
+            index.add(vectors[300:])
+            index.remove(np.arange(0, 500, 3))
+
+        queries = vectors[1::20] + 0.05
+        _, expected = exact.search(queries, 5)
+        _, found = pruned.search(queries, 5)
+        assert recall_at_k(found, expected) == 1.0
+        assert not np.isin(found, np.arange(0, 500, 3)).any()
+
+        pruned.compact()
+        exact.compact()
+        _, expected = exact.search(queries, 5)
+        _, found = pruned.search(queries, 5)
+        assert recall_at_k(found, expected) == 1.0
+
+    def test_tree_index_hooks_are_abstract(self):
+        """Une sous-classe incomplète échoue dès sa création, pas pendant une requête"""
+        class Incomplete(_TreeIndex):
+            def _describe_node(self, rows):
+                pass
+
+            def _split_order(self, rows, middle):
+                return np.arange(len(rows))
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_pruned_index_requires_euclidean_distance(self, vectors):
+        with pytest.raises(ValueError):
+            PrunedIndex().build(vectors, ManhattanDistance())
+        with pytest.raises(ValueError):
+            PrunedIndex(stages=(64, 32))
+
+    @pytest.mark.parametrize("prefetch", [0, 2])
+    def test_sharded_index_matches_brute_force(self, vectors, tmp_path, prefetch):
+        exact = BruteForceIndex()
+        exact.build(vectors, EuclideanDistance())
+        sharded = ShardedIndex(tmp_path, shard_size=64, prefetch=prefetch)
+        sharded.build(vectors, EuclideanDistance())
+
+        assert sharded.n_shards == 8 and len(sharded) == 500
+        assert len(list((tmp_path / sharded.token).glob("*.npy"))) == 16  # vecteurs et normes de chaque shard
+        queries = vectors[::10] + 0.05
+        expected_distances, expected = exact.search(queries, 7)
+        distances, found = sharded.search(queries, 7)
+        np.testing.assert_array_equal(found, expected)
+        np.testing.assert_allclose(distances, expected_distances, atol=1e-3)
+
+    def test_sharded_index_after_add_remove_and_compact(self, vectors, tmp_path):
+        exact = BruteForceIndex()
+        exact.build(vectors[:300], ManhattanDistance())
+        sharded = ShardedIndex(tmp_path, shard_size=128)
+        sharded.build(vectors[:300], ManhattanDistance())
+        for index in (exact, sharded):
+            index.add(vectors[300:])
+            index.remove(np.arange(0, 500, 3))
+        # Le dernier shard incomplet a été complété avant d'en créer de nouveaux
+        assert sharded.shard_rows.tolist() == [128, 128, 128, 116]
+
+        queries = vectors[1::20] + 0.05
+        np.testing.assert_array_equal(sharded.search(queries, 5)[1], exact.search(queries, 5)[1])
+
+        old_token = sharded.token
+        np.testing.assert_array_equal(sharded.compact(), exact.compact())
+        assert sharded.n_rows == exact.n_rows and sharded.n_shards == 3
+        np.testing.assert_array_equal(sharded.stored_vectors(), exact.vectors)
+        np.testing.assert_array_equal(sharded.search(queries, 5)[1], exact.search(queries, 5)[1])
+        # Le compactage écrit une nouvelle génération ; celle d'avant, dans un
+        # répertoire fourni par l'appelant, est laissée aux modèles enregistrés
+        assert len(list((tmp_path / sharded.token).glob("*.npy"))) == 3
+        assert sharded.token != old_token and (tmp_path / old_token).is_dir()
+
+    def test_classifier_with_sharded_index_saves_and_clones(self, tmp_path):
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (120, 28, 28), dtype=np.uint8)
+        labels = np.arange(120) % 4
+        classifier = ImageClassifier(k=3, index=ShardedIndex(tmp_path / "shards", shard_size=50))
+        classifier.fit(images[:80], labels[:80])
+        classifier.partial_fit(images[80:], labels[80:])
+        expected = ImageClassifier(k=3)
+        expected.fit(images, labels)
+        np.testing.assert_array_equal(classifier.predict_batch(images), expected.predict_batch(images))
+
+        classifier.save(tmp_path / "model")
+        loaded = ImageClassifier.load(tmp_path / "model")
+        np.testing.assert_array_equal(loaded.predict_batch(images), expected.predict_batch(images))
+
+        # Un clone entraîné écrit ses propres shards sans effacer ceux de l'original
+        reduced = classifier.reduce("wilson")
+        assert reduced._index.token != classifier._index.token
+        np.testing.assert_array_equal(classifier.predict_batch(images), expected.predict_batch(images))
+
+        # Réentraîner l'instance ne touche pas aux fichiers du modèle enregistré
+        classifier.fit(images[::-1][:60], labels[::-1][:60])
+        classifier.partial_fit(images[:10], labels[:10])
+        reloaded = ImageClassifier.load(tmp_path / "model")
+        np.testing.assert_array_equal(reloaded.predict_batch(images), expected.predict_batch(images))
+
+    def test_sharded_index_removes_its_temporary_directory(self, vectors):
+        closed = ShardedIndex(shard_size=64)
+        closed.build(vectors, EuclideanDistance())
+        clone = closed.without_arrays()
+        clone.build(vectors[:100], EuclideanDistance())
+        assert clone.directory != closed.directory
+        first_token = clone.token
+        clone.build(vectors[100:200], EuclideanDistance())
+        assert not (clone.directory / first_token).exists()
+
+        closed.search(vectors[:5], 3)
+        closed.close()
+        assert not closed.directory.exists() and clone.directory.exists()
+
+        directory = clone.directory
+        del clone
+        gc.collect()
+        assert not directory.exists()
@@ -0,0 +1,105 @@
+import json
+import pstats
+import numpy as np
+import pytest
+from src import ImageClassifier
+from src.benchmarks import synthetic_mnist
+from src.instrumentation import Instrumentation, to_prometheus
+
+@pytest.fixture
+def fitted():
+    images, labels = synthetic_mnist(300)
+    classifier = ImageClassifier(k=3, block_size=50)
+    classifier.fit(images[:200], labels[:200])
+    return classifier, images[200:]
+
+class TestInstrumentation:
+    def test_stages_cover_fit_and_predict(self, fitted):
+        """fit et predict_batch alimentent chaque étape avec des compteurs cohérents"""
+        classifier, queries = fitted
+        classifier.predict_batch(queries)
+        stats = classifier.stats()
+
+        stages = stats["stages"]
+        assert list(stages) == ["preprocess", "distance", "selection", "vote", "index_build"]
+        assert stages["index_build"]["items"] == 200
+        assert stages["preprocess"]["items"] == 300
+        for stage in ("distance", "selection", "vote"):
+            assert stages[stage]["calls"] == 2
+            assert stages[stage]["items"] == 100
+            assert 0 < stages[stage]["max_s"] <= stages[stage]["total_s"]
+        assert stats["counters"]["predictions"] == 100
+        assert stats["counters"]["preprocess_vectorized"] == 300
+        json.dumps(stats)
+
+    def test_off_switch(self):
+        images, labels = synthetic_mnist(50)
+        classifier = ImageClassifier(k=1, instrument=False)
+        classifier.fit(images, labels)
+        classifier.predict_batch(images[:5])
+        stats = classifier.stats()
+        assert not stats["enabled"]
+        assert stats["stages"] == {} and stats["counters"] == {}
+
+    def test_reset_and_updates(self, fitted):
+        classifier, queries = fitted
+        classifier.reset_stats()
+        classifier.partial_fit(queries[:10], np.zeros(10, dtype=int))
+        classifier.remove([0])
+        assert classifier.stats()["stages"]["index_update"]["calls"] == 2
+
+    def test_prometheus_format(self, fitted):
+        classifier, queries = fitted
+        classifier.predict_batch(queries[:5])
+        text = to_prometheus(classifier.stats(), labels={"model": "mnist"})
+
+        assert '# TYPE knn_stage_seconds_total counter' in text
+        assert 'knn_stage_calls_total{model="mnist",stage="distance"} 1' in text
+        assert 'knn_events_total{model="mnist",event="predictions"} 5' in text
+        assert 'knn_cache_hits{model="mnist",cache="predictions"} 0' in text
+
+    def test_survives_pickling(self, fitted, tmp_path):
+        """Un modèle rechargé repart avec des mesures vides mais toujours reliées à son index"""
+        classifier, queries = fitted
+        classifier.save(tmp_path / "model")
+        loaded = ImageClassifier.load(tmp_path / "model")
+        assert loaded.stats()["stages"] == {}
+        loaded.predict_batch(queries[:3])
+        assert loaded.stats()["stages"]["distance"]["items"] == 3
+
+    def test_thread_safe_counters(self):
+        from concurrent.futures import ThreadPoolExecutor
+        instrumentation = Instrumentation()
+
+        def work(_):
+            for _ in range(1000):
+                with instrumentation.timer("distance", items=1):
+                    pass
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(work, range(4)))
+        assert instrumentation.snapshot()["stages"]["distance"]["items"] == 4000
+
+class TestProfiling:
+    def test_pstats_trace(self, fitted, tmp_path):
+        classifier, queries = fitted
+        with classifier.profile(tmp_path / "batch.prof"):
+            classifier.predict_batch(queries)
+        functions = {name for _, _, name in pstats.Stats(str(tmp_path / "batch.prof")).stats}
+        assert "predict_batch" in functions
+
+    def test_folded_trace(self, fitted, tmp_path):
+        """Les piles repliées ont le format « f1;f2;f3 nombre » des outils de flamegraph"""
+        classifier, queries = fitted
+        with classifier.profile(tmp_path / "batch.folded", format="folded"):
+            for _ in range(20):
+                classifier.predict_batch(queries)
+        lines = (tmp_path / "batch.folded").read_text().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("predict_batch" in line for line in lines)
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            with ImageClassifier().profile(tmp_path / "x", format="svg"):
+                pass
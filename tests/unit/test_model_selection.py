@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from src import ImageClassifier
+from src.benchmarks import synthetic_mnist
+from src.model_selection import cross_validate_k, format_results, stratified_folds
+from src.strategies import FeaturePipeline, PCAReduction
+from src.voting import cumulative_votes, neighbor_weights, winners
+
+@pytest.fixture
+def hard_dataset():
+    """Images synthétiques dont 30 % des étiquettes sont fausses : la précision varie avec k"""
+    rng = np.random.default_rng(1)
+    images, labels = synthetic_mnist(400, n_classes=4)
+    flipped = rng.random(len(labels)) < 0.3
+    labels[flipped] = rng.integers(0, 4, flipped.sum())
+    return images, labels
+
+class TestVoting:
+    def test_distance_weights(self):
+        weights = neighbor_weights(np.array([[1.0, 2.0, 4.0], [0.0, 0.0, 3.0]]), "distance")
+        np.testing.assert_allclose(weights, [[1, 0.5, 0.25], [1, 1, 0]])
+
+    def test_cumulative_votes_match_each_k(self):
+        """Les votes cumulés donnent, pour chaque k, le vote des k premiers voisins"""
+        codes = np.array([[2, 0, 0, 1, 1]])
+        votes = cumulative_votes(codes, np.ones(codes.shape), 3)
+        assert winners(votes)[0].tolist() == [2, 0, 0, 0, 0]
+        np.testing.assert_array_equal(votes[0, 4], [2, 2, 1])
+
+class TestCrossValidation:
+    def test_folds_are_stratified(self):
+        labels = np.repeat([0, 1, 2], [50, 30, 20])
+        folds = stratified_folds(labels, 5)
+        for label in range(3):
+            counts = np.bincount(folds[labels == label], minlength=5)
+            assert counts.max() - counts.min() <= 1
+
+    def test_matches_separate_evaluations(self, hard_dataset):
+        """Chaque case de la table vaut la précision d'un classificateur entraîné sur le pli"""
+        images, labels = hard_dataset
+        results = cross_validate_k(images, labels, k_max=6, n_folds=3)
+        folds = stratified_folds(labels, 3)
+
+        for fold in range(3):
+            train, validation = folds != fold, folds == fold
+            for k in (1, 4, 6):
+                classifier = ImageClassifier(k=k)
+                classifier.fit(images[train], labels[train])
+                expected = classifier.evaluate(images[validation], labels[validation])
+                assert results["scores"]["uniform"][fold, k - 1] == pytest.approx(expected)
+
+        assert results["scores"]["distance"].shape == (3, 6)
+        assert len(set(results["mean"]["uniform"].round(6))) > 1
+        best = results["best"]
+        assert best["accuracy"] == pytest.approx(results["mean"][best["weights"]].max())
+        assert "Meilleur" in format_results(results)
+
+    def test_preprocessing_is_fitted_on_training_folds_only(self, hard_dataset):
+        """L'ACP de chaque pli est apprise sans ses images de validation"""
+        images, labels = hard_dataset
+        fitted = []
+
+        class RecordingPCA(PCAReduction):
+            def fit(self, batch):
+                fitted.append(np.array(batch))
+                return super().fit(batch)
+
+        pipeline = FeaturePipeline([RecordingPCA(8)])
+        results = cross_validate_k(images, labels, k_max=4, n_folds=3,
+                                   classifier=ImageClassifier(preprocessing_strategy=pipeline))
+        assert pipeline.steps[0].projection is None
+        folds = stratified_folds(labels, 3)
+        assert len(fitted) == 3
+        for fold in range(3):
+            # Plis traités dans l'ordre avec n_jobs=1 : la projection ne voit que l'entraînement
+            train, validation = folds != fold, folds == fold
+            np.testing.assert_array_equal(fitted[fold], pipeline.base.preprocess_batch(images[train]))
+
+            # Même précision qu'un classificateur entraîné sur le seul pli
+            classifier = ImageClassifier(k=4, preprocessing_strategy=FeaturePipeline([PCAReduction(8)]))
+            classifier.fit(images[train], labels[train])
+            expected_accuracy = classifier.evaluate(images[validation], labels[validation])
+            assert results["scores"]["uniform"][fold, 3] == pytest.approx(expected_accuracy)
+
+    def test_parallel_folds_give_same_table(self, hard_dataset):
+        images, labels = hard_dataset
+        sequential = cross_validate_k(images, labels, k_max=5, n_folds=4, n_jobs=1)
+        parallel = cross_validate_k(images, labels, k_max=5, n_folds=4, n_jobs=4)
+        for name in ("uniform", "distance"):
+            np.testing.assert_array_equal(sequential["scores"][name], parallel["scores"][name])
+
+    def test_invalid_arguments(self, hard_dataset):
+        images, labels = hard_dataset
+        with pytest.raises(ValueError):
+            cross_validate_k(images, labels, weights=("gaussien",))
+        with pytest.raises(ValueError):
+            cross_validate_k(images, labels, k_max=1000)
@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+from src import ImageClassifier
+from src.parallel import SharedArray, effective_n_jobs
+
+class TestParallelPrediction:
+    @pytest.fixture
+    def dataset(self):
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (300, 28, 28), dtype=np.uint8)
+        labels = rng.integers(0, 10, 300)
+        return images, labels
+
+    def test_shared_array_round_trip(self):
+        """Un processus qui se rattache au segment voit les mêmes données, sans copie"""
+        original = np.arange(12, dtype=np.float32).reshape(3, 4)
+        shared = SharedArray.create(original)
+        try:
+            attached = SharedArray.attach(shared.spec)
+            np.testing.assert_array_equal(attached.array, original)
+
+            shared.array[0, 0] = 42
+            assert attached.array[0, 0] == 42
+            attached.close()
+        finally:
+            shared.unlink()
+
+    def test_process_pool_matches_sequential(self, dataset):
+        images, labels = dataset
+        classifier = ImageClassifier(k=3, block_size=32, n_jobs=2)
+        classifier.fit(images, labels)
+        try:
+            parallel_predictions = classifier.predict_batch(images[:100])
+            parallel_distances, parallel_indices = classifier.kneighbors(images[:100])
+        finally:
+            classifier.close()
+
+        classifier.n_jobs = 1
+        np.testing.assert_array_equal(parallel_predictions, classifier.predict_batch(images[:100]))
+        distances, indices = classifier.kneighbors(images[:100])
+        np.testing.assert_array_equal(parallel_indices, indices)
+        np.testing.assert_allclose(parallel_distances, distances)
+
+    def test_parameters_changed_after_pool_start(self, dataset):
+        """Changer k ou la pondération après le démarrage du pool s'applique aux processus"""
+        images, labels = dataset
+        classifier = ImageClassifier(k=1, block_size=32, n_jobs=2)
+        classifier.fit(images, labels)
+        sequential = ImageClassifier(k=15, block_size=32)
+        sequential.fit(images, labels)
+        try:
+            # k=1 : chaque image d'entraînement est son propre voisin
+            np.testing.assert_array_equal(classifier.predict_batch(images[:100]), labels[:100])
+
+            classifier.k = 15
+            expected = sequential.predict_batch(images[:100])
+            assert np.mean(expected == labels[:100]) < 0.5
+            np.testing.assert_array_equal(classifier.predict_batch(images[:100]), expected)
+            assert classifier.kneighbors(images[:100])[1].shape == (100, 15)
+
+            # Pondération par distance : la correspondance exacte l'emporte de nouveau
+            classifier.weights = "distance"
+            np.testing.assert_array_equal(classifier.predict_batch(images[:100]), labels[:100])
+        finally:
+            classifier.close()
+
+    def test_invalid_n_jobs(self):
+        assert effective_n_jobs(-1) >= 1
+        with pytest.raises(ValueError):
+            ImageClassifier(n_jobs=0)
@@ -0,0 +1,67 @@
+import json
+import pytest
+import numpy as np
+from src import ImageClassifier
+from src.index import IVFIndex
+
+class TestPersistence:
+    @pytest.fixture
+    def fitted(self):
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (60, 28, 28), dtype=np.uint8)
+        labels = rng.integers(0, 3, 60)
+        classifier = ImageClassifier(k=3, index=IVFIndex(n_lists=4, nprobe=2))
+        classifier.fit(images, labels)
+        return classifier, images
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_round_trip(self, fitted, tmp_path, mmap):
+        classifier, images = fitted
+        classifier.save(tmp_path / "model")
+
+        loaded = ImageClassifier.load(tmp_path / "model", mmap=mmap)
+
+        assert isinstance(loaded.training_images, np.memmap) == mmap
+        assert loaded.k == classifier.k
+        np.testing.assert_array_equal(loaded.predict_batch(images), classifier.predict_batch(images))
+        np.testing.assert_array_equal(loaded.kneighbors(images)[1], classifier.kneighbors(images)[1])
+
+    def test_save_loaded_model_to_its_own_path(self, fitted, tmp_path):
+        """Réenregistrer un modèle projeté en mémoire sur ses propres fichiers ne les tronque pas"""
+        classifier, images = fitted
+        classifier.save(tmp_path / "model")
+        loaded = ImageClassifier.load(tmp_path / "model", mmap=True)
+        loaded.save(tmp_path / "model")
+
+        np.testing.assert_array_equal(loaded.predict_batch(images), classifier.predict_batch(images))
+        reloaded = ImageClassifier.load(tmp_path / "model")
+        np.testing.assert_array_equal(reloaded.predict_batch(images), classifier.predict_batch(images))
+        assert not list((tmp_path / "model").rglob("*.tmp"))
+
+    def test_manifest_describes_model(self, fitted, tmp_path):
+        classifier, _ = fitted
+        classifier.save(tmp_path)
+
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        assert manifest["format_version"] == 1
+        assert manifest["n_samples"] == 60
+        assert manifest["index"] == "IVFIndex"
+        assert all((tmp_path / "arrays" / name).exists() for name in manifest["arrays"].values())
+
+    def test_unsupported_version(self, fitted, tmp_path):
+        classifier, _ = fitted
+        classifier.save(tmp_path)
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        manifest["format_version"] = 999
+        (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+
+        with pytest.raises(ValueError):
+            ImageClassifier.load(tmp_path)
+
+    def test_save_requires_fit(self, tmp_path):
+        with pytest.raises(ValueError):
+            ImageClassifier().save(tmp_path)
+
+    def test_missing_model(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ImageClassifier.load(tmp_path / "absent")
@@ -23,4 +23,36 @@ class TestMNISTPreprocessing:
 
     def test_invalid_input(self, preprocessor):
         with pytest.raises(TypeError):
-            preprocessor.preprocess(42)  # Un entier n'est pas une image valide
\ No newline at end of file
+            preprocessor.preprocess(42)  # Un entier n'est pas une image valide
+
+    @pytest.mark.parametrize("shape, dtype", [
+        ((6, 28, 28), np.uint8),
+        ((6, 100, 150), np.uint8),
+        ((6, 40, 40), np.float32),
+        ((6, 28, 28), np.float64),
+        ((6, 50, 60, 3), np.uint8),
+    ])
+    def test_batch_matches_pillow(self, preprocessor, shape, dtype):
+        """Le chemin vectorisé reproduit convert('L') + resize(LANCZOS) de Pillow"""
+        rng = np.random.default_rng(0)
+        images = (rng.random(shape) * 300 - 10).astype(dtype) if dtype != np.uint8 \
+            else rng.integers(0, 256, shape, dtype=np.uint8)
+
+        result = preprocessor.preprocess_batch(images)
+
+        expected = np.stack([
+            np.array(Image.fromarray(image).convert('L').resize((28, 28), Image.Resampling.LANCZOS),
+                     dtype=np.float32) / 255.0
+            for image in images
+        ])
+        assert result.shape == (6, 28, 28)
+        assert result.dtype == np.float32
+        # Pillow travaille en virgule fixe : au plus un niveau de gris d'écart
+        np.testing.assert_allclose(result, expected, atol=1 / 255 + 1e-6)
+
+    def test_batch_accepts_mixed_inputs(self, preprocessor):
+        """Une liste d'images de tailles différentes passe par le traitement image par image"""
+        images = [np.zeros((28, 28), dtype=np.uint8), Image.new('L', (50, 50), color=255)]
+        result = preprocessor.preprocess_batch(images)
+        assert result.shape == (2, 28, 28)
+        np.testing.assert_allclose(result[1], 1.0)
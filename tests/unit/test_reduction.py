@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from src import ImageClassifier
+from src.benchmarks import synthetic_mnist
+from src.index import BruteForceIndex
+from src.reduction import (
+    condensed_nearest_neighbour, kmeans_prototypes, reduce_training_set, reduction_report,
+    wilson_editing
+)
+from src.strategies import EuclideanDistance
+
+@pytest.fixture
+def noisy_blobs():
+    """Trois amas 2D avec quelques étiquettes inversées"""
+    rng = np.random.default_rng(0)
+    centers = np.array([[0, 0], [10, 0], [0, 10]], dtype=np.float32)
+    labels = rng.integers(0, 3, 600)
+    vectors = centers[labels] + rng.normal(0, 1.5, (600, 2)).astype(np.float32)
+    noisy = labels.copy()
+    flipped = rng.choice(600, 20, replace=False)
+    noisy[flipped] = (labels[flipped] + 1) % 3
+    return vectors, noisy, flipped
+
+class TestReduction:
+    def test_condensed_set_is_consistent(self, noisy_blobs):
+        """Le magasin de Hart classe correctement tout l'ensemble d'entraînement en 1-NN"""
+        vectors, labels, _ = noisy_blobs
+        kept, kept_labels = condensed_nearest_neighbour(vectors, labels, block_size=32)
+
+        assert len(kept) < len(vectors)
+        index = BruteForceIndex()
+        index.build(kept, EuclideanDistance())
+        _, nearest = index.search(vectors, 1)
+        np.testing.assert_array_equal(kept_labels[nearest[:, 0]], labels)
+
+    def test_wilson_removes_mislabeled(self, noisy_blobs):
+        """L'édition de Wilson retire la plupart des étiquettes inversées et peu d'autres exemples"""
+        vectors, labels, flipped = noisy_blobs
+        kept, _ = wilson_editing(vectors, labels, k=5)
+        kept_rows = {tuple(row) for row in kept.tolist()}
+        remaining_flipped = sum(tuple(row) in kept_rows for row in vectors[flipped].tolist())
+
+        assert remaining_flipped <= 2
+        assert len(kept) >= len(vectors) - 60
+
+    def test_kmeans_prototypes_keep_shape_and_dtype(self):
+        """Les prototypes ont la forme et le type des images d'entrée"""
+        images, labels = synthetic_mnist(300, n_classes=3)
+        prototypes, prototype_labels = kmeans_prototypes(images, labels, n_per_class=5)
+
+        assert prototypes.shape == (15, 28, 28)
+        assert prototypes.dtype == np.uint8
+        assert sorted(np.bincount(prototype_labels).tolist()) == [5, 5, 5]
+
+    def test_unknown_method(self, noisy_blobs):
+        vectors, labels, _ = noisy_blobs
+        with pytest.raises(ValueError):
+            reduce_training_set(vectors, labels, "inconnue")
+
+    def test_parameters_are_routed_by_signature(self, noisy_blobs):
+        """Chaque méthode reçoit ses paramètres ; un paramètre qu'aucune n'accepte est refusé"""
+        vectors, labels, _ = noisy_blobs
+        reduced, _ = reduce_training_set(vectors, labels, ("wilson", "kmeans"), k=5, n_per_class=4,
+                                         distance_strategy=EuclideanDistance())
+        assert len(reduced) == 4 * len(np.unique(labels))
+        with pytest.raises(ValueError, match="n_per_clas"):
+            reduce_training_set(vectors, labels, "kmeans", n_per_clas=4)
+        with pytest.raises(ValueError, match="n_per_class"):
+            reduce_training_set(vectors, labels, "cnn", n_per_class=4)
+
+    def test_classifier_reduce_and_report(self):
+        """Le classificateur réduit garde ses paramètres, reste précis et prédit plus vite"""
+        images, labels = synthetic_mnist(2200)
+        classifier = ImageClassifier(k=3, block_size=64)
+        classifier.fit(images[:2000], labels[:2000])
+        classifier.remove([0, 1])
+
+        reduced = classifier.reduce(("wilson", "cnn"))
+        assert reduced.k == 1 and reduced.block_size == 64
+        assert len(reduced._index) < len(classifier._index) / 10
+
+        report = reduction_report(classifier, reduced, images[2000:], labels[2000:])
+        assert report["n_original"] == 1998
+        assert report["compression_ratio"] > 10
+        assert report["accuracy_delta"] > -0.02
+
+        prototypes = classifier.reduce("kmeans", n_per_class=10, reduced_k=3)
+        assert prototypes.k == 3 and len(prototypes._index) == 100
@@ -0,0 +1,158 @@
+import asyncio
+import io
+import threading
+import numpy as np
+import pytest
+from PIL import Image
+from src import ImageClassifier
+from src.benchmarks import synthetic_mnist
+from src.serving import HTTPClient, InferenceServer, MicroBatcher
+from src.serving.loadtest import encode_npy, run_load_test
+
+@pytest.fixture(scope="module")
+def classifier():
+    images, labels = synthetic_mnist(300)
+    classifier = ImageClassifier(k=3)
+    classifier.fit(images, labels)
+    return classifier, images
+
+def png_bytes(image):
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class TestMicroBatcher:
+    def test_groups_concurrent_requests(self):
+        """Des requêtes simultanées sont traitées en lots bornés par max_batch_size"""
+        sizes = []
+
+        def handler(items):
+            sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        async def scenario():
+            batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=50)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+            await batcher.stop()
+            return results, batcher.stats()
+
+        results, stats = asyncio.run(scenario())
+        assert results == [i * 2 for i in range(20)]
+        assert max(sizes) <= 8 and sum(sizes) == 20
+        assert stats["batches"] == len(sizes) <= 4
+
+    def test_max_wait_flushes_incomplete_batch(self):
+        """Un lot incomplet est traité après max_wait_ms sans attendre d'autres requêtes"""
+        async def scenario():
+            batcher = MicroBatcher(lambda items: items, max_batch_size=100, max_wait_ms=10)
+            await batcher.start()
+            result = await asyncio.wait_for(batcher.submit("seul"), timeout=2)
+            await batcher.stop()
+            return result
+
+        assert asyncio.run(scenario()) == "seul"
+
+    def test_errors_are_isolated(self):
+        """Un résultat exception n'échoue que sa requête ; une exception du lot les échoue toutes"""
+        def handler(items):
+            if "panne" in items:
+                raise RuntimeError("panne")
+            return [ValueError(item) if item == "mauvais" else item for item in items]
+
+        async def scenario():
+            batcher = MicroBatcher(handler, max_batch_size=2, max_wait_ms=20)
+            await batcher.start()
+            outcomes = await asyncio.gather(
+                batcher.submit("bon"), batcher.submit("mauvais"), return_exceptions=True
+            )
+            failed = await asyncio.gather(batcher.submit("panne"), return_exceptions=True)
+            await batcher.stop()
+            return outcomes, failed
+
+        outcomes, failed = asyncio.run(scenario())
+        assert outcomes[0] == "bon"
+        assert isinstance(outcomes[1], ValueError)
+        assert isinstance(failed[0], RuntimeError)
+
+    def test_handler_runs_off_event_loop(self):
+        """Le traitement d'un lot s'exécute hors du thread de la boucle d'événements"""
+        threads = []
+
+        def handler(items):
+            threads.append(threading.get_ident())
+            return items
+
+        async def scenario():
+            batcher = MicroBatcher(handler)
+            await batcher.start()
+            await batcher.submit(1)
+            await batcher.stop()
+
+        asyncio.run(scenario())
+        assert threads[0] != threading.get_ident()
+
+class TestInferenceServer:
+    def test_http_predictions(self, classifier):
+        """POST /predict accepte PNG et .npy et retourne les mêmes étiquettes que predict_batch"""
+        model, images = classifier
+        expected = model.predict_batch(images[:10])
+
+        async def scenario():
+            server = InferenceServer(model, max_batch_size=4, max_wait_ms=20)
+            await server.start(port=0)
+            host, port = server.address[:2]
+            try:
+                async def one(i):
+                    async with HTTPClient(host, port) as client:
+                        if i % 2:
+                            return await client.predict(png_bytes(images[i]), "image/png")
+                        return await client.predict(encode_npy(images[i]), "application/x-npy")
+                responses = await asyncio.gather(*(one(i) for i in range(10)))
+                async with HTTPClient(host, port) as client:
+                    health = await client.request("GET", "/health")
+                    stats = await client.request("GET", "/stats")
+                    metrics = await client.request("GET", "/metrics")
+                    bad = await client.predict(b"pas une image")
+                    missing = await client.request("GET", "/inconnu")
+                    wrong_method = await client.request("GET", "/predict")
+            finally:
+                await server.stop()
+            return responses, health, stats, metrics, bad, missing, wrong_method
+
+        responses, health, stats, metrics, bad, missing, wrong_method = asyncio.run(scenario())
+        assert [status for status, _ in responses] == [200] * 10
+        assert [payload["label"] for _, payload in responses] == expected.tolist()
+        assert health == (200, {"status": "ok"})
+        assert stats[1]["requests"] == 10 and stats[1]["batches"] < 10
+        assert metrics[0] == 200
+        assert "knn_serving_requests_total 10" in metrics[1]
+        assert 'knn_stage_calls_total{stage="distance"}' in metrics[1]
+        assert bad[0] == 400
+        assert missing[0] == 404
+        assert wrong_method[0] == 405
+
+    def test_unix_socket_and_load_test(self, classifier, tmp_path):
+        """Le serveur écoute aussi sur une socket Unix ; le test de charge mesure latences et débit"""
+        model, images = classifier
+        path = str(tmp_path / "knn.sock")
+
+        async def scenario():
+            server = InferenceServer(model, max_batch_size=16, max_wait_ms=5)
+            await server.start(unix_path=path)
+            try:
+                return await run_load_test(
+                    [encode_npy(image) for image in images[:20]], n_requests=100,
+                    concurrency=10, unix_path=path,
+                )
+            finally:
+                await server.stop()
+
+        result = asyncio.run(scenario())
+        assert result["requests"] == 100 and result["errors"] == 0
+        assert result["qps"] > 0
+        assert 0 < result["p50_ms"] <= result["p99_ms"] <= result["max_ms"]
+
+    def test_requires_fitted_classifier(self):
+        with pytest.raises(ValueError):
+            InferenceServer(ImageClassifier())
@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+from src import ImageClassifier
+from src.voting import class_votes, first_ranks, neighbor_weights, probabilities, winners
+
+class TestVoting:
+    def test_gaussian_weights_adapt_to_kth_distance(self):
+        weights = neighbor_weights(np.array([[0.0, 1.0, 2.0], [0.0, 0.0, 0.0]]), "gaussian")
+        np.testing.assert_allclose(weights[0], np.exp([0.0, -0.125, -0.5]))
+        # Tous les voisins confondus avec la requête : poids égaux
+        np.testing.assert_allclose(weights[1], 1.0)
+
+    def test_class_votes_and_probabilities(self):
+        codes = np.array([[2, 0, 2], [1, 1, 1]])
+        votes = class_votes(codes, np.array([[1.0, 0.5, 0.25], [1.0, 1.0, 1.0]]), 3)
+
+        np.testing.assert_allclose(votes, [[0.5, 0, 1.25], [0, 3, 0]])
+        np.testing.assert_allclose(probabilities(votes).sum(axis=1), 1.0)
+
+    def test_ties_go_to_the_nearest_neighbor(self):
+        """Égalité 2 contre 2 : la classe du plus proche voisin l'emporte, quel que soit son code"""
+        codes = np.array([[3, 1, 1, 3], [1, 3, 3, 1]])
+        votes = class_votes(codes, np.ones(codes.shape), 4)
+        ranks = first_ranks(codes, 4)
+
+        assert ranks.tolist() == [[4, 1, 4, 0], [4, 0, 4, 1]]
+        assert winners(votes, ranks).tolist() == [3, 1]
+        # Sans les rangs, le plus petit code l'emporte
+        assert winners(votes).tolist() == [1, 1]
+
+    def test_unknown_weighting(self):
+        with pytest.raises(ValueError):
+            neighbor_weights(np.ones((1, 3)), "gaussien")
+        with pytest.raises(ValueError):
+            ImageClassifier(weights="gaussien")
+
+class TestPredictProba:
+    @pytest.fixture
+    def fitted(self):
+        rng = np.random.default_rng(0)
+        images = np.repeat(np.arange(0, 250, 50, dtype=np.uint8), 20)[:, None, None] \
+            + rng.integers(0, 30, (100, 28, 28), dtype=np.uint8)
+        labels = np.repeat(np.array(["a", "b", "c", "d", "e"]), 20)
+        return images, labels
+
+    @pytest.mark.parametrize("weights", ["uniform", "distance", "gaussian"])
+    def test_scores_agree_with_predictions(self, fitted, weights):
+        images, labels = fitted
+        classifier = ImageClassifier(k=5, weights=weights, block_size=16)
+        classifier.fit(images, labels)
+        queries = images[::3] + 10
+
+        scores, predictions = classifier.predict_proba(queries, return_predictions=True)
+
+        assert scores.shape == (len(queries), 5)
+        np.testing.assert_allclose(scores.sum(axis=1), 1.0)
+        np.testing.assert_array_equal(predictions, classifier.predict_batch(queries))
+        np.testing.assert_array_equal(classifier.classes_[scores.argmax(axis=1)], predictions)
+        np.testing.assert_array_equal(classifier.predict_proba(queries), scores)
+
+    def test_uniform_scores_count_neighbors(self):
+        images = np.stack([np.full((28, 28), value, dtype=np.uint8) for value in (0, 10, 20, 200)])
+        classifier = ImageClassifier(k=4)
+        classifier.fit(images, [0, 0, 1, 1])
+
+        scores = classifier.predict_proba([np.full((28, 28), 5, dtype=np.uint8)])
+        np.testing.assert_allclose(scores, [[0.5, 0.5]])
+        # Égalité 2 contre 2 : la classe du plus proche voisin (0) l'emporte
+        assert classifier.predict(np.full((28, 28), 5, dtype=np.uint8)) == 0
+        assert classifier.predict(np.full((28, 28), 16, dtype=np.uint8)) == 1